@@ -1,16 +1,30 @@
 # flake8: noqa E501
 import asyncio
-import json
+import itertools
 import getpass
 import logging
 import yaml
 import aiofiles
 import argparse
-import pandas as pd
+import os
+import serializer
+import tempfile
 from pathlib import Path
-from scrapli.driver.core import AsyncIOSXEDriver
-from scrapli.driver.core import AsyncNXOSDriver
 from typing import Any, Callable, Tuple
+from connection_pool import ConnectionPool, device_connection
+from nxapi import NXAPIClient, NXAPIError
+from scheduler import FleetScheduler
+from parser_pool import NotJSONError, parse_json_output, run_parser, shutdown_parser_executors
+from command_fanout import exec_session, fan_out_commands, stream_command
+from capture_splitter import detect_os_type, read_capture, split_capture
+from bulk_ingest import find_capture_files, ingest_files
+from capture_watcher import STATE_FILENAME, CaptureWatcher
+from snapshot_store import SnapshotStore
+from fleet_db import close_fleet_dbs, get_fleet_db
+from excel_writer import write_to_excel
+from parquet_export import check_parquet, flush_parquet_sinks, get_parquet_sink
+from compressed_io import check_compression, compressed_name, compressor, decompress
+from capture_sink import CaptureSink
 from ios_parser import *
 from nxos_parser import *
 
@@ -20,6 +34,15 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.ERROR)
 logger.propagate = False
 
+# Text parsers that also come as streaming parsers, which can parse an output while it arrives
+stream_parsers = {
+    parse_ios_show_ip_arp: IOSShowIpArpStream,
+    parse_ios_show_ip_route: IOSShowIpRouteStream,
+    parse_ios_show_mac_address_table: IOSShowMacAddressTableStream,
+    parse_nxos_show_ip_arp: NXOSShowIpArpStream,
+    parse_nxos_show_ip_route_vrf_all: NXOSShowIpRouteVrfAllStream,
+}
+
 
 async def finalize_device_output(device: dict, device_output: dict) -> dict:
     if device["cli_output_format"] == "json" and device["os_type"] == "nxos":
@@ -31,46 +54,44 @@ async def finalize_device_output(device: dict, device_output: dict) -> dict:
     return device_output
 
 
-async def parse_cmd_output(cmd: str, output: str | dict, format: str, parser: Callable[[dict], dict]) -> Tuple[str, dict]:
-    """Parses the output of specifc show command."""
+async def parse_cmd_output(cmd: str, output: str | dict, format: str, parser: Callable[[dict], dict], device: dict | None = None) -> Tuple[str, dict]:
+    """Parses the output of specifc show command.
+
+    Large outputs, text or the JSON text of an NX-OS command, are parsed in the parser executor
+    configured for the device, so the event loop keeps serving the other devices meanwhile.
+    """
 
     logger.info(f'Parsing the output of {cmd}...')
 
     try:
         if format == "json":
-                return cmd, await parse_table(output)
+            try:
+                return cmd, await run_parser(parse_json_output, output, device or {})
+            except NotJSONError:
+                logger.error(f'Command {cmd} CLI output is not in JSON format.')
+                return cmd, {"output": output, "error": "The CLI output is not in JSON format."}
         elif format == "text":
-            return cmd, parser(output)
+            return cmd, await run_parser(parser, output, device or {})
         
     except Exception as e:
         return cmd, {"msg": f"Failed to parse the output from {cmd}","error": f"{e}"}
-    
 
-def extract_txt_cmd_output(text: str, commands: list) -> dict:
-    """Extract the output of each show commands from the text file."""
 
-    output = {}
-    positions = []
+async def stream_cmd_output(cmd: str, conn, parser: Callable[[str], Any], spool=None) -> Tuple[str, Any]:
+    """Parses the output of a text command while it is being received."""
+
+    logger.info(f'Streaming the output of {cmd}...')
 
-    # find the positions of each command in the text
-    for cmd in commands:
-        pos = text.find(cmd)
-        if pos != -1:
-            positions.append((pos, cmd))
+    try:
+        return cmd, await stream_command(conn, cmd, stream_parsers[parser](), spool)
+    except Exception as e:
+        return cmd, {"msg": f"Failed to parse the output from {cmd}","error": f"{e}"}
 
-    # sort the positions to maintain the order in text
-    positions.sort()
 
-    # extract the output of each command
-    for i in range(len(positions)):
-        start = positions[i][0] + len(positions[i][1])  # start of the output
-        end = (
-            positions[i + 1][0] if i + 1 < len(positions) else len(text)
-        )  # end of the output
-        cmd_output = text[start:end].strip()  # extract the output
-        output[positions[i][1]] = cmd_output
+def extract_txt_cmd_output(text: str, commands: list) -> dict:
+    """Extract the output of each show commands from the text file."""
 
-    return output
+    return split_capture(text, commands)
 
 
 async def parse_text_file(device: dict, command_parsers: dict) -> dict:
@@ -79,16 +100,15 @@ async def parse_text_file(device: dict, command_parsers: dict) -> dict:
     path = Path(device["file"])
     filename = path.stem
     logger.info(f'Extracting show commands from {filename} txt file...')
-    async with aiofiles.open(filename, "r") as file:
-        content = await file.read()
-
-    cmd_output = extract_txt_cmd_output(content, command_parsers.keys())
+    # The prompt lines are found in one scan of a memory map of the file, or of its capture_range
+    start, end = device.get("capture_range", (0, None))
+    cmd_output = await asyncio.to_thread(read_capture, path, command_parsers.keys(), False, start, end)
     
     outputs = {}
     parse_output_tasks = []
     for cmd, output in cmd_output.items():
         if cmd in device["commands"]:
-            parse_output_tasks.append(parse_cmd_output(cmd, output, device["cli_output_format"], command_parsers.get(cmd)))
+            parse_output_tasks.append(parse_cmd_output(cmd, output, device["cli_output_format"], command_parsers.get(cmd), device))
 
     parsed_outputs = await asyncio.gather(*parse_output_tasks)
     for cmd, parsed_output in parsed_outputs:
@@ -99,8 +119,79 @@ async def parse_text_file(device: dict, command_parsers: dict) -> dict:
     return {filename: outputs}
 
 
-async def parse_device(device: dict, command_parsers: dict) -> dict:
-    """Establish SSH connection to device, send commands, and parse their output."""
+async def parse_demux_file(device: dict, command_parsers: dict) -> dict:
+    """Parses a session log holding several devices into one result per hostname found in its prompts.
+
+    The OS of each device is taken from its show version output, or is the os_type of the file.
+    """
+
+    path = Path(device["file"])
+    logger.info(f'Extracting the devices and show commands from {path.stem} txt file...')
+    known_commands = {cmd for parsers in command_parsers.values() for cmd in parsers}
+    start, end = device.get("capture_range", (0, None))
+    devices = await asyncio.to_thread(read_capture, path, known_commands, True, start, end)
+
+    hosts = []
+    host_tasks = []
+    for host, cmd_output in devices.items():
+        parsers = command_parsers.get(detect_os_type(cmd_output) or device["os_type"], {})
+        # A terminal log holds the text output whatever cli_output_format is
+        tasks = [parse_cmd_output(cmd, output, "text", parsers[cmd], device) for cmd, output in cmd_output.items() if cmd in parsers and cmd in device["commands"]]
+        if not tasks:
+            logger.info(f'{host} has no known command in {path.stem}, skipping it.')
+            continue
+        hosts.append(host)
+        host_tasks.append(asyncio.gather(*tasks))
+    parsed_hosts = await asyncio.gather(*host_tasks)
+
+    result = {host: dict(parsed_outputs) for host, parsed_outputs in zip(hosts, parsed_hosts)}
+    device["json_data"] = result
+    return result
+
+
+async def fetch_nxapi_outputs(device: dict, command_parsers: dict, nxapi: NXAPIClient, result: dict, captures: list) -> list:
+    """Retrieve the show commands output over NX-API and return the parsing tasks."""
+
+    host = device["address"]
+    cli_output_format = device.get("cli_output_format", "json")
+    logger.info(f"Retrieving show commands output from {host} over NX-API...")
+    hostname_body, *bodies = await nxapi.run_commands(device, ["show hostname", *device["commands"]], cli_output_format)
+    if isinstance(hostname_body, NXAPIError):
+        raise hostname_body
+    device["hostname"] = hostname_body.get("hostname", "") if cli_output_format == "json" else hostname_body.strip()
+    host = f"{device['hostname']}_{host}"
+    result[host] = {}
+
+    capture = device.get("capture", "parsed")
+    if capture == "text" and cli_output_format == "json":
+        texts = await nxapi.run_commands(device, device["commands"], "text")
+    else:
+        texts = [None] * len(bodies)
+
+    parse_output_tasks = []
+    for cmd, body, text in zip(device["commands"], bodies, texts):
+        if isinstance(body, NXAPIError):
+            logger.error(f'Command {cmd} is rejected by NX-API: {body}')
+            result[host].update({cmd: {"output": "", "error": f"{body}"}})
+            continue
+        if cli_output_format == "json":
+            # Parsed from its text like the outputs of SSH, which a parser worker takes cheaper than the decoded body
+            body = serializer.dumps(body).decode()
+        if capture != "none":
+            captures.append((f"{cmd} | json", body) if cli_output_format == "json" else (cmd, body))
+        if isinstance(text, str):
+            captures.append((cmd, text))
+        parse_output_tasks.append(parse_cmd_output(cmd, body, cli_output_format, command_parsers.get(cmd), device))
+    return parse_output_tasks
+
+
+async def parse_device(device: dict, command_parsers: dict, pool: ConnectionPool | None = None, nxapi: NXAPIClient | None = None) -> dict:
+    """Establish SSH connection to device, send commands, and parse their output.
+
+    When a connection pool is given, the device connection is borrowed from it and kept open
+    for the next call instead of being closed. Devices with transport nxapi are queried over
+    NX-API through the given client instead of SSH.
+    """
 
     host = device["address"]
     if "password" not in device:
@@ -108,69 +199,103 @@ async def parse_device(device: dict, command_parsers: dict) -> dict:
 
     cmd_out = {}
     try:
-        if device["os_type"] == "ios":
-            conn = AsyncIOSXEDriver(
-                host=device["address"],
-                auth_username=device["username"],
-                auth_password=device["password"],
-                auth_strict_key=False,
-                transport="asyncssh",
-            )        
-        elif device["os_type"] == "nxos":
-            conn = AsyncNXOSDriver(
-                host=device["address"],
-                auth_username=device["username"],
-                auth_password=device["password"],
-                auth_strict_key=False,
-                transport="asyncssh",
-            )
-        else:
-            raise ValueError(f"Unsupported OS type: {device['os_type']}")
-
-        logger.info(f"Connecting to {host} and retrieving show commands output...")
-        await conn.open()
-
-        hostname_response = await conn.send_command("show hostname")
-        device["hostname"] = hostname_response.result
-        host = f"{hostname_response.result}_{host}"
-        result = {host: {}}
         cli_output_format = device.get("cli_output_format", "json")
         if device['os_type'] == 'ios' and cli_output_format == 'json':
             raise ValueError(f"Cisco IOS does not support JSON output format")
-        
+
+        # "parsed" archives the exact response that was parsed, "text" also fetches the plain
+        # text of each JSON command right after it, "none" skips the raw capture.
+        capture = device.get("capture", "parsed")
+        captures = []
         parse_output_tasks = []
-        for cmd in device["commands"]:
-            if cli_output_format == "json":
-                response = await conn.send_command(f"{cmd} | json")
-                try:
-                    json_resp = json.loads(response.result)
-                    parse_output_tasks.append(parse_cmd_output(cmd, json_resp, cli_output_format, command_parsers.get(cmd)))
-                except json.JSONDecodeError:
-                    logger.error(f'Command {cmd} CLI output is not in JSON format.')
-                    result[host].update({cmd: {"output": response.result, "error": "The CLI output is not in JSON format."}})
-            elif cli_output_format == "text":
-                response = await conn.send_command(cmd)
-                parse_output_tasks.append(parse_cmd_output(cmd, response.result, cli_output_format, command_parsers.get(cmd)))
+
+        if device.get("transport", "ssh") == "nxapi":
+            result = {}
+            if nxapi is None:
+                async with NXAPIClient() as nxapi:
+                    parse_output_tasks = await fetch_nxapi_outputs(device, command_parsers, nxapi, result, captures)
             else:
-                logger.error(f'{host}: NetJect only support cli_output_format in json or text. Have {cli_output_format}.')
-                result[host].update({ "error": f'{host}: NetJect only support cli_output_format in json or text. Have {cli_output_format}.'})
-            
+                parse_output_tasks = await fetch_nxapi_outputs(device, command_parsers, nxapi, result, captures)
+            host = list(result.keys())[0]
+        else:
+            logger.info(f"Connecting to {host} and retrieving show commands output...")
+            async with device_connection(device, pool) as conn:
+                hostname_response = await conn.send_command("show hostname")
+                device["hostname"] = hostname_response.result
+                host = f"{hostname_response.result}_{host}"
+                result = {host: {}}
+
+                # With streaming, the text commands that have a streaming parser are parsed line
+                # by line as their output arrives, so they are never held whole in memory.
+                streamed_cmds = []
+                if device.get("streaming", False) and cli_output_format == "text":
+                    if exec_session(conn) is None:
+                        logger.info("The transport does not support streaming, retrieving whole outputs.")
+                    else:
+                        streamed_cmds = [cmd for cmd in device["commands"] if command_parsers.get(cmd) in stream_parsers]
+
+                # With several channels the commands of the device are fetched concurrently up
+                # front, capped by max_channels, and then handled in their original order.
+                channels = min(device.get("channels", 1), device.get("max_channels", 4))
+                if channels > 1:
+                    wire_cmds = []
+                    for cmd in device["commands"]:
+                        if cmd in streamed_cmds:
+                            continue
+                        if cli_output_format == "json":
+                            wire_cmds.append(f"{cmd} | json")
+                        if cli_output_format == "text" or capture == "text":
+                            wire_cmds.append(cmd)
+                    logger.info(f"Retrieving {len(wire_cmds)} commands from {host} over {channels} channels...")
+                    fetched = dict(zip(wire_cmds, await fan_out_commands(conn, wire_cmds, channels)))
+
+                    async def send(cmd: str) -> str:
+                        return fetched[cmd]
+                else:
+                    async def send(cmd: str) -> str:
+                        return (await conn.send_command(cmd)).result
+
+                for cmd in device["commands"]:
+                    if cli_output_format == "json":
+                        response = await send(f"{cmd} | json")
+                        if capture != "none":
+                            captures.append((f"{cmd} | json", response))
+                        if capture == "text":
+                            captures.append((cmd, await send(cmd)))
+                        # Decoded along with the parsing, off the event loop when the output is large
+                        parse_output_tasks.append(asyncio.create_task(parse_cmd_output(cmd, response, cli_output_format, command_parsers.get(cmd), device)))
+                    elif cmd in streamed_cmds:
+                        spool = None
+                        if capture != "none":
+                            spool = tempfile.TemporaryFile("w+")
+                            captures.append((cmd, spool))
+                        task = asyncio.create_task(stream_cmd_output(cmd, conn, command_parsers.get(cmd), spool))
+                        parse_output_tasks.append(task)
+                        # One streamed command at a time, the parsing already overlaps with the transfer
+                        await task
+                    elif cli_output_format == "text":
+                        response = await send(cmd)
+                        if capture != "none":
+                            captures.append((cmd, response))
+                        # Start parsing right away so it overlaps with retrieving the next command
+                        parse_output_tasks.append(asyncio.create_task(parse_cmd_output(cmd, response, cli_output_format, command_parsers.get(cmd), device)))
+                    else:
+                        logger.error(f'{host}: NetJect only support cli_output_format in json or text. Have {cli_output_format}.')
+                        result[host].update({ "error": f'{host}: NetJect only support cli_output_format in json or text. Have {cli_output_format}.'})
+
         parsed_outputs = await asyncio.gather(*parse_output_tasks)
         for cmd, parsed_output in parsed_outputs:
             cmd_out[cmd] = parsed_output
-        
+
         cmd_out = await finalize_device_output(device, cmd_out)
 
-        # Save outputs to a file
-        for cmd in device["commands"]:
-            response = await conn.send_command(cmd)
-            full_filename = device['output_path'] / f"{host}.txt"
-            logger.info(f'Saving the CLI output of {cmd} to {full_filename}...')
-            with open(f"{full_filename}", "a") as file:
-                file.write(f"{cmd}\n")
-                file.write(f"{response.result}\n")
-    
-        await conn.close()
+        # Save the raw outputs that were captured during the session to a file
+        if captures:
+            full_filename = device['output_path'] / compressed_name(f"{host}.txt", device["compression"])
+            logger.info(f'Saving the CLI output of {len(captures)} commands to {full_filename}...')
+            async with CaptureSink(full_filename, device["compression"]) as sink:
+                for cmd, output in captures:
+                    await sink.write_capture(cmd, output)
 
     except Exception as exc:
         logger.error(f"Error encountered during establishing SSH and parsing for {device['address']}: {exc}")
@@ -182,96 +307,148 @@ async def parse_device(device: dict, command_parsers: dict) -> dict:
     return result
 
 
-async def process_device(device: dict, command_parsers: dict) -> Any:
+async def process_device(device: dict, command_parsers: dict, pool: ConnectionPool | None = None, nxapi: NXAPIClient | None = None) -> Any:
     """Process a single device based on the provided configuration."""
 
     os_type = device["os_type"]
+    if "file" in device and device.get("demux"):
+        return await parse_demux_file(device, command_parsers)
 
     supported_commands = command_parsers.get(os_type, {})
     for cmd in device["commands"]:
         if cmd not in supported_commands:
             raise ValueError(f"Command {cmd} is not supported in {os_type}")
     if "address" in device:
-        return await parse_device(device, supported_commands)
+        return await parse_device(device, supported_commands, pool, nxapi)
     elif "file" in device:
         return await parse_text_file(device, supported_commands)
 
 
-async def write_json(output_path: Path, data: dict):
-    """Asynchronously write data to a JSON file."""
+def json_filename(host: str, json_format: str = "pretty", compression: str = "none") -> str:
+    """Name of the output file of a device."""
 
-    for host, _ in data.items():
-        filename = f"{host}.json"
-    full_filename = output_path / filename
-    logger.info(f'Writing {list(data.keys())[0]} to JSON file {full_filename}...')
-    async with aiofiles.open(str(full_filename), "w") as file:
-        await file.write(json.dumps(data, indent=4))
-
-
-# Function to handle the conversion of lists to strings
-def convert_lists_to_strings(item: list):
-    if isinstance(item, list):
-        return ', '.join(map(str, item))
-    return item
-
-
-# Function to convert nested dictionaries to rows in a DataFrame
-def dict_to_rows(cmd_dict: dict):
-    rows = []
-    for key, value in cmd_dict.items():
-        # Create a row for each key
-        if isinstance(value, dict):
-            # Add the nested key-values as new columns in this row
-            for subkey, subvalue in value.items():
-                row = {'key': key}
-                if isinstance(subvalue, dict):
-                    row.update({'key2': subkey})
-                    row.update({subkey2: convert_lists_to_strings(subvalue2) for subkey2, subvalue2 in subvalue.items()})
-                    rows.append(row)
-                else:
-                    row.update({subkey: convert_lists_to_strings(subvalue) for subkey, subvalue in value.items()})
-                    rows.append(row)
-                    break
-        else:
-            # If the value is not a dictionary, just add the value directly
-            rows.append({'key': key, 'value': convert_lists_to_strings(value)})
-    return pd.DataFrame(rows)
-
-
-# Function to convert JSON data for a show command into a DataFrame
-def json_to_dataframe(data: dict | list):
-    if isinstance(data, dict):
-        # Process the dictionary to create rows
-        return dict_to_rows(data)
-    elif isinstance(data, list):
-        # Process each item in the list to ensure that lists are joined into strings
-        processed_data = [{k: convert_lists_to_strings(v) for k, v in item.items()} for item in data]
-        return pd.DataFrame(processed_data)
-    else:
-        raise ValueError("Data is neither a dictionary nor a list")
+    return compressed_name(f"{host}.ndjson" if json_format == "ndjson" else f"{host}.json", compression)
 
 
-def write_to_excel(output_path: Path, data: dict):
+async def write_blocks(full_filename: Path, chunks, mode: str = "wb", compression: str = "none"):
+    """Write the chunks to a file in blocks, compressing them on the way when asked."""
 
-    device_name = list(data.keys())[0]
-    full_filename = output_path / f"{device_name}.xlsx"
+    stream = compressor(compression)
+    async with aiofiles.open(str(full_filename), mode) as file:
+        for block in serializer.buffered(chunks):
+            await file.write(stream.compress(block) if stream else block)
+        if stream:
+            await file.write(stream.flush())
 
-    # Create a new Excel writer object for this device
-    logger.info(f'Writing {list(data.keys())[0]} to Excel {full_filename}...')
-    with pd.ExcelWriter(f'{full_filename}', engine='openpyxl') as writer:
-        for commands in data.values():
-            # Iterate over each show command for the device
-            for command_name, command_data in commands.items():
-                # Convert the command data to a DataFrame
-                df = json_to_dataframe(command_data)
-                sheet_name = command_name[:31]
-                # Write the DataFrame to a new sheet in the Excel file
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
 
+async def write_json(output_path: Path, data: dict, json_format: str = "pretty", compression: str = "none"):
+    """Asynchronously write data to a JSON file, pretty, compact or as NDJSON (one line per table row).
 
-async def process_and_write(device: dict, command_parsers: dict):
-    try:
+    The document is encoded, compressed and written one command at a time instead of as a whole.
+    """
+
+    for host, _ in data.items():
+        filename = json_filename(host, json_format, compression)
+    full_filename = output_path / filename
+    logger.info(f'Writing {list(data.keys())[0]} to JSON file {full_filename}...')
+    chunks = serializer.iter_ndjson(data) if json_format == "ndjson" else serializer.iter_document(data, json_format == "pretty")
+    await write_blocks(full_filename, chunks, "wb", compression)
+
+
+def update_ndjson(full_filename: Path, host: str, outputs: dict, compression: str = "none"):
+    """Rewrite an NDJSON file with the records of outputs in place of the older records of the same commands."""
+
+    kept = []
+    if full_filename.is_file():
+        with open(full_filename, "rb") as file:
+            lines = decompress(file.read(), compression).splitlines(keepends=True)
+        kept = [line for line in lines if line.strip() and serializer.loads(line).get("command") not in outputs]
+    stream = compressor(compression)
+    with open(full_filename, "wb") as file:
+        for block in serializer.buffered(itertools.chain(kept, serializer.iter_ndjson({host: outputs}))):
+            file.write(stream.compress(block) if stream else block)
+        if stream:
+            file.write(stream.flush())
+
+
+async def update_json(output_path: Path, data: dict, json_format: str = "pretty", compression: str = "none") -> dict:
+    """Merge the commands of data into the JSON files written by write_json and return the merged data.
+
+    NDJSON files keep their lines of the other commands and get the records of data in place of the
+    older records of the same commands.
+    """
+
+    if json_format == "ndjson":
+        for host, outputs in data.items():
+            # Reading, decoding and rewriting the whole file would stall the event loop
+            await asyncio.to_thread(update_ndjson, output_path / json_filename(host, json_format, compression), host, outputs, compression)
+        return data
+
+    merged = {}
+    for host, outputs in data.items():
+        full_filename = output_path / json_filename(host, json_format, compression)
+        merged[host] = {}
+        if full_filename.is_file():
+            async with aiofiles.open(str(full_filename), "rb") as file:
+                merged[host] = serializer.loads(decompress(await file.read(), compression)).get(host, {})
+        merged[host].update(outputs)
+        await write_json(output_path, {host: merged[host]}, json_format, compression)
+    return merged
+
+
+async def store_snapshot(config: dict, results: list) -> dict:
+    """Add the parsed outputs of a run to the snapshot store and log which devices changed."""
+
+    store = SnapshotStore(config["snapshot_store"], config.get("compression", "none"))
+    manifest = await asyncio.to_thread(store.commit, [result for result in results if isinstance(result, dict)])
+    for host, commands in manifest["changed"].items():
+        logger.info(f'{host}: {len(commands)} of {len(manifest["devices"][host])} commands changed since the last snapshot.')
+    logger.info(f'Stored snapshot {manifest["run"]} of {len(manifest["devices"])} devices in {store.root}, {len(manifest["changed"])} changed.')
+    return manifest
+
+
+async def watch_directory(config: dict, command_parsers: dict):
+    """Parse the capture files arriving in input_dir, and the lines appended to them, until cancelled."""
+
+    input_dir = Path(config["input_dir"])
+    output_root = Path(config.get("output_path", Path.cwd()))
+
+    async def ingest(path: Path, start: int, end: int):
+        relative = path.relative_to(input_dir)
+        file_device = {"file": str(path), "capture_range": (start, end), "output_path": output_root / relative.parent}
+        device = (await load_configuration({**config, "devices": [file_device]}))["devices"][0]
         output = await process_device(device, command_parsers)
+        output = {host: outputs for host, outputs in output.items() if outputs}
+        if output:
+            device["output_path"].mkdir(parents=True, exist_ok=True)
+            merged = await update_json(device["output_path"], output, device["json_format"], device["compression"])
+            if device.get("excel"):
+                await asyncio.to_thread(write_to_excel, merged, device["output_path"])
+            if device.get("sqlite_db"):
+                # Only the commands parsed now have their rows replaced
+                await get_fleet_db(device["sqlite_db"]).store(output)
+            if device.get("parquet_path"):
+                # A watched folder has no end of run to batch up to
+                sink = get_parquet_sink(device["parquet_path"], device["parquet_batch_rows"])
+                await sink.write(output)
+                await asyncio.to_thread(sink.flush)
+        logger.info(f'Ingested bytes {start}-{end} of {relative}.')
+
+    watcher = CaptureWatcher(
+        input_dir,
+        config.get("input_glob", "**/*.txt"),
+        state_path=output_root / STATE_FILENAME,
+        poll_interval=config.get("poll_interval", 2.0),
+        queue_size=config.get("watch_queue_size", 100),
+        workers=config.get("parser_workers") or os.cpu_count() or 1,
+    )
+    logger.info(f'Watching {input_dir} for capture files...')
+    await watcher.run(ingest)
+
+
+async def process_and_write(device: dict, command_parsers: dict, pool: ConnectionPool | None = None, nxapi: NXAPIClient | None = None):
+    try:
+        output = await process_device(device, command_parsers, pool, nxapi)
     except Exception as e:
         name = device["address"] if "address" in device else device["file"]
         output = {name:{"msg": f"Failed to process device {name}", "error": f"{e}"}}
@@ -279,9 +456,18 @@ async def process_and_write(device: dict, command_parsers: dict):
     if not output.keys():
         logger.error(f'Found no key from parsing result of {device["host"] if "host" in device else device["file"]}')
     elif list(output.keys())[0]:
-        await write_json(device["output_path"], output)
-        if device.get("excel"):
-            write_to_excel(device["output_path"], output)
+        # A demultiplexed session log gives one result per device
+        for host, host_output in output.items():
+            # The snapshot store replaces the JSON files, snapshot_store.py --checkout writes them back
+            if not device.get("snapshot_store"):
+                await write_json(device["output_path"], {host: host_output}, device["json_format"], device["compression"])
+            if device.get("sqlite_db"):
+                await get_fleet_db(device["sqlite_db"]).store({host: host_output})
+            if device.get("parquet_path"):
+                await get_parquet_sink(device["parquet_path"], device["parquet_batch_rows"]).write({host: host_output})
+            if device.get("excel"):
+                # Off the event loop, so the SSH sessions in flight keep going
+                await asyncio.to_thread(write_to_excel, {host: host_output}, device["output_path"])
     return output
 
 
@@ -324,6 +510,19 @@ async def load_configuration(args_dict: dict) -> dict:
             "show run interface",
         ]
 
+    if args_dict.get("watch"):
+        if not args_dict.get("input_dir"):
+            raise ValueError(f"watch needs the input_dir to watch")
+        args_dict.setdefault("devices", [])
+    if args_dict.get("input_dir") and not args_dict.get("watch"):
+        # Every capture under input_dir is a file device, whose outputs mirror the folders of the capture
+        input_dir = Path(args_dict["input_dir"])
+        output_root = Path(args_dict.get("output_path", Path.cwd()))
+        args_dict["devices"] = [device for device in args_dict.get("devices", []) if "index_key" not in device]
+        for path in find_capture_files(input_dir, args_dict.get("input_glob", "**/*.txt")):
+            relative = path.relative_to(input_dir)
+            args_dict["devices"].append({"file": str(path), "output_path": output_root / relative.parent, "index_key": relative.as_posix()})
+
     for device in args_dict["devices"]:
         if "address" not in device and "file" not in device:
             raise ValueError(f"No 'address' or 'file' key is found in {device}")
@@ -341,11 +540,57 @@ async def load_configuration(args_dict: dict) -> dict:
                 raise ValueError(f"Cisco IOS does not support JSON output format")
         if "output_path" not in device:
             device["output_path"] = Path(args_dict.get("output_path", Path.cwd()))
+        if "json_format" not in device:
+            device["json_format"] = args_dict.get("json_format", "pretty")
+        if device["json_format"] not in ("pretty", "compact", "ndjson"):
+            raise ValueError(f"Unsupported json_format {device['json_format']}. Use pretty, compact or ndjson.")
+        if "compression" not in device:
+            device["compression"] = args_dict.get("compression", "none")
+        check_compression(device["compression"])
         if "excel" not in device:
             device["excel"] = args_dict.get("excel", False)
+        if "sqlite_db" not in device and args_dict.get("sqlite_db"):
+            device["sqlite_db"] = args_dict["sqlite_db"]
+        if args_dict.get("snapshot_store"):
+            device["snapshot_store"] = args_dict["snapshot_store"]
+        if "parquet_path" not in device and args_dict.get("parquet_path"):
+            device["parquet_path"] = args_dict["parquet_path"]
+        if device.get("parquet_path"):
+            check_parquet()
+            device.setdefault("parquet_batch_rows", args_dict.get("parquet_batch_rows", 250000))
+        if "transport" not in device:
+            device["transport"] = args_dict.get("transport", "ssh")
+        if device["transport"] not in ("ssh", "nxapi"):
+            raise ValueError(f"Unsupported transport {device['transport']}. Use ssh or nxapi.")
+        if device["transport"] == "nxapi" and device["os_type"] != "nxos" and "address" in device:
+            raise ValueError(f"NX-API transport is only supported for nxos devices")
+        for key in ("nxapi_scheme", "nxapi_port", "nxapi_verify", "nxapi_batch_size"):
+            if key not in device and key in args_dict:
+                device[key] = args_dict[key]
+        for key in ("channels", "max_channels"):
+            if key not in device and key in args_dict:
+                device[key] = args_dict[key]
+        if "parser_executor" not in device:
+            device["parser_executor"] = args_dict.get("parser_executor", "process")
+        if device["parser_executor"] not in ("process", "thread", "inline"):
+            raise ValueError(f"Unsupported parser_executor {device['parser_executor']}. Use process, thread or inline.")
+        for key in ("parser_workers", "parser_inline_threshold"):
+            if key not in device and key in args_dict:
+                device[key] = args_dict[key]
+        if "capture" not in device:
+            device["capture"] = args_dict.get("capture", "parsed")
+        if device["capture"] not in ("parsed", "text", "none"):
+            raise ValueError(f"Unsupported capture mode {device['capture']}. Use parsed, text or none.")
+        if "streaming" not in device:
+            device["streaming"] = args_dict.get("streaming", False)
+        if "demux" not in device:
+            device["demux"] = args_dict.get("demux", False)
         if "commands" not in device:
             if "commands" not in args_dict:
-                if device["os_type"] == "nxos":
+                if device["demux"] and "file" in device:
+                    # The OS of each device of the session log is only known once it is parsed
+                    device["commands"] = list(dict.fromkeys(nxos_cmds_default + ios_cmds_default))
+                elif device["os_type"] == "nxos":
                     device["commands"] = nxos_cmds_default
                 elif device["os_type"] == "ios":
                     device["commands"] = ios_cmds_default
@@ -369,7 +614,34 @@ def parse_args():
     parser.add_argument('--commands', nargs='*', help='List of commands to execute.')
     parser.add_argument('--addresses', nargs='*', help='List of device addresses.')
     parser.add_argument('--files', nargs='*', help='List of files with device\'s show commands CLI output.')
+    parser.add_argument('--input_dir', type=str, help='Folder of capture files to parse in worker processes. Files already parsed with the same content are skipped.')
+    parser.add_argument('--input_glob', type=str, help='Glob of the capture files under input_dir. Default **/*.txt.')
+    parser.add_argument('--watch', action='store_true', help='Keep polling input_dir and parse the new capture files and the lines appended to them as they arrive.')
+    parser.add_argument('--poll_interval', type=float, help='Seconds between two polls of input_dir in watch mode. Default 2.')
+    parser.add_argument('--watch_queue_size', type=int, help='Maximum number of files waiting to be parsed in watch mode. Default 100.')
+    parser.add_argument('--force', action='store_true', help='Parse every file of input_dir again, even when its outputs are up to date.')
+    parser.add_argument('--json_format', type=str, choices=['pretty', 'compact', 'ndjson'], help='Layout of the JSON output files. (pretty | compact | ndjson). ndjson writes <host>.ndjson with one line per table row. Default pretty.')
+    parser.add_argument('--compression', type=str, choices=['none', 'gzip', 'zstd'], help='Compression of the JSON and raw capture output files, which get a .gz or .zst suffix. (none | gzip | zstd). zstd needs the zstandard package. Default none.')
+    parser.add_argument('--snapshot_store', type=str, help='Folder of a content-addressed store that keeps every distinct command output once, with a manifest per run, instead of the JSON files.')
+    parser.add_argument('--sqlite_db', type=str, help='SQLite database that the parsed interfaces, VLANs, ARP, MAC, routes and CDP neighbors are also upserted into, one indexed table per command family.')
+    parser.add_argument('--parquet_path', type=str, help='Folder of a Parquet dataset that the flattened rows of every command are written to, partitioned by command and date. Needs pyarrow.')
+    parser.add_argument('--parquet_batch_rows', type=int, help='Rows of a command buffered across devices before they are written to a Parquet file. Default 250000.')
+    parser.add_argument('--json_backend', type=str, choices=['auto', 'orjson', 'json'], help='JSON library. (auto | orjson | json). auto uses orjson when it is installed. Default auto.')
     parser.add_argument('--excel', action='store_true', help='Write data to Excel.')
+    parser.add_argument('--transport', type=str, choices=['ssh', 'nxapi'], help='How to reach live devices. (ssh | nxapi). nxapi sends the commands of a device as batched NX-API requests.')
+    parser.add_argument('--max_concurrency', type=int, help='Maximum number of devices processed at the same time. Default 100.')
+    parser.add_argument('--group_by', type=str, help='Device key used to group devices, e.g. site or jump_host, for per-group limits and fair queueing.')
+    parser.add_argument('--group_max_concurrency', type=int, help='Maximum number of devices of the same group processed at the same time.')
+    parser.add_argument('--login_rate', type=float, help='Maximum number of device logins started per second.')
+    parser.add_argument('--login_burst', type=int, help='Number of logins allowed to start at once before login_rate applies. Default 1.')
+    parser.add_argument('--channels', type=int, help='Number of SSH channels used to send the commands of a device concurrently. Default 1.')
+    parser.add_argument('--max_channels', type=int, help='Upper bound of channels per device, to protect fragile supervisors. Default 4.')
+    parser.add_argument('--parser_executor', type=str, choices=['process', 'thread', 'inline'], help='Where large text outputs are parsed. (process | thread | inline). Default process.')
+    parser.add_argument('--parser_workers', type=int, help='Number of parser workers. Default is the number of CPU cores.')
+    parser.add_argument('--parser_inline_threshold', type=int, help='Outputs shorter than this many characters are parsed inline. Default 262144.')
+    parser.add_argument('--streaming', action='store_true', help='Parse the route, MAC and ARP text outputs while they are received instead of after.')
+    parser.add_argument('--demux', action='store_true', help='Text files are session logs of several devices, split by the hostname of their prompts into one JSON per device.')
+    parser.add_argument('--capture', type=str, choices=['parsed', 'text', 'none'], help='Raw CLI output saved to <host>.txt. (parsed | text | none). parsed saves the responses that were parsed, text also fetches the plain text of JSON commands in the same pass.')
 
     args = parser.parse_args()
 
@@ -393,7 +665,7 @@ def parse_args_NetJect(args) -> dict:
         else:
             logger.error(f"Path {args.config} not found.")
             raise ValueError(f"NetJect-config.yaml file is not found in {config_path}.")
-    elif args.addresses or args.files:
+    elif args.addresses or args.files or args.input_dir:
         # Convert arguments to a dictionary, removing any None values
         args_dict = {k: v for k, v in vars(args).items() if v is not None}
         args_dict["devices"] = []
@@ -410,13 +682,19 @@ def parse_args_NetJect(args) -> dict:
             logger.error(f"Path to the NetJect-config.yaml configuration file is not provided or NetJect-config.yaml file is not found in current working directory.")
             raise ValueError(f"Path to the NetJect-config.yaml configuration file is not provided or NetJect-config.yaml file is not found in current working directory.")
 
-    if "devices" not in args_dict or len(args_dict["devices"]) == 0:
+    if ("devices" not in args_dict or len(args_dict["devices"]) == 0) and not args_dict.get("input_dir"):
         raise ValueError(f"No devices are provided.")
     
     return args_dict
 
 
-async def NetJect(args_dict: dict) -> dict:
+async def NetJect(args_dict: dict, pool: ConnectionPool | None = None, nxapi: NXAPIClient | None = None) -> dict:
+    """Parse every configured device or file.
+
+    Pass a ConnectionPool and an NXAPIClient to keep SSH sessions and NX-API HTTP connections
+    open across calls, e.g. between monitoring cycles. The files found under input_dir are
+    returned as ingestion summaries, their parsed data is only written to output_path.
+    """
 
     # command_parsers based on the OS type
     command_parsers = {
@@ -458,16 +736,54 @@ async def NetJect(args_dict: dict) -> dict:
     }
 
     config = await load_configuration(args_dict)
-
-    tasks = []
-    if "devices" in config:
-        for device in config["devices"]:
-            tasks.append(process_and_write(device, command_parsers))
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    serializer.set_backend(config.get("json_backend", "auto"))
+    if config.get("watch"):
+        await watch_directory(config, command_parsers)
+        return []
+
+    # NX-API devices of this run share the HTTP connections of one client
+    owns_nxapi = nxapi is None
+    if owns_nxapi:
+        nxapi = NXAPIClient()
+
+    # Bound how many devices are worked on at once instead of starting them all together
+    scheduler = FleetScheduler(
+        max_concurrency=config.get("max_concurrency", 100),
+        group_by=config.get("group_by"),
+        group_limits=config.get("group_limits"),
+        group_max_concurrency=config.get("group_max_concurrency"),
+        login_rate=config.get("login_rate"),
+        login_burst=config.get("login_burst", 1),
+    )
+    # The files found under input_dir are parsed in worker processes instead of on the event loop
+    ingested = [device for device in config.get("devices", []) if "index_key" in device]
+    devices = [device for device in config.get("devices", []) if "index_key" not in device]
+    try:
+        results = await scheduler.run(devices, lambda device: process_and_write(device, command_parsers, pool, nxapi))
+        if config.get("snapshot_store"):
+            await store_snapshot(config, results)
+        # The rows of the last devices are still buffered
+        await asyncio.to_thread(flush_parquet_sinks)
+        if ingested:
+            results += await ingest_files(ingested, command_parsers, Path(config.get("output_path", Path.cwd())), config.get("parser_workers"),
+                                          force=config.get("force", False), report=logger.info)
+    finally:
+        if owns_nxapi:
+            await nxapi.close()
+
+    for device in config.get("devices", []):
+        if "queue_wait" in device:
+            logger.info(f'{device.get("address", device.get("file"))} waited {device["queue_wait"]:.2f}s in queue.')
+    summary = FleetScheduler.queue_wait_summary(config.get("devices", []))
+    if summary:
+        logger.info(f'Processed {summary} in {scheduler.elapsed:.2f}s.')
+    else:
+        logger.info("No device was scheduled.")
     outputs = []
     for result in results:
-        if isinstance(result, Exception):
-            print(f"Error encountered during task: {result}")
+        # A job cancelled under the scheduler gives a CancelledError, which is not an Exception
+        if isinstance(result, BaseException):
+            print(f"Error encountered during task: {str(result) or type(result).__name__}")
         else:
             outputs.append(result)
     return outputs
@@ -498,4 +814,8 @@ if __name__ == "__main__":
     logger.setLevel(logging.INFO)  # Set logger to only pass INFO messages and above
     args = parse_args()
     args_dict = parse_args_NetJect(args)
-    outputs = asyncio.run(NetJect(args_dict))
+    try:
+        outputs = asyncio.run(NetJect(args_dict))
+    finally:
+        shutdown_parser_executors()
+        close_fleet_dbs()
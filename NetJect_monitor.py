@@ -1,9 +1,13 @@
 # flake8: noqa E501
 import json
 import asyncio
+import serializer
 import aioping
-from deepdiff import DeepDiff
 from NetJect import NetJect, parse_args_NetJect, load_configuration
+from connection_pool import ConnectionPool
+from nxapi import NXAPIClient
+from compressed_io import find_files, open_compressed
+from state_diff import diff_state, format_change
 import logging
 from pathlib import Path
 import argparse
@@ -40,10 +44,10 @@ async def ping_device(device: dict) -> bool:
         return False
 
 
-# Compare JSON configurations
+# Compare JSON configurations, command by command and record by record
 def compare_json(old_config: dict, new_config: dict):
     try:
-        return DeepDiff(old_config, new_config, ignore_order=True).pretty()
+        return diff_state(old_config, new_config)
     except Exception as e:
         logger.error(f"An error occurred while comparing JSON data: {str(e)}")
         return None
@@ -54,8 +58,8 @@ def load_original_state(file_list):
     data_list = []
     for file_path in file_list:
         try:
-            with open(file_path, 'r') as file:
-                data = json.load(file)
+            with open_compressed(file_path, 'rb') as file:
+                data = serializer.load(file)
                 data_list.append(data)
         except json.JSONDecodeError as e:
             logger.error(f"JSON decode error in file {file_path}: {str(e)}")
@@ -67,7 +71,7 @@ def load_original_state(file_list):
 
 
 # Process each device
-async def process_device(device: dict):
+async def process_device(device: dict, pool: ConnectionPool, nxapi: NXAPIClient):
     just_up = False
     while True:
         try:
@@ -76,14 +80,15 @@ async def process_device(device: dict):
                     await asyncio.sleep(3)
                     just_up = False
 
-                current_state = await NetJect({"devices": [device]})
+                current_state = await NetJect({"devices": [device]}, pool=pool, nxapi=nxapi)
                 current_state = current_state[0]
                 hostname = list(current_state.keys())[0]
                 diff = compare_json(device["original_state"], current_state)
                 if diff:
-                    logger.info(f"{hostname} state has been changed:\n{diff}")
+                    lines = [format_change(change) for change in diff]
+                    logger.info(f"{hostname} state has been changed:\n" + "\n".join(lines))
                     res = {"device_ip": device.get("address", "No address found in device config"), "device": hostname, "status": "Up"}
-                    res.update({"diffs": ["State has been changed.", diff]})
+                    res.update({"diffs": ["State has been changed.", *lines]})
                     res.update({"time_checked": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime())})
                 else:
                     logger.info(f"{hostname} state has no changed.")
@@ -102,23 +107,29 @@ async def process_device(device: dict):
         except Exception as e:
             logger.error(f"An error occurred during processing device {device['address']}: {str(e)}")
         finally:
-            socketio.emit('device_update', json.dumps(res))
+            socketio.emit('device_update', serializer.dumps(res).decode())
             await asyncio.sleep(3)  # Sleep before next round
 
 
 # Monitoring loop for all devices
 async def monitor_devices(devices):
+    # SSH sessions and NX-API connections stay open between polling cycles, so only the first
+    # cycle pays for the login
+    pool = ConnectionPool()
+    nxapi = NXAPIClient()
     try:
-        tasks = [process_device(device) for device in devices]
+        tasks = [process_device(device, pool, nxapi) for device in devices]
         await asyncio.gather(*tasks)
     except Exception as e:
         logger.error(f"{e}")
+    finally:
+        await pool.close()
+        await nxapi.close()
 
 
-# Find all JSON files in the directory
+# Find all JSON files in the directory, plain or compressed
 def find_json_files(directory):
-    path = Path(directory)
-    return list(path.rglob('*.json'))
+    return find_files(directory, '*.json')
 
 
 # Argument parsing
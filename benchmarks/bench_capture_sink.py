@@ -0,0 +1,117 @@
+# flake8: noqa E501
+"""Wall time and longest event loop stall of many devices saving their raw captures at once to a
+slow filesystem, e.g. an NFS mounted output_path.
+
+The filesystem is simulated by a file whose open, write and close each block for a fixed
+latency. "per_command" opens, writes and closes the capture file on the event loop for every
+command, "per_device" once per device with a write per line, the way parse_device wrote it
+before, and "sink" goes through CaptureSink.
+
+    python benchmarks/bench_capture_sink.py --devices 200 --commands 20 --latency 0.002
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from capture_sink import CaptureSink  # noqa: E402
+
+
+class SlowFile:
+    """A file whose open, writes and close each take latency seconds, blocking the calling thread."""
+
+    def __init__(self, path, mode: str, latency: float):
+        time.sleep(latency)
+        self.latency = latency
+        self.file = open(path, mode)
+
+    def write(self, data):
+        time.sleep(self.latency)
+        return self.file.write(data)
+
+    def close(self):
+        time.sleep(self.latency)
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def captures(commands: int, size: int) -> list:
+    output = ("Ethernet1/1 is up\n" * (size // 18 + 1))[:size]
+    return [(f"show command {i}", output) for i in range(commands)]
+
+
+async def per_command(path: Path, device_captures: list, latency: float):
+    for cmd, output in device_captures:
+        with SlowFile(path, "a", latency) as file:
+            file.write(f"{cmd}\n")
+            file.write(f"{output}\n")
+        # The next command arrives from the device
+        await asyncio.sleep(0)
+
+
+async def per_device(path: Path, device_captures: list, latency: float):
+    with SlowFile(path, "a", latency) as file:
+        for cmd, output in device_captures:
+            file.write(f"{cmd}\n")
+            file.write(f"{output}\n")
+
+
+async def sink(path: Path, device_captures: list, latency: float):
+    async with CaptureSink(path, opener=lambda path, mode: SlowFile(path, mode, latency)) as capture_sink:
+        for cmd, output in device_captures:
+            await capture_sink.write_capture(cmd, output)
+
+
+async def run(writer, devices: int, device_captures: list, latency: float, directory: Path) -> tuple:
+    stall = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal stall
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            stall = max(stall, now - last)
+            last = now
+
+    task = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await asyncio.gather(*(writer(directory / f"device{i}.txt", device_captures, latency) for i in range(devices)))
+    elapsed = time.perf_counter() - start
+    done = True
+    await task
+    return elapsed, stall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark writing raw captures to a slow filesystem.")
+    parser.add_argument("--devices", type=int, default=200)
+    parser.add_argument("--commands", type=int, default=20)
+    parser.add_argument("--output_size", type=int, default=20000, help="Characters of each command output.")
+    parser.add_argument("--latency", type=float, default=0.002, help="Seconds of every open, write and close.")
+    args = parser.parse_args()
+
+    device_captures = captures(args.commands, args.output_size)
+    print(f"{'writer':<14}{'wall time (s)':>15}{'loop stall (ms)':>17}")
+    sizes = {}
+    for name, writer in (("per_command", per_command), ("per_device", per_device), ("sink", sink)):
+        with tempfile.TemporaryDirectory() as directory:
+            elapsed, stall = asyncio.run(run(writer, args.devices, device_captures, args.latency, Path(directory)))
+            sizes[name] = sum(path.stat().st_size for path in Path(directory).iterdir())
+        print(f"{name:<14}{elapsed:>15.2f}{stall * 1000:>17.1f}")
+    if len(set(sizes.values())) != 1:
+        raise SystemExit(f"The writers wrote different amounts: {sizes}")
+
+
+if __name__ == "__main__":
+    main()
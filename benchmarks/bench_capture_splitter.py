@@ -0,0 +1,78 @@
+# flake8: noqa E501
+"""Time and peak memory of splitting a session log into command outputs.
+
+"legacy" reads the whole file and runs text.find() once per known command, the way
+extract_txt_cmd_output used to. "splitter" scans a memory map of the file for prompt lines once.
+
+    python benchmarks/bench_capture_splitter.py --interfaces 20000 --routes 200000
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import synthetic  # noqa: E402
+from capture_splitter import read_capture  # noqa: E402
+
+
+COMMANDS = ["show version", "show interface", "show interface status", "show interface trunk", "show vlan", "show cdp neighbor",
+            "show ip arp", "show mac address-table", "show ip route", "show run interface"]
+
+
+def legacy_read_capture(path: Path, commands: list) -> dict:
+    text = path.read_text()
+    output = {}
+    positions = []
+    for cmd in commands:
+        pos = text.find(cmd)
+        if pos != -1:
+            positions.append((pos, cmd))
+    positions.sort()
+    for i in range(len(positions)):
+        start = positions[i][0] + len(positions[i][1])
+        end = positions[i + 1][0] if i + 1 < len(positions) else len(text)
+        output[positions[i][1]] = text[start:end].strip()
+    return output
+
+
+def measure(function, path: Path, commands: list) -> tuple:
+    tracemalloc.start()
+    start = time.perf_counter()
+    output = function(path, commands)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark splitting a capture file into command outputs.")
+    parser.add_argument("--interfaces", type=int, default=20000)
+    parser.add_argument("--routes", type=int, default=200000)
+    parser.add_argument("--commands", type=int, default=len(COMMANDS), help="How many known commands to look for.")
+    args = parser.parse_args()
+
+    # Only "show ip route" is kept by the parsers, the rest is output the splitter has to skip
+    sections = {
+        "show interface": synthetic.ios_show_interface(args.interfaces),
+        "show mac address-table": synthetic.ios_show_mac_address_table(args.routes),
+        "show ip route": synthetic.ios_show_ip_route(args.routes),
+    }
+    path = Path(tempfile.mkdtemp()) / "capture.txt"
+    path.write_text(synthetic.ios_capture("switch", sections))
+    commands = ["show ip route"] + [cmd for cmd in COMMANDS if cmd != "show ip route"][:args.commands - 1]
+    print(f"{path.stat().st_size / 1e6:.1f} MB capture, {len(commands)} known commands")
+
+    print(f"{'splitter':<10}{'seconds':>10}{'peak MB':>10}")
+    for name, function in (("legacy", legacy_read_capture), ("splitter", read_capture)):
+        elapsed, peak, output = measure(function, path, commands)
+        print(f"{name:<10}{elapsed:>10.3f}{peak / 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# flake8: noqa E501
+"""Rows per second of the column table parsers against the per-line parsers they replaced.
+
+The ARP and MAC table parsers keep their single regex per row, which CPython runs faster than
+slicing six columns, so only the interface status tables use the engine.
+
+    python benchmarks/bench_column_table.py --rows 10000 100000
+"""
+import argparse
+import logging
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import synthetic  # noqa: E402
+from ios_parser import parse_ios_show_interface_status  # noqa: E402
+from nxos_parser import parse_nxos_show_interface_status  # noqa: E402
+
+
+def legacy_parse_ios_show_interface_status(cli_output: str) -> dict:
+    """show interface status before the column table engine."""
+
+
+    interfaces = {}
+    try:
+        regex_map = {
+            "interface_status_header": r"Port\s+Name\s+Status\s+Vlan\s+Duplex\s+Speed\s+Type",
+            "separator_line": r"^-+"
+        }
+
+        lines = cli_output.split("\n")
+
+        # Identify header and column start indices
+        header_line = None
+        for line in lines:
+            if re.search(regex_map["interface_status_header"], line):
+                header_line = line
+                break
+
+        if not header_line:
+            logging.error("Header line not found!")
+            return {"msg":"Header line not found!"}
+
+        col_starts = {
+            "Port": header_line.index("Port"),
+            "Name": header_line.index("Name"),
+            "Status": header_line.index("Status"),
+            "Vlan": header_line.index("Vlan"),
+            "Duplex": header_line.index("Duplex"),
+            "Speed": header_line.index("Speed"),
+            "Type": header_line.index("Type")
+        }
+
+        for line in lines:
+            if re.search(regex_map["interface_status_header"], line):
+                continue
+            if re.search(regex_map["separator_line"], line):
+                continue
+            port = line[col_starts["Port"]:col_starts["Name"]].strip()
+            name = line[col_starts["Name"]:col_starts["Status"]].strip()
+            status = line[col_starts["Status"]:col_starts["Vlan"]].strip()
+            vlan = line[col_starts["Vlan"]:col_starts["Duplex"]].strip()
+            duplex = line[col_starts["Duplex"]:col_starts["Speed"]].strip()
+            speed = line[col_starts["Speed"]:col_starts["Type"]].strip()
+            int_type = line[col_starts["Type"]:].strip()
+
+            if port:  # If port value exists, then add to the dictionary
+                interfaces[port] = {
+                    "name": name,
+                    "status": status,
+                    "vlan": vlan,
+                    "duplex": duplex,
+                    "speed": speed,
+                    "type": int_type,
+                }
+
+        attributes = ["name","status","vlan","duplex","speed","type"]
+        for attr in attributes:
+            for interface, values in interfaces.items():
+                if attr not in values:
+                    interfaces[interface][attr] = ""
+                
+    except Exception as e:
+        interfaces["error"] = f"{e}"
+
+    return interfaces
+
+
+def best_of(parsers: list, output: str, repeat: int) -> list:
+    """Best time of each parser, with their runs interleaved so they see the same machine load."""
+
+    times = [[] for _ in parsers]
+    for _ in range(repeat):
+        for parser, parser_times in zip(parsers, times):
+            start = time.perf_counter()
+            parser(output)
+            parser_times.append(time.perf_counter() - start)
+    return [min(parser_times) for parser_times in times]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the column table engine.")
+    parser.add_argument("--rows", type=int, nargs="*", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # The NXOS parser was the same code as the IOS one
+    cases = [
+        ("ios show interface status", legacy_parse_ios_show_interface_status, parse_ios_show_interface_status),
+        ("nxos show interface status", legacy_parse_ios_show_interface_status, parse_nxos_show_interface_status),
+    ]
+    print(f"{'command':<28}{'rows':>9}{'legacy rows/s':>15}{'table rows/s':>15}{'speed-up':>10}")
+    for name, legacy, current in cases:
+        for count in args.rows:
+            output = synthetic.ios_show_interface_status(count)
+            if legacy(output) != current(output):
+                raise SystemExit(f"{name}: the parsers give different results")
+            legacy_time, current_time = best_of([legacy, current], output, args.repeat)
+            print(f"{name:<28}{count:>9}{count / legacy_time:>15,.0f}{count / current_time:>15,.0f}{legacy_time / current_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
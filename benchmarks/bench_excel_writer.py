@@ -0,0 +1,139 @@
+# flake8: noqa E501
+"""Time and peak memory of writing the Excel workbook of archive/3k.json, with the pandas
+DataFrame writer it replaced and with the write-only streaming writer, and the longest stall of
+an event loop while the workbook is written.
+
+    python benchmarks/bench_excel_writer.py --repeat 3
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd  # noqa: E402
+import serializer  # noqa: E402
+from openpyxl import load_workbook  # noqa: E402
+from excel_writer import convert_lists_to_strings, write_to_excel  # noqa: E402
+
+
+ARCHIVE = Path(__file__).resolve().parent.parent / "archive" / "3k.json"
+
+
+def legacy_dict_to_rows(cmd_dict):
+    rows = []
+    for key, value in cmd_dict.items():
+        if isinstance(value, dict):
+            for subkey, subvalue in value.items():
+                row = {'key': key}
+                if isinstance(subvalue, dict):
+                    row.update({'key2': subkey})
+                    row.update({subkey2: convert_lists_to_strings(subvalue2) for subkey2, subvalue2 in subvalue.items()})
+                    rows.append(row)
+                else:
+                    row.update({subkey: convert_lists_to_strings(subvalue) for subkey, subvalue in value.items()})
+                    rows.append(row)
+                    break
+        else:
+            rows.append({'key': key, 'value': convert_lists_to_strings(value)})
+    return pd.DataFrame(rows)
+
+
+def legacy_json_to_dataframe(data):
+    if isinstance(data, dict):
+        return legacy_dict_to_rows(data)
+    elif isinstance(data, list):
+        return pd.DataFrame([{k: convert_lists_to_strings(v) for k, v in item.items()} for item in data])
+    raise ValueError("Data is neither a dictionary nor a list")
+
+
+def legacy_write_to_excel(data: dict, output_path: Path) -> Path:
+    """write_to_excel before it streamed, one pandas DataFrame per command."""
+
+    full_filename = output_path / f"{list(data.keys())[0]}.xlsx"
+    with pd.ExcelWriter(f'{full_filename}', engine='openpyxl') as writer:
+        for commands in data.values():
+            for command_name, command_data in commands.items():
+                legacy_json_to_dataframe(command_data).to_excel(writer, sheet_name=command_name[:31], index=False)
+    return full_filename
+
+
+def sheet_values(path: Path) -> dict:
+    workbook = load_workbook(path, read_only=True)
+
+    def trim(row):
+        # Empty cells are None, NaN of missing columns included, and only pandas pads rows with them
+        row = list(row)
+        while row and row[-1] is None:
+            row.pop()
+        return tuple(row)
+
+    return {sheet.title: [trim(row) for row in sheet.iter_rows(values_only=True)] for sheet in workbook.worksheets}
+
+
+async def max_stall(write) -> float:
+    """Longest gap between the 1 ms ticks of a coroutine while write runs on the loop."""
+
+    stall = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal stall
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            stall = max(stall, now - last)
+            last = now
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    await write()
+    done = True
+    await task
+    return stall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Excel writers.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(ARCHIVE, "rb") as file:
+        data = serializer.load(file)
+    writers = {"legacy": legacy_write_to_excel, "streaming": lambda data, path: write_to_excel(data, path)}
+    with tempfile.TemporaryDirectory() as directory:
+        paths = {name: Path(directory) / name for name in writers}
+        for path in paths.values():
+            path.mkdir()
+
+        print(f"{'writer':<12}{'seconds':>10}{'peak MB':>10}{'loop stall ms':>15}")
+        results = {}
+        for name, writer in writers.items():
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                results[name] = writer(data, paths[name])
+                times.append(time.perf_counter() - start)
+            tracemalloc.start()
+            writer(data, paths[name])
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            if name == "legacy":
+                # Called inline by process_and_write
+                stall = asyncio.run(max_stall(lambda: asyncio.sleep(0, legacy_write_to_excel(data, paths[name]))))
+            else:
+                stall = asyncio.run(max_stall(lambda: asyncio.to_thread(write_to_excel, data, paths[name])))
+            print(f"{name:<12}{min(times):>10.3f}{peak / 1e6:>10.1f}{stall * 1000:>15.1f}")
+
+        if sheet_values(results["legacy"]) != sheet_values(results["streaming"]):
+            raise SystemExit("The workbooks have different cell values")
+        print("Both workbooks have the same cell values.")
+
+
+if __name__ == "__main__":
+    main()
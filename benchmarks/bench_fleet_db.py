@@ -0,0 +1,69 @@
+# flake8: noqa E501
+"""Rate at which FleetDB upserts parsed devices, with copies of the device of archive/3k.json.
+
+Each copy is written under its own device name, the way a fleet run stores its devices one after
+the other, and the tables are checked afterwards: interfaces must hold one row per port of
+show interface and of show interface status for every device.
+
+    python benchmarks/bench_fleet_db.py --devices 200
+"""
+import argparse
+import asyncio
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import serializer  # noqa: E402
+from fleet_db import FleetDB  # noqa: E402
+
+
+ARCHIVE = Path(__file__).resolve().parent.parent / "archive" / "3k.json"
+
+
+def ports(outputs: dict, cmd: str) -> int:
+    return len({row["interface"] for row in outputs[cmd]["interface"]})
+
+
+async def store(database: FleetDB, outputs: dict, devices: int):
+    for i in range(devices):
+        await database.store({f"device{i}": outputs})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark writing parsed devices to the SQLite fleet database.")
+    parser.add_argument("--devices", type=int, default=200)
+    args = parser.parse_args()
+
+    with open(ARCHIVE, "rb") as file:
+        outputs = next(iter(serializer.load(file).values()))
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "fleet.db"
+        database = FleetDB(path)
+        start = time.perf_counter()
+        asyncio.run(store(database, outputs, args.devices))
+        elapsed = time.perf_counter() - start
+        database.close()
+
+        connection = sqlite3.connect(path)
+        tables = [row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name != 'devices'")]
+        rows = {table: connection.execute(f"SELECT count(*) FROM {table}").fetchone()[0] for table in tables}
+        counts = dict(connection.execute("SELECT device || ' ' || command, count(*) FROM interfaces GROUP BY device, command").fetchall())
+        connection.close()
+
+    total = sum(rows.values())
+    print(f"{args.devices} devices, {total} rows in {elapsed:.2f}s: {args.devices / elapsed:.0f} devices/s, {total / elapsed:.0f} rows/s")
+    print("  ".join(f"{table} {count}" for table, count in rows.items()))
+    for cmd in ("show interface", "show interface status"):
+        expected = ports(outputs, cmd)
+        wrong = {device: count for device, count in counts.items() if device.endswith(f" {cmd}") and count != expected}
+        if len(counts) != 2 * args.devices or wrong:
+            raise SystemExit(f"interfaces should hold {expected} rows per device for {cmd}, found {wrong or counts}")
+    print("interfaces holds one row per port of every device.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# flake8: noqa E501
+"""Parse time of the IOS "show interface" parser against the one it replaced.
+
+    python benchmarks/bench_ios_show_interface.py --interfaces 1000 10000
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import synthetic  # noqa: E402
+from ios_parser import parse_ios_show_interface  # noqa: E402
+
+
+def legacy_parse_ios_show_interface(cli_output: str) -> dict:
+    """The parser before the rewrite, ten regexes per line and a nested member loop."""
+
+    try:
+        # Define regular expressions for the attributes
+        regex_map = {
+            "interface": r"(.+?) is (up|down), line protocol is (.+?) \((.+?)\)",
+            "hardware_address": r"Hardware is .+?address is (.+?) \(bia",
+            "internet_address": r"Internet address is (.+)",
+            "description": r"Description: (.+)",
+            "mtu": r"MTU (.+?) bytes",
+            "encapsulation": r"Encapsulation (.+?),",
+            "duplex": r"(\w+-duplex)",
+            "speed": r", (\d+[GM]b/s)",
+            "media": r"media type is (.+)",
+            "members": r"Members in this channel: (.+)"
+        }
+
+        result = {}
+        current_interface = ""
+
+        for line in cli_output.split("\n"):
+            if not line.strip():
+                continue
+            if "is up" in line or "is down" in line:
+                match = re.search(regex_map["interface"], line)
+                if match:
+                    current_interface = match.group(1)
+                    result[current_interface] = {"status": match.group(2)}
+                    result[current_interface]["protocol_status"] = match.group(3)
+                    result[current_interface]["physical_status"] = match.group(4)
+                    continue
+            for key, regex in regex_map.items():
+                match = re.search(regex, line)
+                if match and current_interface:
+                    if key == "members":
+                        result[current_interface][key] = match.group(1).split()
+                    else:
+                        result[current_interface][key] = match.group(1)
+
+        for key in regex_map.keys():
+            if key == "interface":
+                continue
+            for interface, values in result.items():
+                if key not in values:
+                    result[interface][key] = ""
+        
+        for interface, attribute in result.items():
+            result[interface]["port_channel"] = ""
+            if attribute["members"]:
+                for mem in attribute["members"]:
+                    mem_match = re.search(r"[\d/]+", mem).group(0)
+                    for inter in result:
+                        if mem_match in inter:
+                            result[inter]["port_channel"] = interface
+
+    except Exception as e:
+        result = {"error": f"{e}"}
+
+    return result
+
+
+def best_of(parser, output: str, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser(output)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the IOS show interface parser.")
+    parser.add_argument("--interfaces", type=int, nargs="*", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'interfaces':>10}{'legacy s':>12}{'current s':>12}{'speed-up':>10}")
+    for count in args.interfaces:
+        output = synthetic.ios_show_interface(count)
+        legacy = best_of(legacy_parse_ios_show_interface, output, args.repeat)
+        current = best_of(parse_ios_show_interface, output, args.repeat)
+        print(f"{count:>10}{legacy:>12.3f}{current:>12.3f}{legacy / current:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# flake8: noqa E501
+"""Wall time of NX-API collection against the local stub, batched vs one command per request.
+
+The stub answers from archive/3k-1.json and sleeps --latency seconds per command and
+--rtt seconds per request, so the batch size shows up as saved request round-trips.
+
+    python benchmarks/bench_nxapi.py --devices 20 --rtt 0.02
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import nxapi_stub  # noqa: E402
+import NetJect  # noqa: E402
+from nxapi import NXAPIClient  # noqa: E402
+
+
+FIXTURE = Path(__file__).resolve().parent.parent / "archive" / "3k-1.json"
+COMMANDS = [cmd for cmd, body in nxapi_stub.load_fixture(str(FIXTURE)).items() if "error" not in body]
+
+
+async def run(port: int, devices: int, batch_size: int) -> float:
+    config = {
+        "username": "admin",
+        "password": "admin",
+        "transport": "nxapi",
+        "nxapi_scheme": "http",
+        "nxapi_port": port,
+        "nxapi_batch_size": batch_size,
+        "capture": "none",
+        "commands": COMMANDS,
+        # Every simulated device is the same stub, give each its own output folder
+        "devices": [{"address": "127.0.0.1", "output_path": Path(tempfile.mkdtemp())} for _ in range(devices)],
+    }
+    async with NXAPIClient(limit_per_host=devices) as client:
+        start = time.perf_counter()
+        await NetJect.NetJect(config, nxapi=client)
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the NX-API transport against the local stub.")
+    parser.add_argument("--devices", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the stub spends per command.")
+    parser.add_argument("--rtt", type=float, default=0.02, help="Seconds the stub spends per request.")
+    args = parser.parse_args()
+
+    server = nxapi_stub.start_stub_server(fixture=str(FIXTURE), latency=args.latency)
+    port = server.server_port
+    # Model the per-request round-trip on top of the per-command work
+    handler = server.RequestHandlerClass
+    do_post = handler.do_POST
+
+    def delayed_post(self):
+        time.sleep(args.rtt)
+        do_post(self)
+
+    handler.do_POST = delayed_post
+
+    print(f"{'batch size':<12}{'wall time (s)':>16}")
+    for batch_size in (1, 5, 10, 25):
+        elapsed = asyncio.run(run(port, args.devices, batch_size))
+        print(f"{batch_size:<12}{elapsed:>16.2f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
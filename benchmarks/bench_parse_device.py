@@ -0,0 +1,87 @@
+# flake8: noqa E501
+"""Per-device wall time of parse_device against a simulated device.
+
+Every command costs one round-trip of --latency seconds, the way an SSH session does. The
+"text" capture mode sends each JSON command twice, the same number of round-trips as the old
+second pass that re-sent every command for the .txt archive, so it stands in for "before".
+
+    python benchmarks/bench_parse_device.py --devices 20 --latency 0.05
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import connection_pool  # noqa: E402
+import NetJect  # noqa: E402
+
+
+class Response:
+    def __init__(self, result: str):
+        self.result = result
+
+
+class SimulatedDevice:
+    """Stand-in for a scrapli driver that answers every command after a fixed delay."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.sent = 0
+
+    async def open(self):
+        await asyncio.sleep(self.latency)
+
+    async def close(self):
+        pass
+
+    async def send_command(self, cmd: str) -> Response:
+        self.sent += 1
+        await asyncio.sleep(self.latency)
+        if cmd == "show hostname":
+            return Response("bench")
+        if cmd.endswith("| json"):
+            return Response('{"TABLE_interface": {"ROW_interface": [{"interface": "Ethernet1/1", "state": "up"}]}}')
+        return Response("Ethernet1/1 is up")
+
+
+async def run(devices: int, latency: float, capture: str) -> tuple:
+    drivers = []
+
+    def create_connection(device: dict) -> SimulatedDevice:
+        driver = SimulatedDevice(latency)
+        drivers.append(driver)
+        return driver
+
+    connection_pool.create_connection = create_connection
+    output_path = Path(tempfile.mkdtemp())
+    config = {
+        "username": "bench",
+        "password": "bench",
+        "capture": capture,
+        "output_path": output_path,
+        "devices": [{"address": f"10.0.0.{i}"} for i in range(devices)],
+    }
+    start = time.perf_counter()
+    await NetJect.NetJect(config)
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(driver.sent for driver in drivers) / devices
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parse_device capture modes.")
+    parser.add_argument("--devices", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per command round-trip.")
+    args = parser.parse_args()
+
+    print(f"{'capture':<10}{'wall time (s)':>16}{'commands/device':>18}")
+    for capture in ("text", "parsed"):
+        elapsed, sent = asyncio.run(run(args.devices, args.latency, capture))
+        print(f"{capture:<10}{elapsed:>16.2f}{sent:>18.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# flake8: noqa E501
+"""Time of flattening NX-OS JSON responses with parse_table against the recursive coroutine it replaced.
+
+The fixture is archive/3k.json turned back into the TABLE_x/ROW_x nesting of NX-OS JSON
+responses, the rows of its outer tables repeated --scale times.
+
+    python benchmarks/bench_parse_table.py --scale 10
+"""
+import argparse
+import asyncio
+import copy
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from nxos_parser import parse_table  # noqa: E402
+
+
+ARCHIVE = Path(__file__).resolve().parent.parent / "archive" / "3k.json"
+
+
+async def legacy_parse_table(table: dict) -> dict:
+    """parse_table before it was made iterative, which also modified the rows of its input."""
+
+    result = {}
+    for table_key, table_value in table.items():
+        if not table_key.startswith("TABLE_"):
+            result[table_key] = table_value
+            continue
+        result_key = table_key.split("_", 1)[1]
+        if isinstance(table_value, dict):
+            for row_key, row_value in table_value.items():
+                if isinstance(row_value, list):
+                    for item in row_value:
+                        await legacy_flatten_row(item)
+                elif isinstance(row_value, dict):
+                    await legacy_flatten_row(row_value)
+            result[result_key] = row_value
+        elif isinstance(table_value, list):
+            result[result_key] = []
+            for row in table_value:
+                for row_key, row_value in row.items():
+                    if isinstance(row_value, dict):
+                        await legacy_flatten_row(row_value)
+                    elif isinstance(row_value, list):
+                        for item in row_value:
+                            await legacy_flatten_row(item)
+                    result[result_key].append(row_value)
+    return result
+
+
+async def legacy_flatten_row(row: dict):
+    # The four identical inner loops of the old parse_table
+    temps = []
+    keys_to_delete = []
+    for key, value in row.items():
+        if key.startswith("TABLE_"):
+            keys_to_delete.append(key)
+            temps.append(await legacy_parse_table({key: value}))
+    for key in keys_to_delete:
+        del row[key]
+    for temp in temps:
+        row.update(temp)
+
+
+async def legacy_parse_all(bodies: list) -> list:
+    return [await legacy_parse_table(body) for body in bodies]
+
+
+def to_nxos_json(value, scale: int = 1):
+    """Rebuild the TABLE_x/ROW_x nesting of an NX-OS JSON response from its parsed form.
+
+    The rows of the outer tables are repeated scale times.
+    """
+
+    if not isinstance(value, dict):
+        return value
+    body = {}
+    for key, item in value.items():
+        if isinstance(item, list) and item and all(isinstance(row, dict) for row in item):
+            body[f"TABLE_{key}"] = {f"ROW_{key}": [to_nxos_json(row) for _ in range(scale) for row in item]}
+        elif isinstance(item, dict):
+            body[f"TABLE_{key}"] = {f"ROW_{key}": to_nxos_json(item, scale)}
+        else:
+            body[key] = item
+    return body
+
+
+def load_fixture(scale: int) -> dict:
+    with open(ARCHIVE) as file:
+        device = next(iter(json.load(file).values()))
+    return {cmd: to_nxos_json(output, scale) for cmd, output in device.items() if isinstance(output, dict) and "error" not in output}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark flattening NX-OS JSON tables.")
+    parser.add_argument("--scale", type=int, default=1, help="How many times the rows of the outer tables are repeated.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    fixture = load_fixture(args.scale)
+    rows = sum(json.dumps(body).count('"ROW_') for body in fixture.values())
+    print(f"{len(fixture)} responses, {len(json.dumps(fixture)) / 1e6:.1f} MB")
+
+    legacy_times = []
+    for _ in range(args.repeat):
+        # The legacy version modifies its input, so every run gets a fresh copy
+        bodies = copy.deepcopy(fixture)
+        start = time.perf_counter()
+        legacy = asyncio.run(legacy_parse_all(list(bodies.values())))
+        legacy_times.append(time.perf_counter() - start)
+
+    new_times = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        new = [parse_table(body) for body in fixture.values()]
+        new_times.append(time.perf_counter() - start)
+
+    if new != legacy:
+        raise SystemExit("parse_table output differs from the legacy version")
+    legacy_time, new_time = min(legacy_times), min(new_times)
+    print(f"{'version':<10}{'seconds':>10}")
+    print(f"{'legacy':<10}{legacy_time:>10.4f}")
+    print(f"{'iterative':<10}{new_time:>10.4f}")
+    print(f"speed-up {legacy_time / new_time:.1f}x over {rows} tables")
+
+
+if __name__ == "__main__":
+    main()
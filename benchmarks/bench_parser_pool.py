@@ -0,0 +1,119 @@
+# flake8: noqa E501
+"""Aggregate parsing throughput against the number of parser workers.
+
+Text-file mode parses --devices synthetic IOS capture files. Live mode serves the same outputs
+from simulated devices that spend --latency seconds per command. "inline" is the old
+behaviour of parsing on the event loop.
+
+    python benchmarks/bench_parser_pool.py --devices 16 --interfaces 2000 --routes 20000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import connection_pool  # noqa: E402
+import NetJect  # noqa: E402
+import synthetic  # noqa: E402
+from parser_pool import shutdown_parser_executors  # noqa: E402
+
+
+COMMANDS = ["show interface", "show ip route"]
+
+
+class Response:
+    def __init__(self, result: str):
+        self.result = result
+
+
+class SimulatedDevice:
+    def __init__(self, outputs: dict, latency: float):
+        self.outputs = outputs
+        self.latency = latency
+
+    async def open(self):
+        await asyncio.sleep(self.latency)
+
+    async def close(self):
+        pass
+
+    async def send_command(self, cmd: str) -> Response:
+        await asyncio.sleep(self.latency)
+        return Response(self.outputs.get(cmd, "bench"))
+
+
+async def run_files(files: list, executor: str, workers: int) -> float:
+    config = {
+        "os_type": "ios",
+        "cli_output_format": "text",
+        "commands": COMMANDS,
+        "parser_executor": executor,
+        "parser_workers": workers,
+        "parser_inline_threshold": 0,
+        "output_path": Path(tempfile.mkdtemp()),
+        "devices": [{"file": str(file)} for file in files],
+    }
+    start = time.perf_counter()
+    await NetJect.NetJect(config)
+    return time.perf_counter() - start
+
+
+async def run_live(outputs: dict, devices: int, latency: float, executor: str, workers: int) -> float:
+    connection_pool.create_connection = lambda device: SimulatedDevice(outputs, latency)
+    config = {
+        "username": "bench",
+        "password": "bench",
+        "os_type": "ios",
+        "cli_output_format": "text",
+        "commands": COMMANDS,
+        "capture": "none",
+        "parser_executor": executor,
+        "parser_workers": workers,
+        "parser_inline_threshold": 0,
+        "output_path": Path(tempfile.mkdtemp()),
+        "devices": [{"address": f"10.0.0.{i}"} for i in range(devices)],
+    }
+    start = time.perf_counter()
+    await NetJect.NetJect(config)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parsing in a process pool.")
+    parser.add_argument("--devices", type=int, default=16)
+    parser.add_argument("--interfaces", type=int, default=2000)
+    parser.add_argument("--routes", type=int, default=20000)
+    parser.add_argument("--latency", type=float, default=0.01, help="Seconds per command round-trip in live mode.")
+    args = parser.parse_args()
+
+    outputs = {
+        "show interface": synthetic.ios_show_interface(args.interfaces),
+        "show ip route": synthetic.ios_show_ip_route(args.routes),
+    }
+    folder = Path(tempfile.mkdtemp())
+    files = []
+    for i in range(args.devices):
+        file = folder / f"device{i}.txt"
+        file.write_text(synthetic.ios_capture(f"device{i}", outputs))
+        files.append(file)
+
+    cores = os.cpu_count() or 1
+    settings = [("inline", 1)] + [("process", workers) for workers in (1, 2, 4, 8, 16, 32) if workers <= cores]
+    print(f"{'executor':<10}{'workers':>8}{'files/s':>12}{'live devices/s':>18}")
+    for executor, workers in settings:
+        # Warm the pool up once so worker start-up is not counted
+        asyncio.run(run_files(files[:1], executor, workers))
+        file_time = asyncio.run(run_files(files, executor, workers))
+        live_time = asyncio.run(run_live(outputs, args.devices, args.latency, executor, workers))
+        print(f"{executor:<10}{workers:>8}{args.devices / file_time:>12.2f}{args.devices / live_time:>18.2f}")
+    shutdown_parser_executors()
+
+
+if __name__ == "__main__":
+    main()
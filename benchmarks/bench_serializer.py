@@ -0,0 +1,73 @@
+# flake8: noqa E501
+"""Decode and encode throughput of the serializer backends on the device documents of archive/,
+and peak memory of writing a document whole or one command at a time.
+
+    python benchmarks/bench_serializer.py --repeat 20
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import serializer  # noqa: E402
+
+
+ARCHIVE = Path(__file__).resolve().parent.parent / "archive"
+
+
+def best_time(function, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def write_peak(write) -> int:
+    """Peak memory allocated while writing a document to /dev/null."""
+
+    with open(os.devnull, "wb") as file:
+        tracemalloc.start()
+        write(file)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the JSON serializer backends.")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    backends = ["json"] + (["orjson"] if serializer.orjson is not None else [])
+    if len(backends) == 1:
+        print("orjson is not installed, only the json backend is measured.")
+    print(f"{'file':<12}{'MB':>6}{'backend':>9}{'decode MB/s':>14}{'pretty MB/s':>14}{'compact MB/s':>15}")
+    for path in sorted(ARCHIVE.glob("*.json")):
+        raw = path.read_bytes()
+        size = len(raw) / 1e6
+        for backend in backends:
+            serializer.set_backend(backend)
+            data = serializer.loads(raw)
+            decode = best_time(lambda: serializer.loads(raw), args.repeat)
+            pretty = best_time(lambda: serializer.dumps(data, pretty=True), args.repeat)
+            compact = best_time(lambda: serializer.dumps(data), args.repeat)
+            print(f"{path.name:<12}{size:>6.2f}{backend:>9}{size / decode:>14.1f}{size / pretty:>14.1f}{size / compact:>15.1f}")
+
+    print(f"\n{'file':<12}{'backend':>9}{'whole peak MB':>16}{'streamed peak MB':>19}")
+    for path in sorted(ARCHIVE.glob("*.json")):
+        for backend in backends:
+            serializer.set_backend(backend)
+            data = serializer.loads(path.read_bytes())
+            whole = write_peak(lambda file: file.write(serializer.dumps(data, pretty=True)))
+            streamed = write_peak(lambda file: [file.write(block) for block in serializer.buffered(serializer.iter_document(data, pretty=True))])
+            print(f"{path.name:<12}{backend:>9}{whole / 1e6:>16.2f}{streamed / 1e6:>19.2f}")
+
+
+if __name__ == "__main__":
+    main()
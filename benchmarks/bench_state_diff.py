@@ -0,0 +1,109 @@
+# flake8: noqa E501
+"""Time of the monitor's state comparison with DeepDiff(ignore_order=True).pretty(), which it
+replaced, and with state_diff.diff_state, on the state of archive/3k.json scaled up to the size
+of larger devices.
+
+Each scenario compares the original state to a copy with no change, a few changes, or a change to
+every interface, and checks that both find changes in the same commands.
+
+    python benchmarks/bench_state_diff.py --scale 1 4 --repeat 3
+"""
+import argparse
+import copy
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import serializer  # noqa: E402
+from deepdiff import DeepDiff  # noqa: E402
+from state_diff import diff_state, format_change  # noqa: E402
+
+
+ARCHIVE = Path(__file__).resolve().parent.parent / "archive" / "3k.json"
+
+
+def scale(value, factor: int):
+    """Every list of records gets factor - 1 copies of its records, with the first field of the copies made unique."""
+
+    if isinstance(value, dict):
+        return {key: scale(item, factor) for key, item in value.items()}
+    if not isinstance(value, list):
+        return value
+    items = [scale(item, factor) for item in value]
+    if factor == 1 or not items or not all(isinstance(item, dict) and item for item in items):
+        return items
+    copies = []
+    for n in range(1, factor):
+        for item in items:
+            field = next(iter(item))
+            copies.append({**item, field: f"{item[field]}#{n}"})
+    return items + copies
+
+
+def few_changes(state: dict) -> dict:
+    state = copy.deepcopy(state)
+    outputs = next(iter(state.values()))
+    outputs["show interface"]["interface"][3]["state"] = "up"
+    outputs["show interface status"]["interface"].reverse()
+    del outputs["show mac address-table"]["mac_address"][5]
+    outputs["show vlan"].append({"vlanbrief_vlanshowbr-vlanid": "999", "vlanbrief_vlanshowbr-vlanname": "new"})
+    outputs["show system resources"]["cpu_usage"][0]["idle"] = "1.00"
+    return state
+
+
+def every_interface(state: dict) -> dict:
+    state = copy.deepcopy(state)
+    for interface in next(iter(state.values()))["show interface"]["interface"]:
+        interface["state"] = "up" if interface.get("state") == "down" else "down"
+    return state
+
+
+def deepdiff_commands(old: dict, new: dict) -> tuple:
+    diff = DeepDiff(old, new, ignore_order=True)
+    text = diff.pretty()
+    commands = {match.group(1) for path in diff.affected_paths for match in [re.match(r"root\['[^']*'\]\['([^']*)'\]", path)] if match}
+    return text, commands
+
+
+def state_diff_commands(old: dict, new: dict) -> tuple:
+    changes = diff_state(old, new)
+    lines = [format_change(change) for change in changes]
+    return lines, {change.command for change in changes}
+
+
+def best(function, old: dict, new: dict, repeat: int) -> tuple:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(old, new)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DeepDiff against state_diff on device states.")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 4], help="Copies of every table of archive/3k.json.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(ARCHIVE, "rb") as file:
+        original = serializer.load(file)
+    print(f"{'scale':<7}{'state MB':>9}  {'scenario':<16}{'deepdiff s':>11}{'state_diff s':>14}{'speedup':>9}{'changes':>9}")
+    for factor in args.scale:
+        state = scale(original, factor)
+        size = len(serializer.dumps(state)) / 1e6
+        for scenario, change in (("no change", copy.deepcopy), ("few changes", few_changes), ("every interface", every_interface)):
+            new = change(state)
+            deepdiff_time, (_, deepdiff_found) = best(deepdiff_commands, state, new, args.repeat)
+            state_diff_time, (lines, state_diff_found) = best(state_diff_commands, state, new, args.repeat)
+            if deepdiff_found != state_diff_found:
+                raise SystemExit(f"{scenario}: DeepDiff found changes in {sorted(deepdiff_found)}, state_diff in {sorted(state_diff_found)}")
+            print(f"{factor:<7}{size:>9.1f}  {scenario:<16}{deepdiff_time:>11.3f}{state_diff_time:>14.4f}{deepdiff_time / state_diff_time:>8.0f}x{len(lines):>9}")
+    print("Both found changes in the same commands.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# flake8: noqa E501
+"""Peak memory and wall time of batch against streaming parsing of a large output.
+
+The output is delivered in --chunk sized pieces, each taking --latency seconds to arrive, the
+way a slow channel hands over a large routing table. Batch mode joins the chunks and parses
+at the end; streaming mode parses every chunk as it arrives and does not keep the records.
+
+    python benchmarks/bench_streaming.py --routes 200000
+"""
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import synthetic  # noqa: E402
+from ios_parser import IOSShowIpRouteStream, parse_ios_show_ip_route  # noqa: E402
+
+
+async def chunks(output: str, size: int, latency: float):
+    for start in range(0, len(output), size):
+        await asyncio.sleep(latency)
+        yield output[start:start + size]
+
+
+async def batch(output: str, size: int, latency: float) -> int:
+    received = []
+    async for chunk in chunks(output, size, latency):
+        received.append(chunk)
+    return len(parse_ios_show_ip_route("".join(received)))
+
+
+async def streaming(output: str, size: int, latency: float) -> int:
+    parser = IOSShowIpRouteStream(collect=False)
+    records = 0
+    async for chunk in chunks(output, size, latency):
+        records += len(parser.feed(chunk))
+    return records + len(parser.close())
+
+
+def measure(mode, output: str, size: int, latency: float):
+    tracemalloc.start()
+    start = time.perf_counter()
+    records = asyncio.run(mode(output, size, latency))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return records, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming parsing.")
+    parser.add_argument("--routes", type=int, default=200000)
+    parser.add_argument("--chunk", type=int, default=65536)
+    parser.add_argument("--latency", type=float, default=0.002, help="Seconds for each chunk to arrive.")
+    args = parser.parse_args()
+
+    output = synthetic.ios_show_ip_route(args.routes)
+    print(f"output {len(output) / 1e6:.1f} MB, {len(output) // args.chunk + 1} chunks")
+    print(f"{'mode':<12}{'records':>10}{'seconds':>10}{'peak MB':>10}")
+    for name, mode in (("batch", batch), ("streaming", streaming)):
+        records, elapsed, peak = measure(mode, output, args.chunk, args.latency)
+        print(f"{name:<12}{records:>10}{elapsed:>10.2f}{peak / 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# flake8: noqa E501
+"""Throughput of the template parsers against the hand-written parsers they replaced.
+
+    python benchmarks/bench_templates.py --entries 10000 100000
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import synthetic  # noqa: E402
+from ios_parser import parse_ios_show_ip_arp, parse_ios_show_run_interface  # noqa: E402
+from nxos_parser import parse_nxos_show_ip_arp  # noqa: E402
+
+
+def legacy_parse_ios_show_ip_arp(cli_output: str) -> list:
+    """show ip arp before the template engine."""
+
+    try:
+        ip_arp_list = []
+        # Define regular expressions for the attributes
+        regex_map = {
+            "ip_arp_details": r"(?P<protocol>\S+)\s+(?P<address>\d+\.\d+\.\d+\.\d+)\s+(?P<age>\S+)\s+(?P<hardware_address>\S+)\s+(?P<type>\S+)\s+(?P<interface>\S+)",
+        }
+
+        lines = cli_output.split("\n")
+
+        for line in lines:
+            match = re.search(regex_map["ip_arp_details"], line)
+            if match:
+                ip_arp_list.append({
+                    "protocol": match.group("protocol"),
+                    "address": match.group("address"),
+                    # "age": match.group("age"),
+                    "hardware_address": match.group("hardware_address"),
+                    "type": match.group("type"),
+                    "interface": match.group("interface"),
+                    })
+        
+        attributes = ["protocol","address","age","hardware_address","type","interface"]
+        for attr in attributes:
+            for item in ip_arp_list:
+                if attr not in item:
+                    item[attr] = ""
+        
+    except Exception as e:
+        return [{"error": f"{e}"}]
+    
+    return ip_arp_list
+
+
+def legacy_parse_ios_show_run_interface(cli_output: str) -> dict:
+    """show run interface before the template engine."""
+
+    interfaces = {}
+    try:
+    # Regular expressions for each attribute
+        regex_map = {
+            "interface": re.compile(r"^interface (\S+)"),
+            "description": re.compile(r"\s+description (.+)"),
+            "switchport_mode": re.compile(r"\s+switchport mode (\S+)"),
+            "native_vlan": re.compile(r"native vlan (.+)"),
+            "access_vlan": re.compile(r"\s+switchport access vlan (\d+)"),
+            "ip_address": re.compile(r"^ ip address (.+)"),
+            "channel_group": re.compile(r"^ channel-group (\d+) mode (\S+)"),
+        }
+
+        current_interface = ""
+
+        # Split the output into lines and loop through each line
+        for line in cli_output.split("\n"):
+            interface_match = regex_map["interface"].match(line)
+            if interface_match:
+                current_interface = interface_match.group(1)
+                interfaces[current_interface] = {}
+                continue
+
+            # If inside an interface configuration section, search for attributes
+            if current_interface:
+                for attr, regex in regex_map.items():
+                    if attr == "interface":
+                        continue
+                    match = regex.match(line)
+                    if match:
+                        if attr == "channel_group":
+                            interfaces[current_interface][attr] = match.group(1)
+                            interfaces[current_interface]["channel_group_mode"] = match.group(2)
+                        else:
+                            interfaces[current_interface][attr] = match.group(1)
+
+        attributes = ["description","switchport_mode","native_vlan","access_vlan","ip_address","channel_group","channel_group_mode"]
+        for attr in attributes:
+            for inter, values in interfaces.items():
+                if attr not in values:
+                    interfaces[inter][attr] = ""
+
+    except Exception as e:
+        interfaces["msg"] = e
+    return interfaces
+
+
+def best_of(parser, output: str, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser(output)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the template engine.")
+    parser.add_argument("--entries", type=int, nargs="*", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cases = [
+        ("ios show ip arp", synthetic.ios_show_ip_arp, legacy_parse_ios_show_ip_arp, parse_ios_show_ip_arp),
+        ("ios show run interface", synthetic.ios_show_run_interface, legacy_parse_ios_show_run_interface, parse_ios_show_run_interface),
+        ("nxos show ip arp", synthetic.nxos_show_ip_arp, None, parse_nxos_show_ip_arp),
+    ]
+    print(f"{'command':<24}{'entries':>9}{'MB':>7}{'legacy lines/s':>16}{'template lines/s':>18}{'template MB/s':>15}")
+    for name, generate, legacy, current in cases:
+        for count in args.entries:
+            output = generate(count)
+            lines = output.count("\n")
+            megabytes = len(output) / 1e6
+            current_time = best_of(current, output, args.repeat)
+            legacy_rate = f"{lines / best_of(legacy, output, args.repeat):>16,.0f}" if legacy else f"{'-':>16}"
+            print(f"{name:<24}{count:>9}{megabytes:>7.1f}{legacy_rate}{lines / current_time:>18,.0f}{megabytes / current_time:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
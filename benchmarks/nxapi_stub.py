@@ -0,0 +1,110 @@
+# flake8: noqa E501
+"""Offline NX-API stand-in that answers JSON-RPC show commands from a fixture.
+
+The fixture is a NetJect style JSON file, {device: {command: body}}, for example
+archive/3k-1.json. Bodies holding an "error" key, and commands missing from the fixture, are
+answered with a JSON-RPC error like a real switch rejecting the command.
+
+    python benchmarks/nxapi_stub.py --port 8080 --fixture archive/3k-1.json
+"""
+import argparse
+import base64
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+def load_fixture(path: str | None) -> dict:
+    """Return the command bodies of the first device in the fixture file."""
+
+    if not path:
+        return {}
+    with open(path, "r") as file:
+        data = json.load(file)
+    return list(data.values())[0] if data else {}
+
+
+def make_handler(bodies: dict, hostname: str, latency: float, username: str | None, password: str | None):
+
+    class NXAPIHandler(BaseHTTPRequestHandler):
+        # HTTP/1.1 keeps the connection open between requests, like NX-API does
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _reply(self, status: int, payload):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json-rpc")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _authorized(self) -> bool:
+            if username is None:
+                return True
+            expected = base64.b64encode(f"{username}:{password}".encode()).decode()
+            return self.headers.get("Authorization", "") == f"Basic {expected}"
+
+        def _answer(self, request: dict) -> dict:
+            cmd = request.get("params", {}).get("cmd", "")
+            reply = {"jsonrpc": "2.0", "id": request.get("id")}
+            if cmd == "show hostname":
+                body = {"hostname": hostname}
+            elif cmd in bodies and "error" not in bodies[cmd]:
+                body = bodies[cmd]
+            else:
+                reply["error"] = {"code": -32602, "message": "Invalid params", "data": {"msg": f"Invalid command: {cmd}"}}
+                return reply
+            if request.get("method") == "cli_ascii":
+                body = {"msg": json.dumps(body, indent=2)}
+            reply["result"] = {"body": body}
+            return reply
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            if self.path != "/ins":
+                self._reply(404, {"error": "not found"})
+                return
+            if not self._authorized():
+                self._reply(401, {"error": "unauthorized"})
+                return
+            requests = payload if isinstance(payload, list) else [payload]
+            time.sleep(latency * len(requests))
+            replies = [self._answer(request) for request in requests]
+            self._reply(200, replies if isinstance(payload, list) else replies[0])
+
+    return NXAPIHandler
+
+
+def start_stub_server(port: int = 0, fixture: str | None = None, hostname: str = "stub", latency: float = 0.0,
+                      username: str | None = None, password: str | None = None) -> ThreadingHTTPServer:
+    """Start the stub in a background thread and return the server, port in server.server_port."""
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(load_fixture(fixture), hostname, latency, username, password))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve NX-API JSON-RPC responses from a fixture.")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--fixture", type=str, default=str(Path(__file__).resolve().parent.parent / "archive" / "3k-1.json"))
+    parser.add_argument("--hostname", type=str, default="stub")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the stub spends per command.")
+    args = parser.parse_args()
+
+    server = start_stub_server(args.port, args.fixture, args.hostname, args.latency)
+    print(f"NX-API stub listening on http://127.0.0.1:{server.server_port}/ins")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
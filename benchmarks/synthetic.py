@@ -0,0 +1,143 @@
+# flake8: noqa E501
+"""Synthetic CLI outputs of configurable size for the benchmarks."""
+
+
+def ios_show_interface(count: int, members_per_channel: int = 4) -> str:
+    """IOS "show interface" with count GigabitEthernet ports, bundled into port-channels."""
+
+    blocks = []
+    channels = max(1, count // (members_per_channel * 8))
+    for i in range(count):
+        slot, port = divmod(i, 48)
+        blocks.append(
+            f"GigabitEthernet{slot + 1}/0/{port + 1} is up, line protocol is up (connected)\n"
+            f"  Hardware is Gigabit Ethernet, address is 0011.22{i // 256:02x}.{i % 256:02x}01 (bia 0011.22{i // 256:02x}.{i % 256:02x}01)\n"
+            f"  Description: access port {i}\n"
+            f"  MTU 1500 bytes, BW 1000000 Kbit/sec, DLY 10 usec,\n"
+            f"     reliability 255/255, txload 1/255, rxload 1/255\n"
+            f"  Encapsulation ARPA, loopback not set\n"
+            f"  Keepalive set (10 sec)\n"
+            f"  Full-duplex, 1000Mb/s, media type is 10/100/1000BaseTX\n"
+            f"  input flow-control is off, output flow-control is unsupported\n"
+            f"  ARP type: ARPA, ARP Timeout 04:00:00\n"
+            f"  Last input never, output 00:00:01, output hang never\n"
+            f"  Last clearing of \"show interface\" counters never\n"
+            f"  Input queue: 0/75/0/0 (size/max/drops/flushes); Total output drops: 0\n"
+            f"  Queueing strategy: fifo\n"
+            f"  Output queue: 0/40 (size/max)\n"
+            f"  5 minute input rate 1000 bits/sec, 1 packets/sec\n"
+            f"  5 minute output rate 2000 bits/sec, 2 packets/sec\n"
+            f"     {i * 10} packets input, {i * 1000} bytes, 0 no buffer\n"
+            f"     Received {i} broadcasts ({i} multicasts)\n"
+            f"     0 runts, 0 giants, 0 throttles\n"
+            f"     0 input errors, 0 CRC, 0 frame, 0 overrun, 0 ignored\n"
+            f"     {i * 20} packets output, {i * 2000} bytes, 0 underruns\n"
+            f"     0 output errors, 0 collisions, 1 interface resets\n"
+        )
+    for c in range(channels):
+        members = " ".join(f"Gi{(m // 48) + 1}/0/{(m % 48) + 1}" for m in range(c * members_per_channel, (c + 1) * members_per_channel) if m < count)
+        blocks.append(
+            f"Port-channel{c + 1} is up, line protocol is up (connected)\n"
+            f"  Hardware is EtherChannel, address is 0011.2299.{c:04x} (bia 0011.2299.{c:04x})\n"
+            f"  MTU 1500 bytes, BW 4000000 Kbit/sec, DLY 10 usec,\n"
+            f"  Encapsulation ARPA, loopback not set\n"
+            f"  Full-duplex, 1000Mb/s, link type is auto, media type is unknown\n"
+            f"  Members in this channel: {members}\n"
+        )
+    return "".join(blocks)
+
+
+def ios_show_ip_route(count: int) -> str:
+    """IOS "show ip route" with count OSPF routes."""
+
+    lines = [
+        "Codes: L - local, C - connected, S - static, R - RIP, M - mobile, B - BGP",
+        "       D - EIGRP, EX - EIGRP external, O - OSPF, IA - OSPF inter area",
+        "       * - candidate default, U - per-user static route, o - ODR",
+        "",
+        "Gateway of last resort is 10.0.0.1 to network 0.0.0.0",
+        "",
+    ]
+    for i in range(count):
+        lines.append(f"O IA     10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}/32 [110/{i % 100 + 2}] via 192.168.{i % 4}.1, 1d02h, Vlan{i % 4 + 10}")
+    return "\n".join(lines) + "\n"
+
+
+def ios_show_interface_status(count: int) -> str:
+    """IOS "show interface status" with count ports."""
+
+    lines = ["", "Port      Name               Status       Vlan       Duplex  Speed Type"]
+    for i in range(count):
+        slot, port = divmod(i, 48)
+        status, vlan = ("connected", str(i % 4 + 10)) if i % 3 else ("notconnect", "1")
+        lines.append(f"{f'Gi{slot + 1}/0/{port + 1}':<10}{f'access port {i}':<19}{status:<13}{vlan:<11}a-full  a-1000 10/100/1000BaseTX")
+    return "\n".join(lines) + "\n"
+
+
+def ios_show_ip_arp(count: int) -> str:
+    """IOS "show ip arp" with count entries."""
+
+    lines = ["Protocol  Address          Age (min)  Hardware Addr   Type   Interface"]
+    for i in range(count):
+        address = f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+        lines.append(f"Internet  {address:<17}{i % 240:>8}   {i >> 16:04x}.{(i >> 8) & 255:02x}{i & 255:02x}.0001  ARPA   Vlan{i % 4 + 10}")
+    return "\n".join(lines) + "\n"
+
+
+def nxos_show_ip_arp(count: int) -> str:
+    """NXOS "show ip arp" with count entries."""
+
+    lines = [
+        "Flags: * - Adjacencies learnt on non-active FHRP router",
+        "",
+        "IP ARP Table for context default",
+        f"Total number of entries: {count}",
+        "Address         Age       MAC Address     Interface       Flags",
+    ]
+    for i in range(count):
+        address = f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+        lines.append(f"{address:<16}00:{i % 60:02d}:{i % 24:02d}  {i >> 16:04x}.{(i >> 8) & 255:02x}{i & 255:02x}.0003  Vlan{i % 4 + 10:<11}")
+    return "\n".join(lines) + "\n"
+
+
+def ios_show_run_interface(count: int) -> str:
+    """IOS "show run interface" with count access and trunk ports."""
+
+    lines = ["Building configuration...", "", "Current configuration : 123456 bytes"]
+    for i in range(count):
+        slot, port = divmod(i, 48)
+        lines.append(f"interface GigabitEthernet{slot + 1}/0/{port + 1}")
+        lines.append(f" description access port {i}")
+        if i % 8 == 0:
+            lines.append(" switchport trunk native vlan 99")
+            lines.append(" switchport mode trunk")
+            lines.append(f" channel-group {i // 8 + 1} mode active")
+        else:
+            lines.append(f" switchport access vlan {i % 4 + 10}")
+            lines.append(" switchport mode access")
+            lines.append(" spanning-tree portfast")
+        lines.append("!")
+    lines += ["interface Vlan10", " ip address 10.0.10.1 255.255.255.0", "!", "end"]
+    return "\n".join(lines) + "\n"
+
+
+def ios_show_mac_address_table(count: int) -> str:
+    """IOS "show mac address-table" with count dynamic entries."""
+
+    lines = [
+        "Legend: * - primary entry",
+        "        age - seconds since last seen",
+        "        n/a - not available",
+        "",
+        "  vlan   mac address     type    learn     age              ports",
+        "------+----------------+--------+-----+----------+--------------------------",
+    ]
+    for i in range(count):
+        lines.append(f"*  {i % 4 + 10:>3}  {i >> 16:04x}.{(i >> 8) & 255:02x}{i & 255:02x}.0002   dynamic  Yes   {i % 300:>8}   Gi{(i % 96) // 48 + 1}/0/{i % 48 + 1}")
+    return "\n".join(lines) + "\n"
+
+
+def ios_capture(hostname: str, sections: dict) -> str:
+    """Session log with one prompt line per command, the way NetJect reads text files."""
+
+    return "".join(f"{hostname}#{cmd}\n{output}" for cmd, output in sections.items()) + f"{hostname}#\n"
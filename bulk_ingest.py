@@ -0,0 +1,175 @@
+# flake8: noqa E501
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Callable
+from parser_pool import get_parser_executor
+from fleet_db import close_fleet_dbs
+from parquet_export import flush_parquet_sinks, get_parquet_sink, partition_records
+
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = ".netject-index.json"
+
+
+def find_capture_files(input_dir: str | Path, pattern: str = "**/*.txt") -> list:
+    """Return the capture files under input_dir matching the glob pattern, in path order."""
+
+    return sorted(path for path in Path(input_dir).glob(pattern) if path.is_file())
+
+
+def file_sha256(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def index_key(device: dict) -> str:
+    """Key of a file in the index, with the commands it is parsed for, so changing them parses it again."""
+
+    commands = hashlib.sha256("\n".join(sorted(device.get("commands", []))).encode()).hexdigest()[:16]
+    return f"{device['index_key']}#{commands}"
+
+
+def load_index(output_path: Path) -> dict:
+    """Content hash, size, modification time and output files of every file ingested into output_path before."""
+
+    try:
+        with open(output_path / INDEX_FILENAME) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_index(output_path: Path, index: dict):
+    output_path.mkdir(parents=True, exist_ok=True)
+    temp = output_path / f"{INDEX_FILENAME}.tmp"
+    with open(temp, "w") as file:
+        json.dump(index, file, indent=4)
+    temp.replace(output_path / INDEX_FILENAME)
+
+
+def outputs_exist(device: dict, entry: dict) -> bool:
+    return all((device["output_path"] / name).exists() for name in entry["outputs"])
+
+
+def is_up_to_date(device: dict, summary: dict, entry: dict | None) -> bool:
+    """Whether the file had the same content when it was last ingested and its outputs are still there.
+
+    A file with the size and modification time of its last ingestion is not read again. Otherwise
+    it is hashed, and an unchanged content, e.g. a copied file, is still skipped.
+    """
+
+    if entry is None or not outputs_exist(device, entry):
+        return False
+    if entry.get("bytes") == summary["bytes"] and entry.get("mtime_ns") == summary["mtime_ns"]:
+        summary["sha256"] = entry["sha256"]
+        return True
+    summary["sha256"] = file_sha256(device["file"])
+    return entry["sha256"] == summary["sha256"]
+
+
+async def ingest_shard_async(shard: list, command_parsers: dict) -> list:
+    # NetJect imports this module, and is only needed in the workers
+    import NetJect
+
+    summaries = []
+    for device, entry in shard:
+        path = Path(device["file"])
+        stat = path.stat()
+        summary = {"file": str(path), "index_key": index_key(device), "bytes": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": None, "status": "skipped", "outputs": []}
+        if is_up_to_date(device, summary, entry):
+            summary["outputs"] = entry["outputs"]
+        else:
+            if summary["sha256"] is None:
+                summary["sha256"] = file_sha256(path)
+            device["output_path"].mkdir(parents=True, exist_ok=True)
+            # The rows go back to the parent, which batches them across shards into few Parquet files
+            parquet_path = device.pop("parquet_path", None)
+            output = await NetJect.process_and_write(device, command_parsers)
+            if parquet_path:
+                summary["parquet"] = (parquet_path, device["parquet_batch_rows"], partition_records(output))
+            summary["outputs"] = [NetJect.json_filename(host, device.get("json_format", "pretty"), device.get("compression", "none")) for host in output if host]
+            failed = any(isinstance(result, dict) and "error" in result for result in output.values())
+            summary["status"] = "failed" if failed else "parsed"
+        summaries.append(summary)
+    return summaries
+
+
+def ingest_shard(shard: list, command_parsers: dict) -> list:
+    """Parse a shard of capture files in a worker process and write their outputs.
+
+    Returns one summary per file, so the parsed data itself never goes back to the parent.
+    """
+
+    try:
+        return asyncio.run(ingest_shard_async(shard, command_parsers))
+    finally:
+        close_fleet_dbs()
+        flush_parquet_sinks()
+
+
+async def ingest_files(devices: list, command_parsers: dict, output_path: Path, workers: int | None = None,
+                       shard_size: int = 8, force: bool = False, report: Callable[[str], None] = logger.info) -> list:
+    """Parse the capture files of devices in a process pool, skipping the files already ingested unchanged.
+
+    The files are sent to the workers in shards of shard_size. Each worker writes the JSON
+    outputs of its files itself, and the content hash index in output_path is updated with
+    what was written. The Parquet rows are flattened in the workers and written by the
+    parent, batch_rows at a time across shards. Progress and the final throughput are given
+    to report.
+    """
+
+    index = {} if force else load_index(output_path)
+    for device in devices:
+        # A worker has a single process, parsing inside it again would only add overhead
+        device["parser_executor"] = "inline"
+        # The files are not kept in the snapshot store, so they keep their JSON files
+        device.pop("snapshot_store", None)
+    shards = [
+        [(device, index.get(index_key(device))) for device in devices[start:start + shard_size]]
+        for start in range(0, len(devices), shard_size)
+    ]
+
+    loop = asyncio.get_running_loop()
+    executor = get_parser_executor("process", workers)
+    pending = [loop.run_in_executor(executor, ingest_shard, shard, command_parsers) for shard in shards]
+    counts = {"parsed": 0, "skipped": 0, "failed": 0}
+    summaries = []
+    total_bytes = 0
+    start = time.monotonic()
+    last_report = start
+    try:
+        for future in asyncio.as_completed(pending):
+            for summary in await future:
+                if "parquet" in summary:
+                    parquet_path, batch_rows, partitions = summary.pop("parquet")
+                    await get_parquet_sink(parquet_path, batch_rows).write_records(partitions)
+                summaries.append(summary)
+                counts[summary["status"]] += 1
+                total_bytes += summary["bytes"]
+                # The entries of the file for other command sets point to outputs it just replaced
+                file_key = summary["index_key"].rpartition("#")[0]
+                for key in [key for key in index if key.rpartition("#")[0] == file_key]:
+                    del index[key]
+                index[summary["index_key"]] = {"sha256": summary["sha256"], "bytes": summary["bytes"], "mtime_ns": summary["mtime_ns"], "outputs": summary["outputs"]}
+            now = time.monotonic()
+            if now - last_report >= 1 or len(summaries) == len(devices):
+                last_report = now
+                report(f"Ingested {len(summaries)}/{len(devices)} files ({counts['parsed']} parsed, {counts['skipped']} skipped, {counts['failed']} failed), {len(summaries) / max(now - start, 1e-9):.1f} files/s")
+    finally:
+        for future in pending:
+            future.cancel()
+        save_index(output_path, index)
+        await asyncio.to_thread(flush_parquet_sinks)
+
+    elapsed = time.monotonic() - start
+    report(f"Ingested {len(summaries)} files, {total_bytes / 1e6:.1f} MB in {elapsed:.2f}s: {len(summaries) / max(elapsed, 1e-9):.1f} files/s, "
+                f"{total_bytes / 1e6 / max(elapsed, 1e-9):.1f} MB/s ({counts['parsed']} parsed, {counts['skipped']} skipped, {counts['failed']} failed)")
+    return summaries
@@ -0,0 +1,74 @@
+# flake8: noqa E501
+import asyncio
+from pathlib import Path
+from typing import IO, Callable
+from compressed_io import compressor
+
+
+class CaptureSink:
+    """Appends the raw CLI output of a device session to its capture file without blocking the event loop.
+
+    Writes are buffered and handed to a thread in blocks of buffer_size bytes. The file is
+    opened once, on the first block, and closed by close(), so a device session costs one
+    open and a few writes however many commands it has. With compression, the blocks are
+    compressed as they are written and every session appends one gzip member or zstd frame.
+    """
+
+    def __init__(self, path: str | Path, compression: str = "none", buffer_size: int = 1 << 20, opener: Callable[..., IO] = open):
+        self.path = Path(path)
+        self.buffer_size = buffer_size
+        self.opener = opener
+        self.compressor = compressor(compression)
+        self.file = None
+        self.buffer = []
+        self.buffered = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def write(self, text: str):
+        data = text.encode()
+        self.buffer.append(data)
+        self.buffered += len(data)
+        if self.buffered >= self.buffer_size:
+            await self.flush()
+
+    async def write_capture(self, cmd: str, output: str | IO):
+        """Write a command and its output, given as text or as the temporary file it was spooled to."""
+
+        await self.write(f"{cmd}\n")
+        if isinstance(output, str):
+            await self.write(f"{output}\n")
+            return
+        with output:
+            await asyncio.to_thread(output.seek, 0)
+            while chunk := await asyncio.to_thread(output.read, self.buffer_size):
+                await self.write(chunk)
+        await self.write("\n")
+
+    def write_block(self, data: bytes, final: bool = False):
+        # Runs in a thread
+        if self.file is None:
+            self.file = self.opener(self.path, "ab")
+        if self.compressor is not None:
+            data = self.compressor.compress(data) + (self.compressor.flush() if final else b"")
+        if data:
+            self.file.write(data)
+        if final:
+            self.file.close()
+            self.file = None
+
+    async def flush(self, final: bool = False):
+        data = b"".join(self.buffer)
+        self.buffer = []
+        self.buffered = 0
+        if data or final and self.file is not None:
+            await asyncio.to_thread(self.write_block, data, final)
+
+    async def close(self):
+        """Write what is buffered and close the file."""
+
+        await self.flush(final=True)
@@ -0,0 +1,200 @@
+# flake8: noqa E501
+import logging
+import mmap
+import os
+import re
+from pathlib import Path
+from typing import Iterator
+
+
+logger = logging.getLogger(__name__)
+
+# A prompt line: the hostname, an optional mode like (config-if), "#" and the command typed after it
+prompt_pattern = r"^([A-Za-z0-9][\w.:/-]*)(?:\([\w.:/-]*\))?#[ \t]*([^\r\n]*?)[ \t]*\r?$"
+prompt_regex = re.compile(prompt_pattern, re.MULTILINE)
+prompt_regex_bytes = re.compile(prompt_pattern.encode(), re.MULTILINE)
+
+# Output modifiers that leave the output whole, so it still parses
+plain_modifiers = {"no-more"}
+
+
+class CommandTrie:
+    """Token trie of the known commands, which also resolves abbreviations like "sh int status"."""
+
+    def __init__(self, commands):
+        self.root = {}
+        for command in commands:
+            node = self.root
+            for token in command.lower().split():
+                node = node.setdefault(token, {})
+            node[None] = command
+
+    def match(self, command_line: str) -> str | None:
+        """Return the known command typed on a prompt line, or None when it is not one of them."""
+
+        command_line, _, modifier = command_line.partition("|")
+        if modifier.strip() and modifier.split()[0] not in plain_modifiers:
+            return None
+        node = self.root
+        for token in command_line.lower().split():
+            child = node.get(token)
+            if child is None:
+                candidates = [key for key in node if key is not None and key.startswith(token)]
+                if len(candidates) != 1:
+                    return None
+                child = node[candidates[0]]
+            node = child
+        return node.get(None)
+
+
+def prompt_regex_for(buffer) -> re.Pattern:
+    return prompt_regex if isinstance(buffer, str) else prompt_regex_bytes
+
+
+def iter_prompts(buffer, start: int = 0, end: int | None = None) -> Iterator[re.Match]:
+    """Yield the prompt lines of a capture, or of its lines between the offsets start and end.
+
+    Prompts are looked for only on the lines holding a "#", which find() locates much faster
+    than a regex tried at every line start.
+    """
+
+    regex = prompt_regex_for(buffer)
+    end = len(buffer) if end is None else end
+    mark, newline = ("#", "\n") if isinstance(buffer, str) else (b"#", b"\n")
+    position = buffer.find(mark, start, end)
+    while position != -1:
+        match = regex.match(buffer, buffer.rfind(newline, start, position) + 1 or start, end)
+        if match is not None:
+            yield match
+            position = buffer.find(mark, match.end(), end)
+        else:
+            position = buffer.find(mark, position + 1, end)
+
+
+def iter_sections(buffer, hostname: str | bytes | None = None, start: int = 0, end: int | None = None) -> Iterator[tuple]:
+    """Yield (hostname, command line, output start, output end) for every prompt line of a capture.
+
+    The buffer can be a str or any bytes-like object such as an mmap, and is scanned once.
+    With a hostname, the prompts of other hosts are taken as output.
+    """
+
+    previous = None
+    for match in iter_prompts(buffer, start, end):
+        host = match.group(1)
+        if hostname is not None and host != hostname:
+            continue
+        if previous is not None:
+            yield previous[0], previous[1], previous[2], match.start()
+        previous = (host, match.group(2), match.end())
+    if previous is not None:
+        yield previous[0], previous[1], previous[2], len(buffer) if end is None else end
+
+
+def decode_section(section: str | bytes) -> str:
+    if not isinstance(section, str):
+        # Same newlines as a file opened in text mode
+        section = section.decode("utf-8", errors="replace").replace("\r\n", "\n").replace("\r", "\n")
+    return section.strip()
+
+
+def split_on_command_lines(buffer, commands, start: int = 0, end: int | None = None) -> dict:
+    """Split a capture without prompts, such as the <host>.txt captures NetJect writes, on the lines holding only a known command."""
+
+    commands = {" ".join(command.lower().split()): command for command in commands}
+    if not commands:
+        return {}
+    pattern = r"^[ \t]*(" + "|".join(r"[ \t]+".join(map(re.escape, command.split())) for command in commands) + r")[ \t]*\r?$"
+    regex = re.compile(pattern if isinstance(buffer, str) else pattern.encode(), re.MULTILINE | re.IGNORECASE)
+    end = len(buffer) if end is None else end
+    output = {}
+    matches = list(regex.finditer(buffer, start, end))
+    for match, following in zip(matches, matches[1:] + [None]):
+        command_line = match.group(1)
+        if not isinstance(command_line, str):
+            command_line = command_line.decode("utf-8", errors="replace")
+        command = commands[" ".join(command_line.lower().split())]
+        output.pop(command, None)
+        output[command] = decode_section(buffer[match.end():following.start() if following is not None else end])
+    return output
+
+
+def split_capture(buffer, commands, start: int = 0, end: int | None = None) -> dict:
+    """Return the output of each known command of a single device capture, keyed by command.
+
+    The device is the host of the first prompt. A command run several times keeps its last output.
+    Only the outputs of known commands are copied out of the buffer. A capture without any
+    prompt is split on the lines holding only a known command instead.
+    """
+
+    first = next(iter_prompts(buffer, start, end), None)
+    if first is None:
+        logger.warning("No prompt line found in the capture, splitting it on the command lines.")
+        return split_on_command_lines(buffer, commands, start, end)
+    trie = CommandTrie(commands)
+    output = {}
+    for _, command_line, output_start, output_end in iter_sections(buffer, first.group(1), start, end):
+        if not isinstance(command_line, str):
+            command_line = command_line.decode("utf-8", errors="replace")
+        command = trie.match(command_line)
+        if command is not None:
+            # Keep the commands in the order of their last run
+            output.pop(command, None)
+            output[command] = decode_section(buffer[output_start:output_end])
+    return output
+
+
+def demux_capture(buffer, commands, start: int = 0, end: int | None = None) -> dict:
+    """Split a session log holding the sessions of several devices one after another.
+
+    Returns the output of each known command keyed by the hostname of its prompt, then by command.
+    """
+
+    trie = CommandTrie(commands)
+    devices = {}
+    for host, command_line, output_start, output_end in iter_sections(buffer, None, start, end):
+        if not isinstance(host, str):
+            host = host.decode("utf-8", errors="replace")
+            command_line = command_line.decode("utf-8", errors="replace")
+        output = devices.setdefault(host, {})
+        command = trie.match(command_line)
+        if command is not None:
+            output.pop(command, None)
+            output[command] = decode_section(buffer[output_start:output_end])
+    return devices
+
+
+def detect_os_type(outputs: dict) -> str | None:
+    """Guess the OS of a device from its show version output."""
+
+    version = outputs.get("show version", "")
+    if "NX-OS" in version or "Nexus" in version:
+        return "nxos"
+    if "IOS" in version:
+        return "ios"
+    return None
+
+
+def read_capture(path: str | Path, commands, demux: bool = False, start: int = 0, end: int | None = None) -> dict:
+    """split_capture, or demux_capture, over a memory map of the file so a large session log is never read whole.
+
+    start and end limit the split to a byte range of the file, which must begin on a line.
+    """
+
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return {}
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return demux_capture(buffer, commands, start, end) if demux else split_capture(buffer, commands, start, end)
+
+
+def last_prompt_start(path: str | Path, start: int = 0, end: int | None = None) -> int | None:
+    """Offset of the last prompt line of the file between start and end, or None without one."""
+
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            last = None
+            for last in iter_prompts(buffer, start, end):
+                pass
+            return last.start() if last is not None else None
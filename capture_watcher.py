@@ -0,0 +1,142 @@
+# flake8: noqa E501
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+from capture_splitter import last_prompt_start
+
+
+logger = logging.getLogger(__name__)
+
+STATE_FILENAME = ".netject-watch.json"
+
+
+class CaptureWatcher:
+    """Polls a folder for new or growing capture files and hands their new complete part to a job.
+
+    Each file is tracked by inode and by the offset it was parsed up to. While a file grows,
+    only the commands followed by another prompt are complete and get parsed. Once its size
+    did not change for a poll interval, the rest is parsed too, and the last command is parsed
+    again if the file grows later. A file without prompts is parsed whole once settled. Files wait in a bounded queue, so a burst of new files
+    slows the polling down instead of piling up work.
+    """
+
+    def __init__(self, input_dir: str | Path, pattern: str = "**/*.txt", state_path: str | Path | None = None,
+                 poll_interval: float = 2.0, queue_size: int = 100, workers: int = 4):
+        if poll_interval <= 0:
+            raise ValueError(f"poll_interval must be greater than 0. Have {poll_interval}.")
+        if queue_size < 1:
+            raise ValueError(f"watch_queue_size must be at least 1. Have {queue_size}.")
+        self.input_dir = Path(input_dir)
+        self.pattern = pattern
+        self.state_path = Path(state_path) if state_path else None
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.workers = max(1, workers)
+        self.state = self.load_state()
+        self.seen = {}
+        self.queued = set()
+        self.dirty = False
+
+    def load_state(self) -> dict:
+        if self.state_path is None:
+            return {}
+        try:
+            with open(self.state_path) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def save_state(self):
+        if self.state_path is None or not self.dirty:
+            return
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        temp = self.state_path.with_name(f"{self.state_path.name}.tmp")
+        with open(temp, "w") as file:
+            json.dump(self.state, file, indent=4)
+        temp.replace(self.state_path)
+        self.dirty = False
+
+    def poll(self) -> list:
+        """Return (key, path, settled) of the files with bytes that were not parsed yet."""
+
+        changed = []
+        for path in sorted(self.input_dir.glob(self.pattern)):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if not path.is_file():
+                continue
+            key = path.relative_to(self.input_dir).as_posix()
+            entry = self.state.get(key)
+            if entry is not None and (entry["inode"] != stat.st_ino or stat.st_size < entry["offset"]):
+                # Replaced or truncated, e.g. a rotated log
+                entry = None
+            if entry is None:
+                entry = self.state[key] = {"inode": stat.st_ino, "offset": 0, "parsed_size": -1}
+                self.dirty = True
+            settled = self.seen.get(key) == stat.st_size
+            self.seen[key] = stat.st_size
+            if stat.st_size != entry["parsed_size"] and key not in self.queued:
+                changed.append((key, path, settled))
+        return changed
+
+    async def process(self, key: str, path: Path, settled: bool, job: Callable[[Path, int, int], Awaitable[Any]]):
+        entry = self.state[key]
+        size = (await asyncio.to_thread(os.stat, path)).st_size
+        last = await asyncio.to_thread(last_prompt_start, path, entry["offset"], size)
+        if last is None:
+            if not settled:
+                return
+            # No prompt at all, e.g. a capture written by NetJect, which is split on its command
+            # lines. Its bytes are consumed even when nothing was found, so it is not queued again.
+            end = offset = size
+        elif settled:
+            end, offset = size, last
+        elif last > entry["offset"]:
+            end = offset = last
+        else:
+            return
+        await job(path, entry["offset"], end)
+        entry.update(offset=offset, parsed_size=size if settled else -1)
+        self.dirty = True
+
+    async def run(self, job: Callable[[Path, int, int], Awaitable[Any]], cycles: int | None = None):
+        """Poll every poll_interval seconds and run job(path, start, end) on the new part of each file.
+
+        Runs forever, or for the given number of poll cycles.
+        """
+
+        queue = asyncio.Queue(self.queue_size)
+
+        async def worker():
+            while True:
+                key, path, settled = await queue.get()
+                try:
+                    await self.process(key, path, settled, job)
+                except Exception as e:
+                    logger.error(f"Failed to ingest {path}: {e}")
+                finally:
+                    self.queued.discard(key)
+                    queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.workers)]
+        cycle = 0
+        try:
+            while cycles is None or cycle < cycles:
+                for key, path, settled in await asyncio.to_thread(self.poll):
+                    self.queued.add(key)
+                    # Waits while the queue is full
+                    await queue.put((key, path, settled))
+                await queue.join()
+                self.save_state()
+                cycle += 1
+                if cycles is None or cycle < cycles:
+                    await asyncio.sleep(self.poll_interval)
+        finally:
+            for task in workers:
+                task.cancel()
+            self.save_state()
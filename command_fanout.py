@@ -0,0 +1,69 @@
+# flake8: noqa E501
+import asyncio
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+def exec_session(conn):
+    """Return the authenticated asyncssh connection behind a scrapli driver, if there is one."""
+
+    session = getattr(conn.transport, "session", None)
+    return session if hasattr(session, "run") else None
+
+
+async def fan_out_commands(conn, commands: list, channels: int) -> list:
+    """Run the commands over up to `channels` concurrent SSH channels and return their outputs in order.
+
+    The extra channels are exec sessions opened on the connection scrapli already authenticated,
+    so no additional login happens. Without an asyncssh session the commands are sent one after
+    another on the scrapli channel.
+    """
+
+    session = exec_session(conn)
+    if session is None or channels <= 1:
+        if channels > 1:
+            logger.info("The transport does not support extra channels, sending commands one by one.")
+        return [(await conn.send_command(cmd)).result for cmd in commands]
+
+    semaphore = asyncio.Semaphore(channels)
+
+    async def run(cmd: str) -> str:
+        async with semaphore:
+            result = await session.run(cmd, check=False)
+        output = result.stdout if isinstance(result.stdout, str) else result.stdout.decode(errors="replace")
+        return output.replace("\r\n", "\n").rstrip()
+
+    return await asyncio.gather(*[run(cmd) for cmd in commands])
+
+
+async def stream_command(conn, cmd: str, parser, spool=None, chunk_size: int = 65536):
+    """Run the command on its own exec channel and feed its output to a streaming parser as it arrives.
+
+    Only one chunk is held at a time. The raw output is also written to `spool` when given,
+    without its trailing whitespace like scrapli returns it.
+    """
+
+    session = exec_session(conn)
+    async with session.create_process(cmd, encoding="utf-8", errors="replace") as process:
+        carry = ""
+        held = ""
+        while True:
+            chunk = await process.stdout.read(chunk_size)
+            if not chunk:
+                break
+            chunk = carry + chunk
+            # Keep a trailing \r until the next chunk, it may be the first half of \r\n
+            carry = "\r" if chunk.endswith("\r") else ""
+            chunk = chunk[:len(chunk) - len(carry)].replace("\r\n", "\n")
+            parser.feed(chunk)
+            if spool is not None:
+                text = held + chunk
+                body = text.rstrip()
+                held = text[len(body):]
+                spool.write(body)
+        if carry:
+            parser.feed(carry)
+    parser.close()
+    return parser.result
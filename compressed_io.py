@@ -0,0 +1,87 @@
+# flake8: noqa E501
+"""Streaming gzip and zstd compression of the output files, and transparent reading of them."""
+import gzip
+import io
+import zlib
+from pathlib import Path
+from typing import IO
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def check_compression(name: str):
+    if name not in SUFFIXES:
+        raise ValueError(f"Unsupported compression {name}. Use none, gzip or zstd.")
+    if name == "zstd" and zstandard is None:
+        raise ValueError("compression zstd needs the zstandard package. Install it with pip install zstandard.")
+
+
+def compressed_name(filename: str, compression: str = "none") -> str:
+    return filename + SUFFIXES[compression]
+
+
+def compression_of(path: str | Path) -> str:
+    """The compression of a file, from its suffix."""
+
+    suffix = Path(path).suffix
+    for name, name_suffix in SUFFIXES.items():
+        if name_suffix and suffix == name_suffix:
+            return name
+    return "none"
+
+
+def find_files(directory: str | Path, pattern: str) -> list:
+    """Files under directory matching pattern, plain or compressed."""
+
+    path = Path(directory)
+    return [file for suffix in SUFFIXES.values() for file in path.rglob(pattern + suffix)]
+
+
+def compressor(compression: str = "none"):
+    """An object whose compress(data) and flush() give the compressed stream, one block at a time.
+
+    Every compressed stream is a complete gzip member or zstd frame, so streams appended to the
+    same file read back as one.
+    """
+
+    if compression == "gzip":
+        # wbits 31 gives the gzip container instead of a raw zlib stream
+        return zlib.compressobj(6, zlib.DEFLATED, 31)
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=3).compressobj()
+    return None
+
+
+def decompress(data: bytes, compression: str = "none") -> bytes:
+    if compression == "gzip":
+        return gzip.decompress(data)
+    if compression == "zstd":
+        with zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data), read_across_frames=True) as reader:
+            return reader.read()
+    return data
+
+
+def open_compressed(path: str | Path, mode: str = "rb", compression: str | None = None) -> IO:
+    """Open a plain, gzip or zstd file, in binary or text mode.
+
+    The compression is taken from the suffix of path unless given.
+    """
+
+    if compression is None:
+        compression = compression_of(path)
+    if compression == "gzip":
+        return gzip.open(path, mode)
+    if compression == "zstd":
+        file = open(path, mode.replace("t", "").replace("b", "") + "b")
+        if "r" in mode:
+            stream = zstandard.ZstdDecompressor().stream_reader(file, read_across_frames=True, closefd=True)
+        else:
+            stream = zstandard.ZstdCompressor(level=3).stream_writer(file, closefd=True)
+        return stream if "b" in mode else io.TextIOWrapper(stream)
+    return open(path, mode)
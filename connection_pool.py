@@ -0,0 +1,124 @@
+# flake8: noqa E501
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from scrapli.driver.core import AsyncIOSXEDriver
+from scrapli.driver.core import AsyncNXOSDriver
+
+
+logger = logging.getLogger(__name__)
+
+
+def create_connection(device: dict) -> AsyncIOSXEDriver | AsyncNXOSDriver:
+    """Build the scrapli driver for the device based on its OS type."""
+
+    if device["os_type"] == "ios":
+        driver = AsyncIOSXEDriver
+    elif device["os_type"] == "nxos":
+        driver = AsyncNXOSDriver
+    else:
+        raise ValueError(f"Unsupported OS type: {device['os_type']}")
+
+    return driver(
+        host=device["address"],
+        auth_username=device["username"],
+        auth_password=device["password"],
+        auth_strict_key=False,
+        transport="asyncssh",
+    )
+
+
+class ConnectionPool:
+    """Keeps SSH connections open between polling cycles, keyed by device address."""
+
+    def __init__(self, probe_after: float = 60.0):
+        # Connections idle for longer than probe_after seconds get a prompt round-trip
+        # before reuse, younger ones are only checked with the transport isalive().
+        self.probe_after = probe_after
+        self._connections = {}
+        self._last_used = {}
+        self._locks = {}
+
+    async def _is_healthy(self, address: str, conn) -> bool:
+        """Check whether a pooled connection can still be used."""
+
+        if not conn.isalive():
+            return False
+        if time.monotonic() - self._last_used.get(address, 0) < self.probe_after:
+            return True
+        try:
+            await conn.get_prompt()
+            return True
+        except Exception as e:
+            logger.info(f"Health check failed for {address}: {e}")
+            return False
+
+    async def _checkout(self, device: dict):
+        """Return a healthy connection for the device, reconnecting if needed."""
+
+        address = device["address"]
+        conn = self._connections.get(address)
+        if conn is not None and not await self._is_healthy(address, conn):
+            logger.info(f"Connection to {address} is stale, reconnecting...")
+            await self.discard(address)
+            conn = None
+
+        if conn is None:
+            logger.info(f"Connecting to {address}...")
+            conn = create_connection(device)
+            await conn.open()
+            self._connections[address] = conn
+        return conn
+
+    @asynccontextmanager
+    async def connection(self, device: dict) -> AsyncIterator:
+        """Lend the pooled connection of the device, one user at a time."""
+
+        address = device["address"]
+        lock = self._locks.setdefault(address, asyncio.Lock())
+        async with lock:
+            conn = await self._checkout(device)
+            try:
+                yield conn
+            except BaseException:
+                # The session state is unknown after a failure, start over next time.
+                await self.discard(address)
+                raise
+            self._last_used[address] = time.monotonic()
+
+    async def discard(self, address: str):
+        """Close and forget the connection of the device."""
+
+        conn = self._connections.pop(address, None)
+        self._last_used.pop(address, None)
+        if conn is None:
+            return
+        try:
+            await conn.close()
+        except Exception as e:
+            logger.info(f"Ignoring error while closing connection to {address}: {e}")
+
+    async def close(self):
+        """Close every pooled connection."""
+
+        for address in list(self._connections):
+            await self.discard(address)
+
+
+@asynccontextmanager
+async def device_connection(device: dict, pool: ConnectionPool | None = None) -> AsyncIterator:
+    """Yield an open connection for the device, from the pool when one is given."""
+
+    if pool is not None:
+        async with pool.connection(device) as conn:
+            yield conn
+        return
+
+    conn = create_connection(device)
+    await conn.open()
+    try:
+        yield conn
+    finally:
+        await conn.close()
@@ -1,14 +1,30 @@
 # flake8: noqa E501
-import pandas as pd
-import json
 import argparse
+import logging
+import multiprocessing
+import os
+import serializer
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, Side
+from compressed_io import find_files, open_compressed
 
 
-# Function to find all json file in the directory and its subdirectory
+logger = logging.getLogger(__name__)
+
+# The header style of pandas' to_excel, which wrote these workbooks before
+HEADER_FONT = Font(bold=True)
+HEADER_BORDER = Border(left=Side(style="thin"), right=Side(style="thin"), top=Side(style="thin"), bottom=Side(style="thin"))
+HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="top")
+# The column of the device of each row in merged workbooks, kept apart from a device field of the rows themselves
+DEVICE_COLUMN = "_device"
+
+
+# Function to find all json file in the directory and its subdirectory, plain or compressed
 def find_json_files(directory):
-    path = Path(directory)
-    return list(path.rglob('*.json'))
+    return find_files(directory, '*.json')
 
 
 # Function to handle the conversion of lists to strings
@@ -18,9 +34,8 @@ def convert_lists_to_strings(item):
     return item
 
 
-# Function to convert nested dictionaries to rows in a DataFrame
-def dict_to_rows(cmd_dict):
-    rows = []
+# Function to turn nested dictionaries into rows, one at a time
+def iter_dict_rows(cmd_dict: dict):
     for key, value in cmd_dict.items():
         # Create a row for each key
         if isinstance(value, dict):
@@ -30,72 +45,239 @@ def dict_to_rows(cmd_dict):
                 if isinstance(subvalue, dict):
                     row.update({'key2': subkey})
                     row.update({subkey2: convert_lists_to_strings(subvalue2) for subkey2, subvalue2 in subvalue.items()})
-                    rows.append(row)
+                    yield row
                 else:
                     row.update({subkey: convert_lists_to_strings(subvalue) for subkey, subvalue in value.items()})
-                    rows.append(row)
+                    yield row
                     break
         else:
             # If the value is not a dictionary, just add the value directly
-            rows.append({'key': key, 'value': convert_lists_to_strings(value)})
-    return pd.DataFrame(rows)
+            yield {'key': key, 'value': convert_lists_to_strings(value)}
 
 
-# Function to convert JSON data for a show command into a DataFrame
-def json_to_dataframe(data):
+# Function to turn the JSON data of a show command into rows
+def iter_rows(data):
     if isinstance(data, dict):
-        # Process the dictionary to create rows
-        return dict_to_rows(data)
+        return iter_dict_rows(data)
     elif isinstance(data, list):
-        # Process each item in the list to ensure that lists are joined into strings
-        processed_data = [{k: convert_lists_to_strings(v) for k, v in item.items()} for item in data]
-        return pd.DataFrame(processed_data)
+        # Lists inside each item are joined into strings
+        return ({k: convert_lists_to_strings(v) for k, v in item.items()} for item in data)
     else:
         raise ValueError("Data is neither a dictionary nor a list")
 
 
-def write_to_excel(data):
+def cell_value(value):
+    # Missing columns stay empty, and values openpyxl cannot store, e.g. dicts, are written as text
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def write_header(sheet, columns: list):
+    header = []
+    for column in columns:
+        cell = WriteOnlyCell(sheet, value=cell_value(column))
+        cell.font, cell.border, cell.alignment = HEADER_FONT, HEADER_BORDER, HEADER_ALIGNMENT
+        header.append(cell)
+    sheet.append(header)
+
+
+def write_sheet(workbook: Workbook, sheet_name: str, data):
+    """Write the rows of a show command to a new sheet, generating them twice instead of keeping them.
+
+    The first pass collects the columns, in the order they first appear, and the second writes the rows.
+    """
+
+    sheet = workbook.create_sheet(sheet_name)
+    columns = list(dict.fromkeys(column for row in iter_rows(data) for column in row))
+    if not columns:
+        return
+    write_header(sheet, columns)
+    for row in iter_rows(data):
+        sheet.append([cell_value(row.get(column)) for column in columns])
+
+
+def write_to_excel(data: dict, output_path: Path | None = None, name: str | None = None) -> Path:
+    """Write the data of a device to <device>.xlsx in output_path, one sheet per show command.
+
+    The workbook is written in openpyxl's write-only mode, which streams each row to the file.
+    Run it in a thread from async code, it does not yield to the event loop. name replaces the
+    device name in the file name.
+    """
 
     device_name = list(data.keys())[0]
+    full_filename = Path(output_path or Path.cwd()) / f"{name or device_name}.xlsx"
+    logger.info(f'Writing {device_name} to Excel {full_filename}...')
+
+    workbook = Workbook(write_only=True)
+    for commands in data.values():
+        # Iterate over each show command for the device
+        for command_name, command_data in commands.items():
+            write_sheet(workbook, command_name[:31], command_data)
+    workbook.save(full_filename)
+    return full_filename
+
+
+def load_json(path: str | Path) -> dict:
+    with open_compressed(path, 'rb') as content:
+        return serializer.load(content)
+
+
+def workbook_stem(path: Path) -> str:
+    # device.json.gz gives device
+    return path.name.split(".json")[0]
+
+
+def convert_file(path: Path, xlsx_path: Path) -> tuple:
+    """Convert one JSON file in a worker process. Returns (path, error), error being None on success."""
+
+    try:
+        xlsx_path.parent.mkdir(parents=True, exist_ok=True)
+        write_to_excel(load_json(path), xlsx_path.parent, xlsx_path.stem)
+        return path, None
+    except Exception as e:
+        return path, f"{e}"
+
 
-    # Create a new Excel writer object for this device
-    with pd.ExcelWriter(f'{device_name}.xlsx', engine='openpyxl') as writer:
-        for commands in data.values():
-            # Iterate over each show command for the device
+def is_up_to_date(path: Path, xlsx_path: Path) -> bool:
+    try:
+        return xlsx_path.stat().st_mtime >= path.stat().st_mtime
+    except OSError:
+        return False
+
+
+def convert_directory(directory: str | Path, output_path: Path, workers: int | None = None, force: bool = False) -> dict:
+    """Convert every JSON file under directory to a workbook in a process pool, one file per task.
+
+    Workbooks mirror the sub-folders of their JSON file under output_path. Files whose workbook
+    is newer than them are skipped unless force. Returns the count of converted, skipped and
+    failed files.
+    """
+
+    directory = Path(directory)
+    counts = {"converted": 0, "skipped": 0, "failed": 0}
+    # spawn is safe whatever threads the parent has, like the parser workers of NetJect
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = []
+        for path in find_json_files(directory):
+            xlsx_path = output_path / path.relative_to(directory).parent / f"{workbook_stem(path)}.xlsx"
+            if not force and is_up_to_date(path, xlsx_path):
+                counts["skipped"] += 1
+                continue
+            futures.append(executor.submit(convert_file, path, xlsx_path))
+        for future in as_completed(futures):
+            path, error = future.result()
+            if error is None:
+                counts["converted"] += 1
+            else:
+                counts["failed"] += 1
+                logger.error(f"Failed to convert {path}: {error}")
+    return counts
+
+
+def file_columns(path: Path) -> tuple:
+    """The columns of every show command of a JSON file, read in a worker process. Returns (path, columns, error), error being None on success."""
+
+    columns = {}
+    try:
+        for commands in load_json(path).values():
             for command_name, command_data in commands.items():
-                # Convert the command data to a DataFrame
-                df = json_to_dataframe(command_data)
-                sheet_name = command_name[:31]
-                # Write the DataFrame to a new sheet in the Excel file
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
+                try:
+                    columns[command_name] = list(dict.fromkeys(column for row in iter_rows(command_data) for column in row))
+                except ValueError:
+                    continue
+    except Exception as e:
+        return path, {}, f"{e}"
+    return path, columns, None
+
+
+def append_rows(path: Path, workbooks: dict):
+    """Append the rows of every device of a JSON file to the workbooks of their show commands."""
+
+    for device_name, commands in load_json(path).items():
+        for command_name, command_data in commands.items():
+            if command_name not in workbooks:
+                continue
+            _, sheet, names = workbooks[command_name]
+            try:
+                for row in iter_rows(command_data):
+                    sheet.append([device_name] + [cell_value(row.get(column)) for column in names])
+            except ValueError as e:
+                logger.error(f"Skipped {command_name} of {device_name}: {e}")
+
+
+def merge_directory(directory: str | Path, output_path: Path, workers: int | None = None) -> tuple:
+    """Write one workbook per show command with the rows of every device under directory.
+
+    The columns of each command are collected from the files in a process pool first, then the
+    files are read again one at a time and their rows appended to the workbooks, which stream
+    them to disk. Each row starts with its device, in the _device column. Files that cannot be read are logged and
+    left out. Returns the written workbooks and the count of failed files.
+    """
+
+    files = []
+    columns = {}
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        for path, found, error in executor.map(file_columns, find_json_files(directory), chunksize=16):
+            if error is not None:
+                failed += 1
+                logger.error(f"Failed to read {path}: {error}")
+                continue
+            files.append(path)
+            for command_name, names in found.items():
+                columns.setdefault(command_name, {}).update(dict.fromkeys(names))
+
+    workbooks = {}
+    for command_name, names in columns.items():
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(command_name[:31])
+        write_header(sheet, [DEVICE_COLUMN, *names])
+        workbooks[command_name] = (workbook, sheet, list(names))
+    for path in files:
+        try:
+            append_rows(path, workbooks)
+        except Exception as e:
+            # The file changed since its columns were read
+            failed += 1
+            logger.error(f"Failed to merge {path}: {e}")
+
+    output_path.mkdir(parents=True, exist_ok=True)
+    written = []
+    for command_name, (workbook, _, _) in workbooks.items():
+        full_filename = output_path / f"{'_'.join(command_name.split()).replace('/', '_')}.xlsx"
+        workbook.save(full_filename)
+        written.append(full_filename)
+    return written, failed
+
 
 def main():
 
     # Set up the argument parser
     parser = argparse.ArgumentParser(description='Write JSON data to Excel')
-    parser.add_argument('--file', type=str, help='The JSON data file')
+    parser.add_argument('--file', type=str, help='The JSON data file, plain or compressed with gzip (.gz) or zstd (.zst)')
     parser.add_argument('--directory', type=str, help='The directory that has one or multiple JSON files.')
+    parser.add_argument('--output_path', type=str, help='Where the workbooks are written, the workbooks of --directory in the same sub-folders as their JSON file. Default the current directory.')
+    parser.add_argument('--workers', type=int, help='Worker processes converting the files of --directory. Default the number of CPU cores.')
+    parser.add_argument('--force', action='store_true', help='Convert the files of --directory whose workbook is newer than them too.')
+    parser.add_argument('--merge', action='store_true', help='Write one workbook per show command with the rows of every device of --directory instead of one per device.')
 
     # Parse arguments
     args = parser.parse_args()
-
-    data_list = []
+    output_path = Path(args.output_path) if args.output_path else Path.cwd()
 
     # Read the JSON file
     if args.file:
-        with open(args.file, 'r') as content:
-            data = json.load(content)
-            data_list.append(data)
-    
+        output_path.mkdir(parents=True, exist_ok=True)
+        write_to_excel(load_json(args.file), output_path)
+
     if args.directory:
-        json_files = find_json_files(args.directory)
-        for file in json_files:
-            with open(f'{file}', 'r') as content:
-                data = json.load(content)
-                data_list.append(data)
-    
-    for data in data_list:
-        write_to_excel(data)
+        if args.merge:
+            written, failed = merge_directory(args.directory, output_path, args.workers)
+            print(f"Wrote {len(written)} workbooks to {output_path}, {failed} files failed.")
+        else:
+            counts = convert_directory(args.directory, output_path, args.workers, args.force)
+            print(f"Converted {counts['converted']} files, skipped {counts['skipped']} up to date, {counts['failed']} failed.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,307 @@
+# flake8: noqa E501
+"""SQLite sink of the parsed outputs, with one indexed table per command family."""
+import asyncio
+import contextlib
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, NamedTuple
+import serializer
+from natural_keys import INTERFACE, IP_ADDRESS, LOCAL_INTERFACE, MAC_ADDRESS, MAC_VLAN, NEIGHBOR, NEXT_HOP, PREFIX, VLAN_ID, VRF
+
+
+logger = logging.getLogger(__name__)
+
+
+class Family(NamedTuple):
+    """How the rows of the commands of a family map to the columns of its table.
+
+    Each column is taken from the first of its candidate fields found in the row, then in the
+    fields of the rows it is nested in. "@key" is the key of the row in its parent table and
+    "@parent" the key of that table, for the outputs keyed by name instead of listing rows.
+    The last column of the primary key tells a row apart from the tables it is nested in.
+    """
+
+    table: str
+    commands: tuple
+    columns: dict
+    primary_key: tuple
+    indexes: tuple = ()
+    cleaners: dict = {}
+    defaults: dict = {}
+
+
+FAMILIES = (
+    Family(
+        table="interfaces",
+        commands=("show interface", "show interface status"),
+        columns={"interface": (*INTERFACE, "@key"), "state": ("state", "status"), "vlan": ("vlan",), "speed": ("speed", "eth_speed")},
+        primary_key=("device", "command", "interface"),
+        indexes=(("interface",),),
+    ),
+    Family(
+        table="vlans",
+        commands=("show vlan",),
+        columns={"vlan_id": (*VLAN_ID, "@key"), "name": ("vlanbrief_vlanshowbr-vlanname", "vlan_name"), "state": ("vlanbrief_vlanshowbr-vlanstate", "status")},
+        primary_key=("device", "command", "vlan_id"),
+        indexes=(("name",),),
+    ),
+    Family(
+        table="arp",
+        commands=("show ip arp",),
+        columns={"vrf": VRF, "ip": IP_ADDRESS, "mac": ("mac", "mac_address", "hardware_address"), "interface": ("intf-out", "interface")},
+        primary_key=("device", "command", "vrf", "ip"),
+        indexes=(("ip",), ("mac",)),
+        defaults={"vrf": "default"},
+    ),
+    Family(
+        table="mac",
+        commands=("show mac address-table",),
+        columns={"vlan": MAC_VLAN, "mac": (*MAC_ADDRESS, "@key"), "port": ("disp_port", "ports", "port")},
+        primary_key=("device", "command", "vlan", "mac"),
+        indexes=(("mac",), ("port",)),
+    ),
+    Family(
+        table="routes",
+        commands=("show ip route", "show ip route vrf all"),
+        columns={"vrf": (*VRF, "@parent"), "prefix": (*PREFIX, "@key"), "next_hop": NEXT_HOP, "interface": ("ifname", "interface"), "protocol": ("clientname", "route_type", "codes")},
+        # A row per next hop, so the ECMP paths of a prefix are all kept
+        primary_key=("device", "command", "vrf", "prefix", "next_hop"),
+        indexes=(("prefix",), ("next_hop",)),
+        defaults={"vrf": "default", "next_hop": ""},
+    ),
+    Family(
+        table="cdp",
+        commands=("show cdp neighbor",),
+        columns={"local_interface": (*LOCAL_INTERFACE, "@key"), "neighbor": (*NEIGHBOR, "@parent"), "port_id": ("port_id",), "platform": ("platform_id", "platform")},
+        primary_key=("device", "command", "local_interface", "neighbor"),
+        indexes=(("neighbor",),),
+        # The text parsers key the neighbor ports by local_int_<interface>
+        cleaners={"local_interface": lambda value: value.removeprefix("local_int_")},
+    ),
+)
+
+families_by_command = {cmd: family for family in FAMILIES for cmd in family.commands}
+
+# The ports of each VLAN, from show vlan, to find the ports of a VLAN by index
+VLAN_PORT_FIELDS = ("vlanbrief_vlanshowplist-ifidx", "ports")
+
+# Bumped when the tables change, e.g. their primary keys, so older databases get them again
+SCHEMA_VERSION = 2
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS devices (device TEXT PRIMARY KEY, updated_at TEXT)",
+    "CREATE TABLE IF NOT EXISTS vlan_ports (device TEXT, vlan_id TEXT, interface TEXT, PRIMARY KEY (device, vlan_id, interface))",
+    "CREATE INDEX IF NOT EXISTS vlan_ports_vlan_id ON vlan_ports (vlan_id)",
+    "CREATE INDEX IF NOT EXISTS vlan_ports_interface ON vlan_ports (interface)",
+]
+for family in FAMILIES:
+    columns = ", ".join(f"{column} TEXT" for column in family.columns)
+    SCHEMA.append(f"CREATE TABLE IF NOT EXISTS {family.table} (device TEXT, command TEXT, {columns}, data TEXT, PRIMARY KEY ({', '.join(family.primary_key)}))")
+    for index in family.indexes:
+        SCHEMA.append(f'CREATE INDEX IF NOT EXISTS {family.table}_{"_".join(index)} ON {family.table} ({", ".join(index)})')
+
+
+def is_nested(value: Any) -> bool:
+    return isinstance(value, dict) or (isinstance(value, list) and any(isinstance(item, dict) for item in value))
+
+
+def iter_rows(value: Any, fields: set, path: tuple = (), context: dict | None = None):
+    """Yield (path, context, row) for every row of an output.
+
+    A row is a dict with a plain value in one of the given fields, or a dict of plain values,
+    so a wrapper such as {"interface": [...]} is not taken for a row. path holds the keys of the
+    dicts the row is nested in and context the plain values of those dicts, e.g. the VRF of the
+    routes under it.
+    """
+
+    context = context or {}
+    if isinstance(value, list):
+        for item in value:
+            yield from iter_rows(item, fields, path, context)
+    elif isinstance(value, dict):
+        if any(field in value and not is_nested(value[field]) for field in fields) or not any(is_nested(item) for item in value.values()):
+            yield path, context, value
+            return
+        inner = {**context, **{key: item for key, item in value.items() if not is_nested(item)}}
+        for key, item in value.items():
+            if is_nested(item):
+                yield from iter_rows(item, fields, path + (key,) if isinstance(item, dict) else path, inner)
+
+
+def pick(row: dict, path: tuple, context: dict, candidates: tuple) -> Any:
+    for candidate in candidates:
+        if candidate == "@key":
+            if path:
+                return path[-1]
+        elif candidate == "@parent":
+            if len(path) > 1:
+                return path[-2]
+        elif candidate in row and not is_nested(row[candidate]):
+            return row[candidate]
+        elif candidate in context:
+            return context[candidate]
+        else:
+            # e.g. the next hop in the path of an NX-OS JSON route
+            for item in row.values():
+                item = item[0] if isinstance(item, list) and item and isinstance(item[0], dict) else item
+                if isinstance(item, dict) and candidate in item and not is_nested(item[candidate]):
+                    return item[candidate]
+    return None
+
+
+def as_text(value: Any) -> str | None:
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return ", ".join(map(str, value))
+    return str(value)
+
+
+def family_rows(family: Family, host: str, cmd: str, output: Any) -> list:
+    fields = {candidate for candidate in family.columns[family.primary_key[-1]] if not candidate.startswith("@")}
+    rows = []
+    for path, context, row in iter_rows(output, fields):
+        values = {}
+        for column, candidates in family.columns.items():
+            value = as_text(pick(row, path, context, candidates))
+            if value is not None and column in family.cleaners:
+                value = family.cleaners[column](value)
+            values[column] = family.defaults.get(column) if value is None else value
+        if any(values[column] is None for column in family.primary_key if column in values):
+            # NULLs never conflict, so the row could not be replaced later
+            continue
+        rows.append((host, cmd, *values.values(), serializer.dumps(row).decode()))
+    return rows
+
+
+def vlan_port_rows(host: str, output: Any) -> list:
+    rows = set()
+    family = families_by_command["show vlan"]
+    for path, context, row in iter_rows(output, set(VLAN_ID)):
+        vlan_id = as_text(pick(row, path, context, family.columns["vlan_id"]))
+        ports = pick(row, path, context, VLAN_PORT_FIELDS)
+        if vlan_id is None or not ports:
+            continue
+        for port in ports if isinstance(ports, list) else str(ports).split(","):
+            if port.strip():
+                rows.add((host, vlan_id, port.strip()))
+    return list(rows)
+
+
+class FleetDB:
+    """Upserts the parsed outputs of devices into a SQLite database.
+
+    The database is in WAL mode, so queries keep running while a fleet run writes. Every device
+    is written in one transaction with one executemany per table, which takes the write lock
+    once per device. Within a process the writes go through a single thread, and writers of
+    other processes, e.g. input_dir workers, wait on busy_timeout instead of failing.
+    """
+
+    def __init__(self, path: str | Path, busy_timeout: float = 60.0):
+        self.path = Path(path)
+        self.busy_timeout = busy_timeout
+        self.connection = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="netject-sqlite")
+
+    def connect(self) -> sqlite3.Connection:
+        if self.connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Transactions are opened explicitly with BEGIN IMMEDIATE
+            self.connection = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            with self.transaction():
+                version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+                if version < SCHEMA_VERSION:
+                    self.upgrade(version)
+                for statement in SCHEMA:
+                    self.connection.execute(statement)
+        return self.connection
+
+    def upgrade(self, version: int):
+        # The family tables only hold parsed outputs, so they are dropped and filled again by the next runs
+        tables = [row[0] for row in self.connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        dropped = [family.table for family in FAMILIES if family.table in tables]
+        if dropped:
+            logger.warning(f"{self.path} has schema version {version}, dropping the tables {', '.join(dropped)} to create them with the keys of version {SCHEMA_VERSION}.")
+        for table in dropped:
+            self.connection.execute(f"DROP TABLE {table}")
+        self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @contextlib.contextmanager
+    def transaction(self):
+        # Take the write lock up front, instead of upgrading a read lock and risking a deadlock
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+
+    def write(self, host: str, outputs: dict):
+        """Replace the rows of the commands of outputs of a device with their new rows."""
+
+        connection = self.connect()
+        rows = {}
+        vlan_ports = None
+        for cmd, output in outputs.items():
+            family = families_by_command.get(cmd)
+            if family is None or (isinstance(output, dict) and ("error" in output or "msg" in output)):
+                continue
+            rows[cmd] = family, family_rows(family, host, cmd, output)
+            if family.table == "vlans":
+                vlan_ports = vlan_port_rows(host, output)
+
+        with self.transaction():
+            connection.execute("INSERT OR REPLACE INTO devices (device, updated_at) VALUES (?, ?)", (host, time.strftime("%Y-%m-%dT%H:%M:%S")))
+            for cmd, (family, table_rows) in rows.items():
+                columns = ["device", "command", *family.columns, "data"]
+                connection.execute(f"DELETE FROM {family.table} WHERE device = ? AND command = ?", (host, cmd))
+                connection.executemany(f"INSERT OR REPLACE INTO {family.table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", table_rows)
+            if vlan_ports is not None:
+                connection.execute("DELETE FROM vlan_ports WHERE device = ?", (host,))
+                connection.executemany("INSERT OR REPLACE INTO vlan_ports (device, vlan_id, interface) VALUES (?, ?, ?)", vlan_ports)
+
+    async def store(self, data: dict):
+        """Write the {host: {command: output}} data in the writer thread of the database."""
+
+        loop = asyncio.get_running_loop()
+        for host, outputs in data.items():
+            if not host or not isinstance(outputs, dict):
+                continue
+            await loop.run_in_executor(self.executor, self.write, host, outputs)
+
+    def close_connection(self):
+        if self.connection is not None:
+            # Keeps the WAL small for the next writer instead of letting it grow run after run
+            self.connection.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            self.connection.close()
+            self.connection = None
+
+    def close(self):
+        # The connection belongs to the writer thread
+        self.executor.submit(self.close_connection).result()
+        self.executor.shutdown()
+
+
+# One database object per path and process, shared by the devices of a run like the parser executors
+_databases = {}
+
+
+def get_fleet_db(path: str | Path) -> FleetDB:
+    key = str(Path(path).resolve())
+    if key not in _databases:
+        _databases[key] = FleetDB(path)
+    return _databases[key]
+
+
+def close_fleet_dbs():
+    """Close every database opened by get_fleet_db."""
+
+    while _databases:
+        _, database = _databases.popitem()
+        database.close()
@@ -1,24 +1,34 @@
 from .show_version import parse_ios_show_version
 from .show_interface import parse_ios_show_interface
 from .show_interface_status import parse_ios_show_interface_status
+from .show_interface_status import IOSShowInterfaceStatusParser
 from .show_interface_trunk import parse_ios_show_interface_trunk
 from .show_vlan import parse_ios_show_vlan
 from .show_run_interface import parse_ios_show_run_interface
+from .show_run_interface import IOSShowRunInterfaceParser
 from .show_cdp_neighbor import parse_ios_show_cdp_neighbor
 from .show_ip_arp import parse_ios_show_ip_arp
+from .show_ip_arp import IOSShowIpArpStream
 from .show_ip_route import parse_ios_show_ip_route
+from .show_ip_route import IOSShowIpRouteStream
 from .show_mac_address_table import parse_ios_show_mac_address_table
+from .show_mac_address_table import IOSShowMacAddressTableStream
 
 
 __all__ = [
     'parse_ios_show_version',
     'parse_ios_show_interface',
     'parse_ios_show_interface_status',
+    'IOSShowInterfaceStatusParser',
     'parse_ios_show_interface_trunk',
     'parse_ios_show_vlan',
     'parse_ios_show_run_interface',
+    'IOSShowRunInterfaceParser',
     'parse_ios_show_cdp_neighbor',
     'parse_ios_show_ip_arp',
+    'IOSShowIpArpStream',
     'parse_ios_show_ip_route',
+    'IOSShowIpRouteStream',
     'parse_ios_show_mac_address_table',
+    'IOSShowMacAddressTableStream',
 ]
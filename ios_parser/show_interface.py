@@ -3,62 +3,109 @@ import logging
 import re
 
 
+# Precompiled regular expressions for the attributes, in the order they are added to an interface
+regex_map = {
+    "hardware_address": re.compile(r"Hardware is .+?address is (.+?) \(bia"),
+    "internet_address": re.compile(r"Internet address is (.+)"),
+    "description": re.compile(r"Description: (.+)"),
+    "mtu": re.compile(r"MTU (.+?) bytes"),
+    "encapsulation": re.compile(r"Encapsulation (.+?),"),
+    "duplex": re.compile(r"(\w+-duplex)"),
+    "speed": re.compile(r", (\d+[GM]b/s)"),
+    "media": re.compile(r"media type is (.+)"),
+    "members": re.compile(r"Members in this channel: (.+)"),
+}
+interface_regex = re.compile(r"(.+?) is (up|down), line protocol is (.+?) \((.+?)\)")
+
+# Attributes carried by a line, looked up by the first word of the line
+prefix_keys = {
+    "Hardware": ("hardware_address",),
+    "Internet": ("internet_address",),
+    "Description:": ("description",),
+    "MTU": ("mtu",),
+    "Encapsulation": ("encapsulation",),
+    "Members": ("members",),
+}
+duplex_keys = ("duplex", "speed", "media")
+# Any other line is only searched when it contains one of these
+marker_regex = re.compile(r"Hardware is |Internet address is |Description: |MTU |Encapsulation |-duplex|b/s|media type is |Members in this channel: ")
+name_regex = re.compile(r"(\D+)(\d.*)")
+
+
+def line_keys(line: str) -> tuple:
+    """Return the attributes worth searching for in a line of an interface block."""
+
+    first = line.split(None, 1)[0]
+    keys = prefix_keys.get(first)
+    if keys is not None:
+        return keys
+    if first.endswith("-duplex,"):
+        return duplex_keys
+    if marker_regex.search(line):
+        return tuple(regex_map)
+    return ()
+
+
+def assign_port_channels(result: dict):
+    """Set the port_channel of every interface listed as a member of a port-channel.
+
+    A member such as Gi1/0/1 matches the interface with the same number whose name starts with
+    its abbreviation, e.g. GigabitEthernet1/0/1 but not GigabitEthernet1/0/10 or
+    TenGigabitEthernet1/0/1.
+    """
+
+    interfaces_by_number = {}
+    for interface, attribute in result.items():
+        attribute["port_channel"] = ""
+        match = name_regex.fullmatch(interface.strip())
+        if match:
+            interfaces_by_number.setdefault(match.group(2), []).append((match.group(1).lower(), interface))
+
+    for interface, attribute in result.items():
+        for mem in attribute["members"]:
+            match = name_regex.fullmatch(mem)
+            if not match:
+                continue
+            prefix = match.group(1).lower()
+            for name, inter in interfaces_by_number.get(match.group(2), []):
+                if name.startswith(prefix):
+                    result[inter]["port_channel"] = interface
+
+
 def parse_ios_show_interface(cli_output: str) -> dict:
     """Parses the IOS CLI output of the show interface command."""
 
     logging.info('Parsing ios "show interface"...')
     try:
-        # Define regular expressions for the attributes
-        regex_map = {
-            "interface": r"(.+?) is (up|down), line protocol is (.+?) \((.+?)\)",
-            "hardware_address": r"Hardware is .+?address is (.+?) \(bia",
-            "internet_address": r"Internet address is (.+)",
-            "description": r"Description: (.+)",
-            "mtu": r"MTU (.+?) bytes",
-            "encapsulation": r"Encapsulation (.+?),",
-            "duplex": r"(\w+-duplex)",
-            "speed": r", (\d+[GM]b/s)",
-            "media": r"media type is (.+)",
-            "members": r"Members in this channel: (.+)"
-        }
-
         result = {}
-        current_interface = ""
+        current = None
 
         for line in cli_output.split("\n"):
             if not line.strip():
                 continue
             if "is up" in line or "is down" in line:
-                match = re.search(regex_map["interface"], line)
+                match = interface_regex.search(line)
                 if match:
-                    current_interface = match.group(1)
-                    result[current_interface] = {"status": match.group(2)}
-                    result[current_interface]["protocol_status"] = match.group(3)
-                    result[current_interface]["physical_status"] = match.group(4)
+                    current = {
+                        "status": match.group(2),
+                        "protocol_status": match.group(3),
+                        "physical_status": match.group(4),
+                    }
+                    result[match.group(1)] = current
                     continue
-            for key, regex in regex_map.items():
-                match = re.search(regex, line)
-                if match and current_interface:
-                    if key == "members":
-                        result[current_interface][key] = match.group(1).split()
-                    else:
-                        result[current_interface][key] = match.group(1)
-
-        for key in regex_map.keys():
-            if key == "interface":
+            if current is None:
                 continue
-            for interface, values in result.items():
+            for key in line_keys(line):
+                match = regex_map[key].search(line)
+                if match:
+                    current[key] = match.group(1).split() if key == "members" else match.group(1)
+
+        for key in regex_map:
+            for values in result.values():
                 if key not in values:
-                    result[interface][key] = ""
-        
-        for interface, attribute in result.items():
-            result[interface]["port_channel"] = ""
-            if attribute["members"]:
-                for mem in attribute["members"]:
-                    mem_match = re.search(r"[\d/]+", mem).group(0)
-                    for inter in result:
-                        if mem_match in inter:
-                            result[inter]["port_channel"] = interface
+                    values[key] = ""
+
+        assign_port_channels(result)
 
     except Exception as e:
         result = {"error": f"{e}"}
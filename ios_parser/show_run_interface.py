@@ -1,6 +1,34 @@
 # flake8: noqa E501
 import logging
-import re
+from parser_engine import Rule, Template, TemplateParser
+
+
+interface_rule = Rule(r"^interface (?P<interface>\S+)", action="start", next_state="Interface")
+
+
+class IOSShowRunInterfaceParser(TemplateParser):
+    """Parser of the IOS show run interface command, one record per interface section."""
+
+    template = Template(
+        states={
+            "Start": [
+                interface_rule,
+            ],
+            # Inside an interface configuration section
+            "Interface": [
+                interface_rule,
+                Rule(r"\s+description (?P<description>.+)"),
+                Rule(r"\s+switchport mode (?P<switchport_mode>\S+)"),
+                Rule(r"native vlan (?P<native_vlan>.+)"),
+                Rule(r"\s+switchport access vlan (?P<access_vlan>\d+)"),
+                Rule(r"^ ip address (?P<ip_address>.+)"),
+                Rule(r"^ channel-group (?P<channel_group>\d+) mode (?P<channel_group_mode>\S+)"),
+            ],
+        },
+        attributes=["description","switchport_mode","native_vlan","access_vlan","ip_address","channel_group","channel_group_mode"],
+        output="dict",
+        key="interface",
+    )
 
 
 def parse_ios_show_run_interface(cli_output: str) -> dict:
@@ -9,46 +37,7 @@ def parse_ios_show_run_interface(cli_output: str) -> dict:
     logging.info('Parsing ios "show run interface"...')
     interfaces = {}
     try:
-    # Regular expressions for each attribute
-        regex_map = {
-            "interface": re.compile(r"^interface (\S+)"),
-            "description": re.compile(r"\s+description (.+)"),
-            "switchport_mode": re.compile(r"\s+switchport mode (\S+)"),
-            "native_vlan": re.compile(r"native vlan (.+)"),
-            "access_vlan": re.compile(r"\s+switchport access vlan (\d+)"),
-            "ip_address": re.compile(r"^ ip address (.+)"),
-            "channel_group": re.compile(r"^ channel-group (\d+) mode (\S+)"),
-        }
-
-        current_interface = ""
-
-        # Split the output into lines and loop through each line
-        for line in cli_output.split("\n"):
-            interface_match = regex_map["interface"].match(line)
-            if interface_match:
-                current_interface = interface_match.group(1)
-                interfaces[current_interface] = {}
-                continue
-
-            # If inside an interface configuration section, search for attributes
-            if current_interface:
-                for attr, regex in regex_map.items():
-                    if attr == "interface":
-                        continue
-                    match = regex.match(line)
-                    if match:
-                        if attr == "channel_group":
-                            interfaces[current_interface][attr] = match.group(1)
-                            interfaces[current_interface]["channel_group_mode"] = match.group(2)
-                        else:
-                            interfaces[current_interface][attr] = match.group(1)
-
-        attributes = ["description","switchport_mode","native_vlan","access_vlan","ip_address","channel_group","channel_group_mode"]
-        for attr in attributes:
-            for inter, values in interfaces.items():
-                if attr not in values:
-                    interfaces[inter][attr] = ""
-
+        interfaces = IOSShowRunInterfaceParser.parse(cli_output)
     except Exception as e:
         interfaces["msg"] = e
-    return interfaces
\ No newline at end of file
+    return interfaces
@@ -0,0 +1,28 @@
+# flake8: noqa E501
+"""The fields that identify the records of the show commands, across the text parsers and the NX-OS JSON outputs.
+
+Each constant lists the names one value has in the outputs of the parsers, NX-OS JSON first.
+"""
+
+INTERFACE = ("interface",)
+VLAN_ID = ("vlanbrief_vlanshowbr-vlanid", "vlan_id")
+VRF = ("vrf-name-out", "vrf")
+IP_ADDRESS = ("ip-addr-out", "address")
+MAC_ADDRESS = ("disp_mac_addr", "mac")
+MAC_VLAN = ("disp_vlan", "vlan")
+PREFIX = ("ipprefix",)
+NEXT_HOP = ("ipnexthop", "next_hop")
+LOCAL_INTERFACE = ("intf_id",)
+NEIGHBOR = ("device_id",)
+
+# The natural key of the records of each command, most specific field first
+KEY_FIELDS = {
+    "show interface": INTERFACE,
+    "show interface status": INTERFACE,
+    "show vlan": VLAN_ID,
+    "show ip arp": IP_ADDRESS + VRF,
+    "show mac address-table": MAC_ADDRESS + MAC_VLAN,
+    "show ip route": PREFIX + VRF,
+    "show ip route vrf all": PREFIX + VRF,
+    "show cdp neighbor": NEIGHBOR + LOCAL_INTERFACE,
+}
@@ -0,0 +1,104 @@
+# flake8: noqa E501
+import logging
+import aiohttp
+
+
+logger = logging.getLogger(__name__)
+
+
+class NXAPIError(Exception):
+    """NX-API rejected the request or one of its commands."""
+
+
+class NXAPIClient:
+    """Sends show commands to NX-API as batched JSON-RPC requests.
+
+    A single aiohttp session is shared by every device, so keep-alive connections are reused
+    across batches and, when the client outlives a run, across polling cycles.
+    """
+
+    def __init__(self, limit_per_host: int = 2, timeout: float = 120.0):
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self._session = None
+
+    async def __aenter__(self) -> "NXAPIClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=self.limit_per_host)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def _post(self, device: dict, payload: list) -> list:
+        """Post one JSON-RPC batch and return the responses."""
+
+        scheme = device.get("nxapi_scheme", "https")
+        port = device.get("nxapi_port", 443 if scheme == "https" else 80)
+        url = f"{scheme}://{device['address']}:{port}/ins"
+        async with self._get_session().post(
+            url,
+            json=payload,
+            headers={"content-type": "application/json-rpc"},
+            auth=aiohttp.BasicAuth(device["username"], device["password"]),
+            ssl=None if device.get("nxapi_verify", False) else False,
+        ) as response:
+            if response.status == 401:
+                raise NXAPIError(f"NX-API authentication failed for {device['address']}")
+            replies = await response.json(content_type=None)
+        # A batch of one command is answered with a bare object instead of a list
+        return replies if isinstance(replies, list) else [replies]
+
+    async def _run_batch(self, device: dict, batch: list, method: str) -> list:
+        """Run one batch of commands, results are None for commands that got no reply."""
+
+        payload = [
+            {"jsonrpc": "2.0", "method": method, "params": {"cmd": cmd, "version": 1}, "id": i + 1}
+            for i, cmd in enumerate(batch)
+        ]
+        results = [None] * len(batch)
+        for reply in await self._post(device, payload):
+            index = reply.get("id", 0) - 1
+            if not 0 <= index < len(batch):
+                continue
+            if "error" in reply:
+                error = reply["error"]
+                message = (error.get("data") or {}).get("msg") or error.get("message", "Unknown NX-API error")
+                results[index] = NXAPIError(str(message).strip())
+                continue
+            body = (reply.get("result") or {}).get("body", {})
+            results[index] = body if method == "cli" else body.get("msg", "")
+        return results
+
+    async def run_commands(self, device: dict, commands: list, output_format: str = "json") -> list:
+        """Run the commands and return one result per command, in order.
+
+        A result is the structured body (json) or the CLI text (text) of the command, or an
+        NXAPIError when the device rejected that command.
+        """
+
+        method = "cli" if output_format == "json" else "cli_ascii"
+        batch_size = max(1, int(device.get("nxapi_batch_size", 10)))
+        results = []
+        for start in range(0, len(commands), batch_size):
+            batch = commands[start:start + batch_size]
+            logger.info(f"Sending {len(batch)} commands to {device['address']} over NX-API...")
+            results.extend(await self._run_batch(device, batch, method))
+
+        # NX-API stops executing a batch at the first failing command; retry the skipped ones alone
+        for i, result in enumerate(results):
+            if result is None:
+                (result,) = await self._run_batch(device, [commands[i]], method)
+                results[i] = result if result is not None else NXAPIError("No response from NX-API")
+        return results
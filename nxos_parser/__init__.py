@@ -2,11 +2,14 @@
 from .show_version import parse_nxos_show_version
 from .show_interface import parse_nxos_show_interface
 from .show_interface_status import parse_nxos_show_interface_status
+from .show_interface_status import NXOSShowInterfaceStatusParser
 from .show_interface_trunk import parse_nxos_show_interface_trunk
 from .show_vlan import parse_nxos_show_vlan
 from .show_cdp_neighbor import parse_nxos_show_cdp_neighbor
 from .show_ip_arp import parse_nxos_show_ip_arp
+from .show_ip_arp import NXOSShowIpArpStream
 from .show_ip_route_vrf_all import parse_nxos_show_ip_route_vrf_all
+from .show_ip_route_vrf_all import NXOSShowIpRouteVrfAllStream
 from .show_mac_address_table import parse_nxos_show_mac_address_table
 from .show_forwarding_adjacency import parse_nxos_show_forwarding_adjacency
 from .show_hsrp import parse_nxos_show_hsrp
@@ -29,11 +32,14 @@ __all__ = [
     'parse_nxos_show_version',
     'parse_nxos_show_interface',
     'parse_nxos_show_interface_status',
+    'NXOSShowInterfaceStatusParser',
     'parse_nxos_show_interface_trunk',
     'parse_nxos_show_vlan',
     'parse_nxos_show_cdp_neighbor',
     'parse_nxos_show_ip_arp',
+    'NXOSShowIpArpStream',
     'parse_nxos_show_ip_route_vrf_all',
+    'NXOSShowIpRouteVrfAllStream',
     'parse_nxos_show_mac_address_table',
     'parse_nxos_show_forwarding_adjacency',
     'parse_nxos_show_hsrp',
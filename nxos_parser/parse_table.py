@@ -1,96 +1,120 @@
 # flake8: noqa E501
 from itertools import zip_longest
+from typing import Any
 
 
-# Function to recursively remove TABLE_ and ROW_ prefixes
-async def remove_prefixes(obj: dict) -> dict:
+# Value of a TABLE_ key without rows, which parse_table leaves out
+MISSING = object()
+
+
+def remove_prefix(key: str) -> str:
+    if key.startswith("TABLE_"):
+        return key[6:]
+    if key.startswith("ROW_"):
+        return key[4:]
+    return key
+
+
+def remove_prefixes(obj: dict) -> dict:
     """Remove TABLE_ and ROW_ prefix from show commands output in JSON format"""
 
-    if isinstance(obj, dict):    
-        new_obj = {}
-        for k, v in obj.items():
-            new_key = k
-            if k.startswith("TABLE_"):
-                new_key = k.replace("TABLE_", "", 1)
-            elif k.startswith("ROW_"):
-                new_key = k.replace("ROW_", "", 1)
-            
-            new_obj[new_key] = await remove_prefixes(v)
-        return new_obj
-    elif isinstance(obj, list):
-        return [await remove_prefixes(item) for item in obj]
-    else:
+    if not isinstance(obj, (dict, list)):
         return obj
+    # Containers are created empty and filled from a stack, so deep outputs do not recurse
+    result = {} if isinstance(obj, dict) else []
+    stack = [(obj, result)]
+    while stack:
+        source, target = stack.pop()
+        items = source.items() if isinstance(source, dict) else enumerate(source)
+        for key, value in items:
+            if isinstance(value, (dict, list)):
+                copy = {} if isinstance(value, dict) else []
+                stack.append((value, copy))
+                value = copy
+            if isinstance(target, dict):
+                target[remove_prefix(key)] = value
+            else:
+                target.append(value)
+    return result
+
+
+def table_keys(row: dict) -> list:
+    """TABLE_ keys of a row."""
+
+    # Most rows have none, which one search of their joined keys tells faster than a loop
+    joined = "\n".join(row)
+    if not joined.startswith("TABLE_") and "\nTABLE_" not in joined:
+        return []
+    return [key for key in row if key.startswith("TABLE_")]
+
 
-    
-async def parse_table(table: dict) -> dict:
-    """Recursively parses the tables in show commands output in JSON format."""
+def flatten_rows(value: Any, stack: list) -> Any:
+    """Flattened row, or list of rows, whose nested tables are left to the stack.
 
+    Rows without tables are returned as they are, the others are new rows filled later.
+    """
+
+    if isinstance(value, dict):
+        keys = table_keys(value)
+        if not keys:
+            return value
+        row = {}
+        stack.append((value, row, keys))
+        return row
+    if isinstance(value, list):
+        rows = []
+        for item in value:
+            if isinstance(item, dict):
+                keys = table_keys(item)
+                if keys:
+                    row = {}
+                    stack.append((item, row, keys))
+                    item = row
+            rows.append(item)
+        return rows
+    return value
+
+
+def flatten_table(table_value: Any, stack: list) -> Any:
+    """Flattened TABLE_ value, or MISSING when the table holds no rows."""
+
+    if isinstance(table_value, dict):
+        # Only the last ROW_ of a table is kept
+        if not table_value:
+            return MISSING
+        return flatten_rows(next(reversed(table_value.values())), stack)
+    if isinstance(table_value, list):
+        return [flatten_rows(row_value, stack) for row in table_value for row_value in row.values()]
+    return MISSING
+
+
+def parse_table(table: dict) -> dict:
+    """Parses the tables in show commands output in JSON format.
+
+    TABLE_x keys become x, holding the rows of their ROW_x key. The tables of a row are moved
+    after its other keys. The input is not modified, and nested tables are flattened from a
+    stack instead of by recursion.
+    """
+
+    stack = []
     result = {}
-    for table_key, table_value in table.items():
-        if not table_key.startswith("TABLE_"):
-            result[table_key] = table_value
+    for key, value in table.items():
+        if not key.startswith("TABLE_"):
+            result[key] = value
             continue
-        result_key = table_key.split("_",1)[1]
-        # result_key = table_key
-        if isinstance(table_value, dict):
-            for row_key, row_value in table_value.items():
-                if isinstance(row_value, list):
-                    for item in row_value:
-                        temps = []
-                        keys_to_delete = []
-                        for item_key, item_value in item.items():
-                            if item_key.startswith("TABLE_"):
-                                keys_to_delete.append(item_key)
-                                data = await parse_table({item_key: item_value})
-                                temps.append(data)
-                        for key in keys_to_delete:
-                            del item[key]
-                        for temp in temps:
-                            item.update(temp)
-                elif isinstance(row_value, dict):
-                    temps = []
-                    keys_to_delete = []
-                    for key, value in row_value.items():
-                        if key.startswith("TABLE_"): 
-                            keys_to_delete.append(key)
-                            data = await parse_table({key: value})
-                            temps.append(data)
-                    for key in keys_to_delete:
-                        del row_value[key]
-                    for temp in temps:
-                        row_value.update(temp)
-            result[result_key] = row_value
-        elif isinstance(table_value, list):
-            result[result_key] = []
-            for row in table_value:
-                for row_key, row_value in row.items():
-                    if isinstance(row_value, dict):
-                        temps = []
-                        keys_to_delete = []
-                        for key, value in row_value.items():
-                            if key.startswith("TABLE_"): 
-                                keys_to_delete.append(key)
-                                data = await parse_table({key: value})
-                                temps.append(data)
-                        for key in keys_to_delete:
-                            del row_value[key]
-                        for temp in temps:
-                            row_value.update(temp)
-                    elif isinstance(row_value, list):
-                        for item in row_value:
-                            temps = []
-                            keys_to_delete = []
-                            for item_key, item_value in item.items():
-                                if item_key.startswith("TABLE_"):
-                                    keys_to_delete.append(item_key)
-                                    data = await parse_table({item_key: item_value})
-                                    temps.append(data)
-                            for key in keys_to_delete:
-                                del item[key]
-                            for temp in temps:
-                                item.update(temp)
-                    result[result_key].append(row_value)
+        value = flatten_table(value, stack)
+        if value is not MISSING:
+            result[key.split("_", 1)[1]] = value
+
+    while stack:
+        source, row, keys = stack.pop()
+        row.update(source)
+        for key in keys:
+            del row[key]
+        for key in keys:
+            value = flatten_table(source[key], stack)
+            if value is not MISSING:
+                row[key.split("_", 1)[1]] = value
     return result
 
 
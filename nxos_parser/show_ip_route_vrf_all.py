@@ -1,6 +1,70 @@
 # flake8: noqa E501
 import logging
 import re
+from parser_engine import LineStreamParser
+
+
+class NXOSShowIpRouteVrfAllStream(LineStreamParser):
+    """Streaming parser of the NXOS show ip route vrf all command.
+
+    Emits a ("vrf", name) record for every VRF table header and a (vrf, prefix, route) record
+    for every route, built from the route line and the first *via line under it.
+    """
+
+    # Regex pattern to match VRF names
+    vrf_pattern = re.compile(r"IP Route Table for VRF \"(.*?)\"")
+    # Regex patterns to match the route line and its first next hop
+    route_pattern = re.compile(r"(\S+),\s+ubest/mbest:\s+(\d+)/(\d+)(,\s+attached)?$")
+    via_pattern = re.compile(r"^(\s*)\*via\s+(\S+),\s+(\S+),\s+\[(\d+)/(\d+)\],\s+(\S+),\s+(\S+)")
+
+    def __init__(self, collect: bool = True):
+        super().__init__(collect)
+        self.vrf_name = None
+        self.route = None
+        self.blank_line = False
+
+    def parse_line(self, line: str) -> list:
+        vrf_match = self.vrf_pattern.search(line)
+        if vrf_match:
+            self.vrf_name = vrf_match.group(1)
+            self.route = None
+            return [("vrf", self.vrf_name)]
+        if self.vrf_name is None:
+            return []
+
+        if self.route is not None:
+            # The *via line may follow blank lines, but nothing else
+            if not line.strip():
+                self.blank_line = True
+                return []
+            via_match = self.via_pattern.search(line)
+            route, self.route = self.route, None
+            if via_match and (via_match.group(1) or self.blank_line):
+                prefix, ubest, mbest, attached = route
+                return [(self.vrf_name, prefix, {
+                    "ubest": ubest,
+                    "mbest": mbest,
+                    "attached": attached is not None,
+                    "next_hop": via_match.group(2),
+                    "interface": via_match.group(3),
+                    "preference": via_match.group(4),
+                    "metric": via_match.group(5),
+                    # "age": via_match.group(6),
+                    "route_type": via_match.group(7)
+                })]
+
+        route_match = self.route_pattern.search(line)
+        if route_match:
+            self.route = route_match.groups()
+            self.blank_line = False
+        return []
+
+    def add_record(self, record: tuple):
+        if len(record) == 2:
+            self.result[record[1]] = {}
+        else:
+            vrf_name, prefix, route = record
+            self.result[vrf_name][prefix] = route
 
 
 def parse_nxos_show_ip_route_vrf_all(cli_output: str) -> dict:
@@ -8,38 +72,7 @@ def parse_nxos_show_ip_route_vrf_all(cli_output: str) -> dict:
 
     logging.info('Parsing "show ip route vrf all"...')
     try:
-        # Regex pattern to match VRF names
-        vrf_pattern = r"IP Route Table for VRF \"(.*?)\""
-        # Regex pattern to match route details
-        route_pattern = (
-            r"(\S+),\s+ubest/mbest:\s+(\d+)/(\d+)(,\s+attached)?\n"
-            r"(?:\s+\*via\s+(\S+),\s+(\S+),\s+\[(\d+)/(\d+)\],\s+(\S+),\s+(\S+))"
-        )
-        # Find all VRF sections
-        vrf_sections = re.split(vrf_pattern, cli_output)[1:]
-        
-        # Iterate over VRF sections and parse routes
-        route_map = {}
-        for i in range(0, len(vrf_sections), 2):
-            vrf_name = vrf_sections[i]
-            routes = vrf_sections[i + 1]
-            route_entries = re.findall(route_pattern, routes)
-            
-            # Map the regex groups to meaningful route properties, making the network the key
-            route_map[vrf_name] = {
-                match[0]: {
-                    "ubest": match[1],
-                    "mbest": match[2],
-                    "attached": match[3] != '',
-                    "next_hop": match[4],
-                    "interface": match[5],
-                    "preference": match[6],
-                    "metric": match[7],
-                    # "age": match[8],
-                    "route_type": match[9]
-                } for match in route_entries
-            }
-
+        route_map = NXOSShowIpRouteVrfAllStream.parse(cli_output)
     except Exception as e:
         logging.error(f"An error occurred while parsing: {e}")
         return {"error": f"{e}"}
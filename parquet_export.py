@@ -0,0 +1,178 @@
+# flake8: noqa E501
+"""Fleet-wide Parquet dataset of the parsed outputs, partitioned by command and collection date."""
+import asyncio
+import itertools
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+import serializer
+from fleet_db import is_nested, iter_rows
+
+try:
+    import pyarrow
+    import pyarrow.dataset
+    import pyarrow.parquet as pq
+except ImportError:
+    pyarrow = None
+
+
+logger = logging.getLogger(__name__)
+
+
+def check_parquet():
+    if pyarrow is None:
+        raise ValueError("parquet_path needs the pyarrow package. Install it with pip install pyarrow.")
+
+
+def command_partition(cmd: str) -> str:
+    return "_".join(cmd.split()).replace("/", "_")
+
+
+def flatten(row: dict, prefix: str = "") -> dict:
+    """Nested dicts become dotted columns, lists of plain values comma separated strings, like the Excel sheets."""
+
+    flat = {}
+    for key, value in row.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif is_nested(value):
+            flat[name] = serializer.dumps(value).decode()
+        elif isinstance(value, list):
+            flat[name] = ", ".join(map(str, value))
+        else:
+            # Every column is a string, so the files of different devices share one schema
+            flat[name] = None if value is None else str(value)
+    return flat
+
+
+def output_records(host: str, output: Any, collected_at: datetime) -> list:
+    """The flattened rows of a command output, tagged with the device and collection time.
+
+    The tags are the _device, _key and _collected_at columns, so the fields of the rows named
+    device, key or collected_at keep their values.
+    """
+
+    if not isinstance(output, (dict, list)):
+        return [{"_device": host, "_key": None, "_collected_at": collected_at, "value": None if output is None else str(output)}]
+    records = []
+    for path, context, row in iter_rows(output, set()):
+        records.append({"_device": host, "_key": "/".join(map(str, path)) or None, "_collected_at": collected_at, **flatten(context), **flatten(row)})
+    return records
+
+
+def partition_records(data: dict) -> dict:
+    """The records of the {host: {command: output}} data, by (command, date) partition."""
+
+    collected_at = datetime.now(timezone.utc)
+    partitions = {}
+    for host, outputs in data.items():
+        if not host or not isinstance(outputs, dict) or "error" in outputs:
+            continue
+        for cmd, output in outputs.items():
+            if isinstance(output, dict) and ("error" in output or "msg" in output):
+                continue
+            partition = (command_partition(cmd), collected_at.strftime("%Y-%m-%d"))
+            partitions.setdefault(partition, []).extend(output_records(host, output, collected_at))
+    return partitions
+
+
+class ParquetSink:
+    """Collects the rows of every device per command and writes them as a hive-partitioned dataset.
+
+    Files are laid out as <root>/command=<command>/date=<YYYY-MM-DD>/part-<run>-<pid>-<n>.parquet.
+    Rows are buffered across devices and a command is written once batch_rows of its rows are
+    buffered, or when the sink is flushed, so a large run gives a few files per command instead
+    of one per device.
+    """
+
+    def __init__(self, root: str | Path, batch_rows: int = 250000):
+        check_parquet()
+        if batch_rows < 1:
+            raise ValueError(f"parquet_batch_rows must be at least 1. Have {batch_rows}.")
+        self.root = Path(root)
+        self.batch_rows = batch_rows
+        self.run = time.strftime("%Y%m%dT%H%M%S")
+        self.buffers = {}
+        self.lock = asyncio.Lock()
+
+    def add(self, partitions: dict) -> list:
+        """Buffer the records of partition_records and return the partitions that are full."""
+
+        full = []
+        for partition, records in partitions.items():
+            buffer = self.buffers.setdefault(partition, [])
+            buffer.extend(records)
+            if len(buffer) >= self.batch_rows:
+                full.append(partition)
+        return full
+
+    def write_partition(self, partition: tuple, records: list):
+        cmd, date = partition
+        directory = self.root / f"command={cmd}" / f"date={date}"
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"part-{self.run}-{os.getpid()}-{next(file_numbers)}.parquet"
+        columns = dict.fromkeys(name for record in records for name in record)
+        # Columns that are null in this batch still get the string type of the other files
+        schema = pyarrow.schema([(name, pyarrow.timestamp("us", tz="UTC") if name == "_collected_at" else pyarrow.string()) for name in columns])
+        table = pyarrow.Table.from_pylist(records, schema=schema)
+        pq.write_table(table, path, compression="zstd")
+        logger.info(f"Wrote {len(records)} rows of {cmd} to {path}.")
+
+    async def write(self, data: dict):
+        """Buffer data, and write the partitions that got batch_rows rows in a thread."""
+
+        await self.write_records(partition_records(data))
+
+    async def write_records(self, partitions: dict):
+        """Buffer the records of partition_records, e.g. made in a worker process, and write the full partitions in a thread."""
+
+        async with self.lock:
+            for partition in self.add(partitions):
+                records = self.buffers.pop(partition)
+                await asyncio.to_thread(self.write_partition, partition, records)
+
+    def flush(self):
+        while self.buffers:
+            partition, records = self.buffers.popitem()
+            self.write_partition(partition, records)
+
+
+# One sink per dataset and process, so the devices of a run share the batches
+_sinks = {}
+# Numbers the files of a process, so sinks started in the same second do not overwrite each other
+file_numbers = itertools.count(1)
+
+
+def get_parquet_sink(root: str | Path, batch_rows: int = 250000) -> ParquetSink:
+    key = str(Path(root).resolve())
+    if key not in _sinks:
+        _sinks[key] = ParquetSink(root, batch_rows)
+    return _sinks[key]
+
+
+def flush_parquet_sinks():
+    """Write the rows still buffered by every sink of get_parquet_sink."""
+
+    while _sinks:
+        _, sink = _sinks.popitem()
+        sink.flush()
+
+
+def open_dataset(root: str | Path, command: str | None = None):
+    """Open the dataset, or the partition of one command, as a pyarrow dataset.
+
+    Every command has its own columns, so the schema is the union of the schemas of the files.
+    Filters on command, date, _device and the other columns are pushed down to the files.
+    """
+
+    check_parquet()
+    root = Path(root)
+    if command is not None:
+        root = root / f"command={command_partition(command)}"
+    dataset = pyarrow.dataset.dataset(root, format="parquet", partitioning="hive")
+    schema = pyarrow.unify_schemas([fragment.physical_schema for fragment in dataset.get_fragments()] + [dataset.schema])
+    return pyarrow.dataset.dataset(root, schema=schema, format="parquet", partitioning="hive")
@@ -0,0 +1,14 @@
+# flake8: noqa E501
+from .streaming import LineStreamParser
+from .template import Rule, Template, TemplateParser
+from .column_table import ColumnTable, ColumnTableParser
+
+
+__all__ = [
+    'LineStreamParser',
+    'Rule',
+    'Template',
+    'TemplateParser',
+    'ColumnTable',
+    'ColumnTableParser',
+]
@@ -0,0 +1,151 @@
+# flake8: noqa E501
+import re
+from itertools import compress, repeat
+from operator import itemgetter
+from typing import Any, Callable
+from .streaming import LineStreamParser
+
+
+separator_regex = re.compile(r"^[-+\s]*-[-+\s]*$")
+dash_run = re.compile(r"-+")
+# Rows sliced at a time, enough to amortize the per-column work without holding a whole output in lists
+BATCH_ROWS = 1024
+
+
+def picker(indices: list) -> Callable[[Any], tuple]:
+    """Return a function taking the items at indices from a sequence, as a tuple."""
+
+    if len(indices) == 1:
+        index = indices[0]
+        return lambda items: (items[index],)
+    return itemgetter(*indices)
+
+
+class ColumnTable:
+    """Layout of a fixed-width CLI table.
+
+    `columns` lists the (header label, field) pairs from left to right. The column spans are
+    taken from the label positions in the header line, or from the dash runs of a separator
+    line right under it when it has one run per column. Rows are sliced with these offsets.
+
+    Records go to a dict by their `key` field, or to a list when key is None, with the
+    `fields` of the record (all columns by default) and the `attributes` padded with "".
+    Rows missing a `required` field are skipped.
+
+    Lines before the first header are skipped. Lines starting with a dash, separators and
+    pager prompts such as --More--, are never rows.
+    """
+
+    def __init__(self, header: str, columns: list, key: str | None = None, fields: tuple | None = None,
+                 required: tuple = (), attributes: list | None = None):
+        self.header = re.compile(header)
+        self.labels = [label for label, _ in columns]
+        self.columns = [field for _, field in columns]
+        self.key = key
+        self.fields = fields or tuple(field for field in self.columns if field != key)
+        self.required = required
+        self.attributes = attributes or []
+
+    def label_starts(self, header_line: str) -> list:
+        starts = []
+        position = 0
+        for label in self.labels:
+            position = header_line.index(label, position)
+            starts.append(position)
+            position += len(label)
+        starts[0] = 0
+        return starts
+
+
+class ColumnTableParser(LineStreamParser):
+    """Slices the rows of the `table` of the subclass with the offsets of its header."""
+
+    table: ColumnTable = None
+
+    def __init__(self, collect: bool = True):
+        super().__init__(collect)
+        table = self.table
+        self.spans = None
+        self.slices = None
+        self.after_header = False
+        # Attributes that no column provides are the same for every row
+        self.padding = {attr: "" for attr in table.attributes if attr not in table.fields and attr != table.key}
+        index = {field: position for position, field in enumerate(table.columns)}
+        self.pick_fields = picker([index[field] for field in table.fields])
+        self.required = [index[field] for field in table.required]
+        self.key_index = index[table.key] if table.key is not None else 0
+
+    def new_result(self) -> list | dict:
+        return [] if self.table.key is None else {}
+
+    def set_spans(self, starts: list):
+        ends = starts[1:] + [None]
+        self.spans = list(zip(starts, ends))
+        self.slices = [slice(start, end) for start, end in self.spans]
+
+    def parse_line(self, line: str) -> list:
+        return self.parse_lines([line])
+
+    def parse_lines(self, lines: list) -> list:
+        """Return the records completed by lines.
+
+        Headers and separators are handled one by one, and the rows between them are sliced a
+        batch at a time by rows().
+        """
+
+        table = self.table
+        label = table.labels[0]
+        records = []
+        batch = []
+        for line in lines:
+            if label in line and table.header.search(line):
+                records += self.rows(batch)
+                batch = []
+                self.set_spans(table.label_starts(line))
+                self.after_header = True
+            elif line.startswith("-") or "--More--" in line:
+                # A separator, or a pager prompt
+                if self.after_header and separator_regex.match(line):
+                    runs = [match.start() for match in dash_run.finditer(line)]
+                    if len(runs) == len(self.spans):
+                        runs[0] = 0
+                        self.set_spans(runs)
+                self.after_header = False
+            elif self.spans is not None:
+                self.after_header = False
+                batch.append(line)
+                if len(batch) == BATCH_ROWS:
+                    records += self.rows(batch)
+                    batch = []
+        records += self.rows(batch)
+        return records
+
+    def rows(self, lines: list) -> list:
+        """Return the records of rows sliced with the current spans.
+
+        The cells are sliced column by column, so a row costs a slice per column and one dict,
+        without a Python call per row.
+        """
+
+        if not lines:
+            return []
+        table = self.table
+        columns = [[line[span].strip() for line in lines] for span in self.slices]
+        values = map(dict, map(zip, repeat(table.fields), map(self.pick_fields, zip(*columns))))
+        if self.padding:
+            values = (record | self.padding for record in values)
+        records = zip(columns[self.key_index], values) if table.key is not None else values
+
+        if not table.required:
+            return list(records)
+        complete = map(all, zip(*[columns[index] for index in self.required]))
+        return list(compress(records, complete))
+
+    def _emit(self, lines: list) -> list:
+        records = self.parse_lines(lines)
+        if self.collect:
+            if self.table.key is not None:
+                self.result.update(records)
+            else:
+                self.result.extend(records)
+        return records
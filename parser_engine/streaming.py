@@ -0,0 +1,61 @@
+# flake8: noqa E501
+from typing import Any, Iterable
+
+
+class LineStreamParser:
+    """Base class of parsers that consume CLI output in chunks as it comes off the channel.
+
+    feed() splits the chunks into lines, hands every complete line to parse_line() and returns
+    the records emitted so far, so parsing overlaps with the transfer. Only the unfinished last
+    line is buffered. When collect is True the records are also folded into self.result with
+    add_record(), which gives the same structure the batch parser returns.
+    """
+
+    def __init__(self, collect: bool = True):
+        self.collect = collect
+        self.result = self.new_result()
+        self._partial = ""
+
+    def new_result(self) -> Any:
+        return {}
+
+    def parse_line(self, line: str) -> Iterable:
+        """Return the records completed by this line."""
+        raise NotImplementedError
+
+    def add_record(self, record: Any):
+        """Fold one record into self.result."""
+        raise NotImplementedError
+
+    def _emit(self, lines: list) -> list:
+        records = []
+        parse_line = self.parse_line
+        for line in lines:
+            found = parse_line(line)
+            if found:
+                records.extend(found)
+        if self.collect:
+            for record in records:
+                self.add_record(record)
+        return records
+
+    def feed(self, chunk: str) -> list:
+        lines = (self._partial + chunk).split("\n")
+        self._partial = lines.pop()
+        return self._emit(lines)
+
+    def close(self) -> list:
+        """Flush the last line and return its records."""
+
+        lines = [self._partial]
+        self._partial = ""
+        return self._emit(lines)
+
+    @classmethod
+    def parse(cls, cli_output: str) -> Any:
+        """Parse a complete output in one go."""
+
+        parser = cls()
+        parser.feed(cli_output)
+        parser.close()
+        return parser.result
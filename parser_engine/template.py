@@ -0,0 +1,139 @@
+# flake8: noqa E501
+import re
+from typing import Any
+from .streaming import LineStreamParser
+
+
+group_name = re.compile(r"\(\?P<(\w+)>")
+group_reference = re.compile(r"\(\?P=(\w+)\)")
+
+
+class Rule:
+    """A line rule of a template state.
+
+    The named groups of the regex are the record fields it captures, or only `fields` when
+    given. The action decides what happens with them:
+      - "set" assigns them to the current record,
+      - "start" finishes the current record and starts a new one with them,
+      - "record" emits them as a record of their own right away.
+    The regex is matched at the start of the line, or anywhere in it with search=True.
+    """
+
+    def __init__(self, regex: str, action: str = "set", fields: tuple | None = None, next_state: str | None = None, search: bool = False):
+        if action not in ("set", "start", "record"):
+            raise ValueError(f"Unsupported rule action {action}. Use set, start or record.")
+        self.regex = regex
+        self.action = action
+        self.fields = fields
+        self.next_state = next_state
+        self.search = search
+
+
+class Template:
+    """A text parser described as states of line rules.
+
+    Records are collected in a list, or in a dict by their `key` field with output="dict".
+    Every record is padded with "" for the `attributes` it did not capture, in that order.
+    """
+
+    def __init__(self, states: dict, attributes: list, output: str = "list", key: str | None = None, start: str = "Start"):
+        if output not in ("list", "dict"):
+            raise ValueError(f"Unsupported template output {output}. Use list or dict.")
+        if output == "dict" and key is None:
+            raise ValueError("A template with dict output needs a key field.")
+        self.states = states
+        self.attributes = attributes
+        self.output = output
+        self.key = key
+        self.start = start
+        self._machine = None
+
+    def compile(self) -> dict:
+        """Compile every state and return {state: (match function, {rule group: (rule, fields, groups)})}.
+
+        The rules of a state become the alternatives of one regex, tried in order, so a line is
+        matched once whatever the number of rules. The result is cached on the template.
+        """
+
+        if self._machine is None:
+            machine = {}
+            for state, rules in self.states.items():
+                alternatives = []
+                dispatch = {}
+                for index, rule in enumerate(rules):
+                    if rule.next_state is not None and rule.next_state not in self.states:
+                        raise ValueError(f"Rule {rule.regex} goes to unknown state {rule.next_state}.")
+                    name = f"rule{index}"
+                    groups = re.compile(rule.regex).groupindex
+                    fields = rule.fields or sorted(groups, key=groups.get)
+                    regex = group_name.sub(lambda match: f"(?P<{name}_{match.group(1)}>", rule.regex)
+                    regex = group_reference.sub(lambda match: f"(?P={name}_{match.group(1)})", regex)
+                    # A lone search rule is searched for directly, which is faster than a .*? prefix
+                    prefix = ".*?" if rule.search and len(rules) > 1 else ""
+                    alternatives.append(f"(?P<{name}>{prefix}(?:{regex}))")
+                    dispatch[name] = (rule, tuple(fields), tuple(f"{name}_{field}" for field in fields))
+                regex = re.compile("|".join(alternatives))
+                machine[state] = (regex.search if len(rules) == 1 and rules[0].search else regex.match, dispatch)
+            self._machine = machine
+        return self._machine
+
+
+class TemplateParser(LineStreamParser):
+    """Runs the `template` of the subclass over the lines of an output, one regex match per line."""
+
+    template: Template = None
+
+    def __init__(self, collect: bool = True):
+        super().__init__(collect)
+        self.machine = self.template.compile()
+        self.state = self.template.start
+        self.current = None
+
+    def new_result(self) -> list | dict:
+        return [] if self.template.output == "list" else {}
+
+    def finish(self, record: dict) -> Any:
+        for attr in self.template.attributes:
+            if attr not in record:
+                record[attr] = ""
+        if self.template.output == "dict":
+            return record.pop(self.template.key), record
+        return record
+
+    def parse_line(self, line: str) -> list:
+        match_line, dispatch = self.machine[self.state]
+        match = match_line(line)
+        if match is None:
+            return []
+        rule, fields, groups = dispatch[match.lastgroup]
+        values = dict(zip(fields, match.group(*groups) if len(groups) > 1 else (match.group(*groups),)))
+
+        records = []
+        if rule.action == "record":
+            records.append(self.finish(values))
+        elif rule.action == "start":
+            if self.current is not None:
+                records.append(self.finish(self.current))
+            self.current = values
+        elif self.current is not None:
+            self.current.update(values)
+        if rule.next_state is not None:
+            self.state = rule.next_state
+        return records
+
+    def add_record(self, record: Any):
+        if self.template.output == "dict":
+            key, values = record
+            self.result[key] = values
+        else:
+            self.result.append(record)
+
+    def close(self) -> list:
+        records = super().close()
+        if self.current is not None:
+            record = self.finish(self.current)
+            self.current = None
+            if self.collect:
+                self.add_record(record)
+            records.append(record)
+        return records
@@ -0,0 +1,68 @@
+# flake8: noqa E501
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+import serializer
+from nxos_parser import parse_table
+
+
+class NotJSONError(ValueError):
+    """The output of a JSON command could not be decoded."""
+
+
+# Executors are created on first use and kept for the life of the process, so repeated
+# NetJect() calls such as monitoring cycles do not pay for starting workers again.
+_executors = {}
+
+
+def get_parser_executor(kind: str, workers: int | None = None) -> Executor | None:
+    """Return the shared executor of the given kind (process | thread | inline)."""
+
+    if kind == "inline":
+        return None
+    workers = workers or os.cpu_count() or 1
+    key = (kind, workers)
+    if key not in _executors:
+        if kind == "process":
+            # spawn is safe with the threads started by asyncssh and the monitor's Flask app
+            _executors[key] = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        elif kind == "thread":
+            _executors[key] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="netject-parser")
+        else:
+            raise ValueError(f"Unsupported parser_executor {kind}. Use process, thread or inline.")
+    return _executors[key]
+
+
+def shutdown_parser_executors():
+    """Stop the workers of every executor created by get_parser_executor."""
+
+    while _executors:
+        _, executor = _executors.popitem()
+        executor.shutdown(cancel_futures=True)
+
+
+async def run_parser(parser: Callable[[str], Any], output: str, device: dict) -> Any:
+    """Run a text or JSON parser inline or in the device's parser executor, depending on output size.
+
+    Outputs shorter than parser_inline_threshold characters are parsed on the event loop, where
+    handing them to a worker would cost more than parsing them.
+    """
+
+    kind = device.get("parser_executor", "process")
+    if kind == "inline" or len(output) < device.get("parser_inline_threshold", 262144):
+        return parser(output)
+    executor = get_parser_executor(kind, device.get("parser_workers"))
+    return await asyncio.get_running_loop().run_in_executor(executor, parser, output)
+
+
+def parse_json_output(output: str) -> dict:
+    """Decode the JSON output of an NX-OS command and flatten its tables, for run_parser."""
+
+    try:
+        table = serializer.loads(output)
+    except serializer.JSONDecodeError as e:
+        # Raised instead of the decode error of the JSON backend, which may not come back from a worker process
+        raise NotJSONError(f"{e}") from None
+    return parse_table(table)
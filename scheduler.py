@@ -0,0 +1,143 @@
+# flake8: noqa E501
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+
+class TokenBucket:
+    """Lets at most `rate` logins start per second, with bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError(f"login_rate must be greater than 0. Have {rate}.")
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        # The lock makes waiters take tokens in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class FleetScheduler:
+    """Runs one job per device with bounded concurrency.
+
+    A global cap bounds the jobs in flight, optional per-group caps bound the jobs of a group
+    (devices sharing the same `group_by` value, e.g. a site or a jump host) and an optional
+    token bucket bounds the login rate. Groups are served round-robin, so a large site cannot
+    starve a small one. The time each device spent queued is saved in device["queue_wait"].
+    """
+
+    def __init__(self, max_concurrency: int = 100, group_by: str | None = None, group_limits: dict | None = None,
+                 group_max_concurrency: int | None = None, login_rate: float | None = None, login_burst: int = 1):
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1. Have {max_concurrency}.")
+        if group_max_concurrency is not None and group_max_concurrency < 1:
+            raise ValueError(f"group_max_concurrency must be at least 1. Have {group_max_concurrency}.")
+        for group, limit in (group_limits or {}).items():
+            if limit < 1:
+                raise ValueError(f"group_limits of {group} must be at least 1. Have {limit}.")
+        self.max_concurrency = max_concurrency
+        self.group_by = group_by
+        self.group_limits = group_limits or {}
+        self.group_max_concurrency = group_max_concurrency
+        self.login_bucket = TokenBucket(login_rate, login_burst) if login_rate else None
+        self.elapsed = 0.0
+
+    def group_of(self, device: dict) -> str:
+        if not self.group_by:
+            return "default"
+        return str(device.get(self.group_by, "default"))
+
+    def group_limit(self, group: str) -> int | None:
+        return self.group_limits.get(group, self.group_max_concurrency)
+
+    async def run(self, devices: list, job: Callable[[dict], Awaitable[Any]]) -> list:
+        """Run job(device) for every device and return the results in device order.
+
+        Like asyncio.gather(..., return_exceptions=True), a failed job yields its exception.
+        """
+
+        queues = {}
+        for index, device in enumerate(devices):
+            queues.setdefault(self.group_of(device), deque()).append((index, device))
+        groups = list(queues)
+        running = dict.fromkeys(groups, 0)
+        results = [None] * len(devices)
+        tasks = set()
+        slot_freed = asyncio.Event()
+        cursor = 0
+        start = time.monotonic()
+
+        def next_group() -> str | None:
+            nonlocal cursor
+            for offset in range(len(groups)):
+                group = groups[(cursor + offset) % len(groups)]
+                limit = self.group_limit(group)
+                if queues[group] and (limit is None or running[group] < limit):
+                    cursor = (cursor + offset + 1) % len(groups)
+                    return group
+            return None
+
+        def on_done(task: asyncio.Task, index: int, group: str):
+            running[group] -= 1
+            tasks.discard(task)
+            if task.cancelled():
+                results[index] = asyncio.CancelledError()
+            else:
+                results[index] = task.exception() or task.result()
+            slot_freed.set()
+
+        try:
+            while any(queues.values()):
+                group = next_group() if len(tasks) < self.max_concurrency else None
+                if group is None:
+                    if not tasks:
+                        # Nothing running could free a slot for the devices left
+                        raise RuntimeError(f"{sum(map(len, queues.values()))} devices are left but none of their groups can start a job.")
+                    slot_freed.clear()
+                    await slot_freed.wait()
+                    continue
+
+                index, device = queues[group].popleft()
+                if self.login_bucket and "address" in device:
+                    await self.login_bucket.acquire()
+                device["queue_wait"] = time.monotonic() - start
+
+                running[group] += 1
+                task = asyncio.create_task(job(device))
+                tasks.add(task)
+                task.add_done_callback(lambda task, index=index, group=group: on_done(task, index, group))
+
+            while tasks:
+                slot_freed.clear()
+                await slot_freed.wait()
+        finally:
+            pending = list(tasks)
+            for task in pending:
+                task.cancel()
+            # Let the cancelled jobs run their cleanup before the caller closes what they use
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        self.elapsed = time.monotonic() - start
+        return results
+
+    @staticmethod
+    def queue_wait_summary(devices: list) -> str | None:
+        """Describe the queue wait of a run, to tune the concurrency settings, or None when no device was scheduled."""
+
+        waits = [device["queue_wait"] for device in devices if "queue_wait" in device]
+        if not waits:
+            return None
+        return f"{len(waits)} devices, queue wait avg {sum(waits) / len(waits):.2f}s, max {max(waits):.2f}s"
@@ -0,0 +1,158 @@
+# flake8: noqa E501
+"""JSON encoding and decoding with orjson when it is installed, or the standard library json."""
+import json
+from typing import IO, Any, Iterable, Iterator
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# orjson raises its own JSONDecodeError, a subclass of this one
+JSONDecodeError = json.JSONDecodeError
+
+backend = "orjson" if orjson is not None else "json"
+
+
+def set_backend(name: str):
+    """Select the backend (auto | orjson | json)."""
+
+    global backend
+    if name == "auto":
+        name = "orjson" if orjson is not None else "json"
+    if name not in ("orjson", "json"):
+        raise ValueError(f"Unsupported json_backend {name}. Use auto, orjson or json.")
+    if name == "orjson" and orjson is None:
+        raise ValueError("json_backend orjson needs the orjson package. Install it with pip install orjson.")
+    backend = name
+
+
+def loads(data: str | bytes) -> Any:
+    if backend == "orjson":
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, pretty: bool = False) -> bytes:
+    """Encode obj to UTF-8 JSON, indented when pretty."""
+
+    if backend == "orjson":
+        # Non-str keys are turned into strings like json does
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0))
+    if pretty:
+        return json.dumps(obj, indent=4).encode()
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def canonical(obj: Any) -> bytes:
+    """Compact UTF-8 JSON with sorted keys, the same bytes for equal objects whatever their key order."""
+
+    if backend == "orjson":
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS)
+    return json.dumps(obj, separators=(",", ":"), sort_keys=True, ensure_ascii=False).encode()
+
+
+def load(file: IO) -> Any:
+    """Decode the JSON of a file opened in binary or text mode."""
+
+    return loads(file.read())
+
+
+def dump(obj: Any, file: IO[bytes], pretty: bool = False):
+    """Write obj as JSON to a file opened in binary mode."""
+
+    file.write(dumps(obj, pretty))
+
+
+def indent_unit() -> bytes:
+    # The indent of pretty output, which orjson fixes at 2
+    return b"  " if backend == "orjson" else b"    "
+
+
+def iter_json(value: Any, pretty: bool = False, levels: int = 3, depth: int = 0) -> Iterator[bytes]:
+    """Encode value piece by piece, each item of its first levels of dicts and lists on its own.
+
+    The joined pieces are the same bytes as dumps(value, pretty).
+    """
+
+    if levels == 0 or not isinstance(value, (dict, list)) or not value:
+        encoded = dumps(value, pretty)
+        yield encoded.replace(b"\n", b"\n" + indent_unit() * depth) if pretty and depth else encoded
+        return
+    newline = b"\n" + indent_unit() * (depth + 1) if pretty else b""
+    if isinstance(value, dict):
+        colon = b": " if pretty else b":"
+        yield b"{"
+        for index, (key, item) in enumerate(value.items()):
+            yield (b"," if index else b"") + newline + dumps(str(key)) + colon
+            yield from iter_json(item, pretty, levels - 1, depth + 1)
+    else:
+        yield b"["
+        for index, item in enumerate(value):
+            yield (b"," if index else b"") + newline
+            yield from iter_json(item, pretty, levels - 1, depth + 1)
+    yield (b"\n" + indent_unit() * depth if pretty else b"") + (b"}" if isinstance(value, dict) else b"]")
+
+
+def iter_document(data: dict, pretty: bool = False) -> Iterator[bytes]:
+    """Encode a {host: {command: output}} document piece by piece, down to the rows of the outputs.
+
+    NX-OS outputs keep their rows one level deeper, e.g. {"interface": [...]}, hence the fourth level.
+    """
+
+    return iter_json(data, pretty, levels=4)
+
+
+def table_records(output: Any) -> Iterator[tuple]:
+    """Split a command output into (key, row) records.
+
+    A list gives one record per item, a table keyed by e.g. interface one record per key, and
+    any other output a single record.
+    """
+
+    if isinstance(output, list):
+        for row in output:
+            yield None, row
+    elif isinstance(output, dict) and output and "error" not in output and all(isinstance(row, dict) for row in output.values()):
+        yield from output.items()
+    else:
+        yield None, output
+
+
+def iter_ndjson(data: dict) -> Iterator[bytes]:
+    """Encode a {host: {command: output}} document as NDJSON, one line per table row.
+
+    Every line is {"device", "command", "key", "row"}, key being None for list rows.
+    """
+
+    for host, outputs in data.items():
+        if not isinstance(outputs, dict):
+            outputs = {None: outputs}
+        for cmd, output in outputs.items():
+            for key, row in table_records(output):
+                yield dumps({"device": host, "command": cmd, "key": key, "row": row}) + b"\n"
+
+
+def buffered(chunks: Iterable[bytes], size: int = 1 << 16) -> Iterator[bytes]:
+    """Join small chunks into blocks of about size bytes, to write them with fewer calls."""
+
+    block = []
+    length = 0
+    for chunk in chunks:
+        if len(chunk) >= size:
+            # Not worth a copy
+            if block:
+                yield b"".join(block)
+                block = []
+                length = 0
+            yield chunk
+            continue
+        block.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield b"".join(block)
+            block = []
+            length = 0
+    if block:
+        yield b"".join(block)
@@ -0,0 +1,199 @@
+# flake8: noqa E501
+import argparse
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+import serializer
+from compressed_io import SUFFIXES, check_compression, compressed_name, open_compressed
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotStore:
+    """Parsed command outputs stored once per distinct content, plus one manifest per run.
+
+    Layout under root:
+        blobs/ab/<sha256>.json[.gz|.zst]   canonical JSON of one command output, named by its hash
+        manifests/<run>.json               {"run", "time", "devices": {host: {command: hash}}, "changed": {host: [command]}}
+        heads.json                         {host: {"run", "commands": {command: hash}}}, the latest run of every device
+        heads.lock                         locked while a run is committed
+
+    A command whose output did not change since the last run only adds its hash to the manifest,
+    and whether a device changed is a comparison of hashes.
+    """
+
+    def __init__(self, root: str | Path, compression: str = "none"):
+        check_compression(compression)
+        self.root = Path(root)
+        self.compression = compression
+        self.blob_dir = self.root / "blobs"
+        self.manifest_dir = self.root / "manifests"
+        self.heads_path = self.root / "heads.json"
+        self.lock_path = self.root / "heads.lock"
+
+    def blob_path(self, digest: str, compression: str | None = None) -> Path:
+        return self.blob_dir / digest[:2] / compressed_name(f"{digest}.json", compression or self.compression)
+
+    def put(self, output) -> str:
+        """Store a command output unless the same content is stored already, and return its hash."""
+
+        data = serializer.canonical(output)
+        digest = hashlib.sha256(data).hexdigest()
+        if self.find_blob(digest) is None:
+            path = self.blob_path(digest)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with open_compressed(temp, "wb", self.compression) as file:
+                file.write(data)
+            temp.replace(path)
+        return digest
+
+    def find_blob(self, digest: str) -> Path | None:
+        # A blob keeps the compression it was written with
+        for compression in SUFFIXES:
+            path = self.blob_path(digest, compression)
+            if path.is_file():
+                return path
+        return None
+
+    def get(self, digest: str):
+        path = self.find_blob(digest)
+        if path is None:
+            raise KeyError(f"No blob {digest} in {self.root}")
+        with open_compressed(path, "rb") as file:
+            return serializer.load(file)
+
+    def heads(self) -> dict:
+        try:
+            with open(self.heads_path, "rb") as file:
+                return serializer.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def write_json(self, path: Path, data: dict):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_name(f"{path.name}.tmp")
+        with open(temp, "wb") as file:
+            serializer.dump(data, file, pretty=True)
+        temp.replace(path)
+
+    @contextlib.contextmanager
+    def locked(self):
+        """Hold the lock of the store, so concurrent runs read and write heads.json one after the other."""
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a+b") as file:
+            # Released with the file, also when the process dies
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+            yield
+
+    def new_run_id(self) -> str:
+        run = time.strftime("%Y%m%dT%H%M%S")
+        suffix = 1
+        while (self.manifest_dir / f"{run}.json").exists():
+            suffix += 1
+            run = f"{time.strftime('%Y%m%dT%H%M%S')}-{suffix:03d}"
+        return run
+
+    def commit(self, results: list, run: str | None = None) -> dict:
+        """Store the {host: {command: output}} results of a run and write its manifest.
+
+        Devices that failed as a whole are left out. The manifest lists under "changed" the
+        commands of each device that are new, changed or gone since its previous run.
+        """
+
+        with self.locked():
+            return self.commit_locked(results, run)
+
+    def commit_locked(self, results: list, run: str | None = None) -> dict:
+        heads = self.heads()
+        run = run or self.new_run_id()
+        manifest = {"run": run, "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "devices": {}, "changed": {}}
+        for result in results:
+            for host, outputs in result.items():
+                if not host or not isinstance(outputs, dict) or "error" in outputs:
+                    logger.error(f"Not storing {host} in the snapshot store: it failed as a whole.")
+                    continue
+                commands = {cmd: self.put(output) for cmd, output in outputs.items()}
+                manifest["devices"][host] = commands
+                previous = heads.get(host, {}).get("commands", {})
+                changed = [cmd for cmd in commands.keys() | previous.keys() if commands.get(cmd) != previous.get(cmd)]
+                if changed:
+                    manifest["changed"][host] = sorted(changed)
+                heads[host] = {"run": run, "commands": commands}
+        self.write_json(self.manifest_dir / f"{run}.json", manifest)
+        self.write_json(self.heads_path, heads)
+        return manifest
+
+    def runs(self) -> list:
+        return sorted(path.stem for path in self.manifest_dir.glob("*.json"))
+
+    def load_manifest(self, run: str) -> dict:
+        with open(self.manifest_dir / f"{run}.json", "rb") as file:
+            return serializer.load(file)
+
+    def checkout(self, run: str, host: str | None = None) -> dict:
+        """The {host: {command: output}} data of a run, of every device or only host."""
+
+        devices = self.load_manifest(run)["devices"]
+        return {
+            name: {cmd: self.get(digest) for cmd, digest in commands.items()}
+            for name, commands in devices.items() if host is None or name == host
+        }
+
+    def diff(self, old_run: str, new_run: str) -> dict:
+        """Commands of each device whose output differs between two runs, by hash only."""
+
+        old = self.load_manifest(old_run)["devices"]
+        new = self.load_manifest(new_run)["devices"]
+        changes = {}
+        for host in sorted(old.keys() | new.keys()):
+            old_commands, new_commands = old.get(host, {}), new.get(host, {})
+            changed = sorted(cmd for cmd in old_commands.keys() | new_commands.keys() if old_commands.get(cmd) != new_commands.get(cmd))
+            if changed:
+                changes[host] = changed
+        return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Browse a NetJect snapshot store')
+    parser.add_argument('store', type=str, help='Path of the snapshot store.')
+    parser.add_argument('--runs', action='store_true', help='List the runs in the store.')
+    parser.add_argument('--diff', type=str, nargs=2, metavar=('OLD_RUN', 'NEW_RUN'), help='List the commands of each device that changed between two runs.')
+    parser.add_argument('--checkout', type=str, metavar='RUN', help='Write the JSON files of a run to output_path.')
+    parser.add_argument('--host', type=str, help='Only check out this device.')
+    parser.add_argument('--output_path', type=str, default='.', help='Where --checkout writes the JSON files. Default the current directory.')
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.store)
+    if args.runs:
+        for run in store.runs():
+            print(run)
+    if args.diff:
+        print(json.dumps(store.diff(*args.diff), indent=4))
+    if args.checkout:
+        output_path = Path(args.output_path)
+        output_path.mkdir(parents=True, exist_ok=True)
+        for host, outputs in store.checkout(args.checkout, args.host).items():
+            with open(output_path / f"{host}.json", "wb") as file:
+                serializer.dump({host: outputs}, file, pretty=True)
+
+
+if __name__ == "__main__":
+    main()
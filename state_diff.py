@@ -0,0 +1,138 @@
+# flake8: noqa E501
+"""Diff of two device states, command by command and record by record."""
+from collections import Counter
+from typing import Any, NamedTuple
+import serializer
+from natural_keys import KEY_FIELDS
+
+
+class Change(NamedTuple):
+    """A value of a device state that was added, removed or changed.
+
+    path leads from the command output to the value. Its items are dict keys, and for lists of
+    records the natural key of the record, e.g. the interface name or the prefix, or the index of
+    the item in its list when the records have no natural key.
+    """
+
+    host: str
+    command: str | None
+    path: tuple
+    kind: str
+    old: Any = None
+    new: Any = None
+
+
+def key_fields(cmd: str) -> tuple:
+    """The fields of the natural key of the records of a command, most specific first."""
+
+    return KEY_FIELDS.get(cmd, ())
+
+
+def merged_keys(old: dict, new: dict) -> list:
+    return [*old, *(key for key in new if key not in old)]
+
+
+def is_unique_key(records: list, field: str) -> bool:
+    values = [record.get(field) for record in records]
+    return all(isinstance(value, (str, int)) for value in values) and len(set(values)) == len(values)
+
+
+def record_field(old: list, new: list, fields: tuple) -> str | None:
+    """The field that tells apart the records of both lists: the first of fields, else the first field of the first record, that every record has with a different plain value."""
+
+    if not (old or new) or not all(isinstance(item, dict) for items in (old, new) for item in items):
+        return None
+    first = (old or new)[0]
+    for field in (*fields, *list(first)[:1]):
+        if is_unique_key(old, field) and is_unique_key(new, field):
+            return field
+    return None
+
+
+def diff_lists(old: list, new: list, fields: tuple, path: tuple):
+    field = record_field(old, new, fields)
+    if field is not None:
+        yield from diff_values({item[field]: item for item in old}, {item[field]: item for item in new}, fields, path)
+        return
+    # Without a natural key the lists are compared as multisets, in any order, like DeepDiff ignore_order
+    old_items = [serializer.canonical(item) for item in old]
+    new_items = [serializer.canonical(item) for item in new]
+    unmatched = Counter(new_items)
+    for index, item in enumerate(old_items):
+        if unmatched[item]:
+            unmatched[item] -= 1
+        else:
+            yield path + (index,), "removed", old[index], None
+    unmatched = Counter(old_items)
+    for index, item in enumerate(new_items):
+        if unmatched[item]:
+            unmatched[item] -= 1
+        else:
+            yield path + (index,), "added", None, new[index]
+
+
+def diff_values(old: Any, new: Any, fields: tuple = (), path: tuple = ()):
+    """Yield (path, kind, old, new) for every difference between two values, skipping the equal subtrees."""
+
+    if old == new:
+        return
+    # NX-OS gives a single row as a dict instead of a list of one row
+    if isinstance(old, dict) and isinstance(new, list):
+        old = [old]
+    elif isinstance(old, list) and isinstance(new, dict):
+        new = [new]
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in merged_keys(old, new):
+            if key not in new:
+                yield path + (key,), "removed", old[key], None
+            elif key not in old:
+                yield path + (key,), "added", None, new[key]
+            else:
+                yield from diff_values(old[key], new[key], fields, path + (key,))
+    elif isinstance(old, list) and isinstance(new, list):
+        yield from diff_lists(old, new, fields, path)
+    else:
+        yield path, "changed", old, new
+
+
+def diff_state(old_state: dict, new_state: dict) -> list:
+    """The changes between two {host: {command: output}} states, empty when they are equal."""
+
+    changes = []
+    for host in merged_keys(old_state, new_state):
+        if host not in new_state:
+            changes.append(Change(host, None, (), "removed", old_state[host], None))
+            continue
+        if host not in old_state:
+            changes.append(Change(host, None, (), "added", None, new_state[host]))
+            continue
+        old_outputs, new_outputs = old_state[host], new_state[host]
+        if old_outputs == new_outputs:
+            continue
+        if not isinstance(old_outputs, dict) or not isinstance(new_outputs, dict):
+            changes.append(Change(host, None, (), "changed", old_outputs, new_outputs))
+            continue
+        for cmd in merged_keys(old_outputs, new_outputs):
+            if cmd not in new_outputs:
+                changes.append(Change(host, cmd, (), "removed", old_outputs[cmd], None))
+            elif cmd not in old_outputs:
+                changes.append(Change(host, cmd, (), "added", None, new_outputs[cmd]))
+            else:
+                changes.extend(Change(host, cmd, *difference) for difference in diff_values(old_outputs[cmd], new_outputs[cmd], key_fields(cmd)))
+    return changes
+
+
+def short(value: Any, limit: int = 120) -> str:
+    text = serializer.canonical(value).decode()
+    return text if len(text) <= limit else f"{text[:limit]}..."
+
+
+def format_change(change: Change) -> str:
+    """One line of text for a change, e.g. show interface > interface > Ethernet1/1 > state: "up" -> "down"."""
+
+    where = " > ".join(str(part) for part in (change.command, *change.path) if part is not None) or change.host
+    if change.kind == "added":
+        return f"{where}: added {short(change.new)}"
+    if change.kind == "removed":
+        return f"{where}: removed {short(change.old)}"
+    return f"{where}: {short(change.old)} -> {short(change.new)}"